@@ -0,0 +1,3 @@
+"""
+Benchmarks for the LimeSurvey XBlock.
+"""
@@ -0,0 +1,317 @@
+"""
+Benchmark of the LimeSurvey XBlock views against a local fake LimeSurvey API.
+
+For each scenario it reports the wall time per render and, per render, the
+LimeSurvey API requests, the bytes sent to the API and the XBlock field
+writes. Results can be saved as a baseline and compared with a later run:
+
+    python -m benchmarks.student_view --latency 0.02 --renders 50 --save-baseline baseline.json
+    python -m benchmarks.student_view --latency 0.02 --renders 50 --compare baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "limesurvey.settings.test")
+django.setup()
+
+# pylint: disable=wrong-import-position
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from xblock.field_data import DictFieldData  # noqa: E402
+from xblock.fields import UserScope  # noqa: E402
+from xblock.runtime import NullI18nService  # noqa: E402
+
+from limesurvey.extensions.filters import AddInstructorLimesurveyTab  # noqa: E402
+from limesurvey.limesurvey import LimeSurveyXBlock  # noqa: E402
+from test_utils.fake_limesurvey import FakeLimeSurveyServer  # noqa: E402
+
+SURVEY_ID = 123456
+METRICS = ("wall_ms", "api_calls", "bytes_sent", "field_writes")
+
+
+class CountingFieldData(DictFieldData):
+    """
+    In-memory field data counting the fields written.
+    """
+
+    def __init__(self, data):
+        """
+        Initialize the field data.
+        """
+        super().__init__(data)
+        self.writes = 0
+
+    def set(self, block, name, value):
+        """
+        Count and store a field value.
+        """
+        self.writes += 1
+        super().set(block, name, value)
+
+    def set_many(self, block, update_dict):
+        """
+        Count and store several field values.
+        """
+        self.writes += len(update_dict)
+        super().set_many(block, update_dict)
+
+
+class FakeRuntime:
+    """
+    Minimal XBlock runtime providing the services used by the LimeSurvey XBlock.
+    """
+
+    def __init__(self, user):
+        """
+        Initialize the runtime with the current user.
+        """
+        self.user_service = Mock(get_current_user=Mock(return_value=user))
+        self.i18n_service = NullI18nService()
+
+    def service(self, block, service_name):  # pylint: disable=unused-argument
+        """
+        Return the requested service.
+        """
+        return self.user_service if service_name == "user" else self.i18n_service
+
+    def save_block(self, block):
+        """
+        Nothing to persist, the field data is kept in memory.
+        """
+
+    def render(self, block, view_name, context=None):  # pylint: disable=unused-argument
+        """
+        Render a view of the block.
+        """
+        return getattr(block, view_name)(context)
+
+    def local_resource_url(self, block, uri):  # pylint: disable=unused-argument
+        """
+        Return the URL of a packaged resource.
+        """
+        return f"/static/{uri}"
+
+
+def make_learner(index):
+    """
+    Return a learner as seen through the XBlock user service.
+    """
+    return SimpleNamespace(
+        emails=[f"learner{index}@example.com"],
+        full_name=f"Learner {index}",
+        opt_attrs={
+            "edx-platform.user_role": "student",
+            "edx-platform.user_is_staff": False,
+            "edx-platform.anonymous_user_id": f"anonymous-{index}",
+        },
+    )
+
+
+def make_block(user, field_data):
+    """
+    Return a closed-access LimeSurvey block rendered for the user.
+    """
+    return LimeSurveyXBlock(runtime=FakeRuntime(user), field_data=field_data, scope_ids=Mock())
+
+
+def measure(server, renders, render):
+    """
+    Run `render(index)` the given number of times and collect the metrics of each run.
+
+    `render` returns the number of field writes made.
+    """
+    samples = {metric: [] for metric in METRICS}
+    for index in range(renders):
+        server.limesurvey.reset_stats()
+        start = time.perf_counter()
+        field_writes = render(index)
+        samples["wall_ms"].append((time.perf_counter() - start) * 1000)
+        samples["api_calls"].append(server.limesurvey.requests)
+        samples["bytes_sent"].append(server.limesurvey.bytes_received)
+        samples["field_writes"].append(field_writes)
+    return samples
+
+
+def student_view_render(shared_data, learners_state):
+    """
+    Return a render function of the student view, keeping the state of each learner between renders.
+    """
+    def render(index):
+        user = make_learner(index % len(learners_state))
+        field_data = CountingFieldData({**shared_data, **learners_state[index % len(learners_state)]})
+        block = make_block(user, field_data)
+        block.student_view({})
+        block.save()
+        learners_state[index % len(learners_state)] = {
+            name: value for name, value in field_data._data.items()  # pylint: disable=protected-access
+            if block.fields[name].scope.user == UserScope.ONE
+        }
+        return field_data.writes
+    return render
+
+
+def studio_view_render(shared_data):
+    """
+    Return a render function of the studio view.
+    """
+    def render(index):
+        field_data = CountingFieldData(dict(shared_data))
+        block = make_block(make_learner(index), field_data)
+        block.studio_view()
+        block.save()
+        return field_data.writes
+    return render
+
+
+def run_filter_render(shared_data, blocks_count, cold_cache):
+    """
+    Return a render function of the instructor dashboard filter for a course with several survey blocks.
+    """
+    items = [
+        SimpleNamespace(location=f"block-v1:edX+DemoX+Demo+type@limesurvey+block@{index}",
+                        display_name=f"Survey {index}", limesurvey_url="")
+        for index in range(blocks_count)
+    ]
+    step = AddInstructorLimesurveyTab(filter_type=Mock(), running_pipeline=Mock())
+
+    def render(index):
+        if cold_cache:
+            cache.clear()
+        field_data = CountingFieldData(dict(shared_data))
+        block = make_block(make_learner(index), field_data)
+        with patch("limesurvey.course_blocks.modulestore") as modulestore_mock, \
+                patch("limesurvey.extensions.filters.get_object_by_usage_id", return_value=block):
+            modulestore_mock.return_value.get_items.return_value = items
+            step.run_filter({"course": Mock(id="course-v1:edX+DemoX+Demo"), "sections": []}, "instructor")
+        block.save()
+        return field_data.writes
+    return render
+
+
+def summarize(samples):
+    """
+    Return the mean of each metric and the wall time percentiles.
+    """
+    wall = sorted(samples["wall_ms"])
+    summary = {metric: statistics.mean(values) for metric, values in samples.items()}
+    summary["wall_ms_p50"] = wall[len(wall) // 2]
+    summary["wall_ms_p95"] = wall[min(int(len(wall) * 0.95), len(wall) - 1)]
+    return summary
+
+
+def run(latency, renders, learners):
+    """
+    Run every scenario and return their summaries.
+    """
+    results = {}
+    with FakeLimeSurveyServer(latency=latency) as server, override_settings(
+        LIMESURVEY_INTERNAL_API=server.url,
+        LIMESURVEY_DEFERRED_PROVISIONING=False,
+    ):
+        cache.clear()
+        shared_data = {"survey_id": SURVEY_ID, "anonymous_survey": False}
+
+        learners_state = [{} for _ in range(learners)]
+        results["student_view (first visit)"] = summarize(
+            measure(server, learners, student_view_render(shared_data, learners_state))
+        )
+        results["student_view (repeat visit)"] = summarize(
+            measure(server, renders, student_view_render(shared_data, learners_state))
+        )
+        results["studio_view"] = summarize(measure(server, renders, studio_view_render(shared_data)))
+        results["run_filter (cold cache)"] = summarize(
+            measure(server, renders, run_filter_render(shared_data, 20, cold_cache=True))
+        )
+        results["run_filter (warm cache)"] = summarize(
+            measure(server, renders, run_filter_render(shared_data, 20, cold_cache=False))
+        )
+    return results
+
+
+def print_results(results, baseline=None):
+    """
+    Print the results, with the relative change from the baseline when given.
+    """
+    columns = ("wall_ms", "wall_ms_p95", *METRICS[1:])
+    print(f"{'scenario':32}" + "".join(f"{column:>16}" for column in columns))
+    for scenario, summary in results.items():
+        row = f"{scenario:32}"
+        for column in columns:
+            cell = f"{summary[column]:.2f}"
+            previous = (baseline or {}).get(scenario, {}).get(column)
+            if previous:
+                cell += f" ({(summary[column] - previous) / previous:+.0%})"
+            row += f"{cell:>16}"
+        print(row)
+
+
+def regressions(results, baseline, threshold):
+    """
+    Return the metrics that got worse than the baseline by more than the threshold.
+    """
+    found = []
+    for scenario, summary in results.items():
+        for metric in METRICS:
+            previous = baseline.get(scenario, {}).get(metric)
+            if previous is None:
+                continue
+            if summary[metric] > previous * (1 + threshold) and summary[metric] - previous > 1e-9:
+                found.append(f"{scenario}: {metric} {previous:.2f} -> {summary[metric]:.2f}")
+    return found
+
+
+def main(argv=None):
+    """
+    Run the benchmark from the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds added to each API request.")
+    parser.add_argument("--renders", type=int, default=30, help="Renders measured per scenario.")
+    parser.add_argument("--learners", type=int, default=10, help="Learners provisioned in the first visits.")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Save the results as a JSON baseline.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare the results with a JSON baseline.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="Relative increase over the baseline reported as a regression.",
+    )
+    args = parser.parse_args(argv)
+    logging.disable(logging.ERROR)
+
+    results = run(args.latency, args.renders, args.learners)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+
+    print(f"LimeSurvey API latency: {args.latency * 1000:.0f}ms, renders per scenario: {args.renders}")
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf8") as baseline_file:
+            json.dump({
+                "latency": args.latency,
+                "renders": args.renders,
+                "settings": {"LIMESURVEY_API_TIMEOUT": settings.LIMESURVEY_API_TIMEOUT},
+                "results": results,
+            }, baseline_file, indent=2)
+
+    if baseline:
+        found = regressions(results, baseline, args.threshold)
+        for regression in found:
+            print(f"REGRESSION {regression}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
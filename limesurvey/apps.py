@@ -25,3 +25,12 @@ class LimeSurveyConfig(AppConfig):
             },
         }
     }
+
+    def ready(self):
+        """
+        Build the index of the packaged static resources once per process and connect the signal receivers.
+        """
+        from limesurvey.receivers import connect_receivers  # pylint: disable=import-outside-toplevel
+        from limesurvey.resources import build_resources_index  # pylint: disable=import-outside-toplevel
+        build_resources_index()
+        connect_receivers()
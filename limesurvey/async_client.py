@@ -0,0 +1,152 @@
+"""
+Asyncio client of the LimeSurvey RemoteControl API for bulk and background operations.
+
+The calls are made by the `LimeSurveyClient` of the endpoint from a bounded
+thread pool, so many calls can wait on the network at once without an async
+HTTP library. They share its login, retries, circuit breaker, transport and
+errors, and count against the bulk rate limit of the endpoint.
+
+Example:
+    async def get_summaries(survey_ids):
+        async with AsyncLimeSurveyClient.from_block(block) as client:
+            return await asyncio.gather(*(client.call_procedure("get_summary", survey_id) for survey_id in survey_ids))
+
+    summaries = asyncio.run(get_summaries([123456, 654321]))
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+from limesurvey.client import MisconfiguredLimeSurveyService, get_client
+from limesurvey.rate_limit import BULK_POOL, rate_limit_pool
+from limesurvey.utils import _
+
+DEFAULT_CONCURRENCY = 10
+
+
+class AsyncLimeSurveyClient:
+    """
+    Asyncio client of a LimeSurvey API endpoint with bounded concurrency.
+
+    At most `concurrency` requests are in flight at once. Each call runs the
+    blocking `call_procedure` of the client of the endpoint in a thread.
+    """
+
+    def __init__(self, api_url: str, api_user: str, api_password: str, concurrency: int | None = None):
+        """
+        Initialize the client.
+
+        args:
+            api_url: URL of the LimeSurvey RemoteControl API.
+            api_user: Username to authenticate with the API.
+            api_password: Password of the user.
+            concurrency: Requests in flight at once, `LIMESURVEY_ASYNC_CONCURRENCY` by default.
+        """
+        if not api_url or not api_user or not api_password:
+            raise MisconfiguredLimeSurveyService(_("LimeSurvey API user or password not configured"))
+
+        self.client = get_client(api_url, api_user, api_password)
+        self.concurrency = concurrency or getattr(settings, "LIMESURVEY_ASYNC_CONCURRENCY", DEFAULT_CONCURRENCY)
+        # Created by the first call, in the event loop it's used from
+        self.semaphore = None
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="limesurvey-async")
+
+    @classmethod
+    def from_block(cls, block, concurrency: int | None = None) -> AsyncLimeSurveyClient:
+        """
+        Return a client of the LimeSurvey API configured in the block.
+        """
+        return cls(block.get_api_url(), block.get_api_user(), block.get_api_password(), concurrency)
+
+    async def __aenter__(self) -> AsyncLimeSurveyClient:
+        """
+        Return the client.
+        """
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """
+        Close the client.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the threads of the client once their requests are done.
+        """
+        self.executor.shutdown(wait=False)
+
+    async def run(self, function, *args):
+        """
+        Run a blocking function in the threads of the client, against the bulk rate limit.
+        """
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, partial(self.run_bulk, function, *args),
+            )
+
+    @staticmethod
+    def run_bulk(function, *args):
+        """
+        Call the function with its LimeSurvey API calls counted against the bulk rate limit.
+        """
+        with rate_limit_pool(BULK_POOL):
+            return function(*args)
+
+    async def get_session_key(self) -> str | None:
+        """
+        Return the session key shared for the endpoint and user, logging in if there is none.
+
+        Raises:
+            LimeSurveyConnectionError: If no key was obtained in time by another process.
+        """
+        await self.run(self.client.set_session_key)
+        return self.client.session_key
+
+    async def call_procedure(self, method: str, *params):
+        """
+        Invoke a method on the LimeSurvey API.
+
+        When the shared session key is reported as invalid, it's refreshed and
+        the call is retried once.
+
+        Arguments:
+            method: The method to invoke
+            params: The parameters to pass to the method, without the session key
+
+        Raises:
+            LimeSurveyAPIError: If the API call fails.
+            An exception from API_EXCEPTIONS_MAPPING if matches the error message.
+        """
+        return await self.run(self._call_procedure, method, params)
+
+    async def call_procedure_batch(self, calls: list) -> list:
+        """
+        Invoke several methods on the LimeSurvey API concurrently.
+
+        Arguments:
+            calls: List of (method, params) tuples, params without the session key.
+
+        Returns:
+            A list with the result of each call, in the same order. Failed calls
+            are returned as their exception.
+        """
+        return await asyncio.gather(
+            *(self.call_procedure(method, *params) for method, params in calls),
+            return_exceptions=True,
+        )
+
+    def _call_procedure(self, method: str, params: tuple):
+        """
+        Invoke a method with the client of the endpoint, logging in first if there is no session key.
+
+        It blocks, so it's called from the threads of the client.
+        """
+        self.client.set_session_key()
+        return self.client.call_procedure(method, *params)
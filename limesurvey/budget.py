@@ -0,0 +1,83 @@
+"""
+Time budget shared by the LimeSurvey API calls made while rendering a view.
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+DEFAULT_RENDER_BUDGET = 4
+
+_current_budget = ContextVar("limesurvey_request_budget", default=None)
+
+
+class RequestBudget:
+    """
+    Deadline for every LimeSurvey API call of a render, including retries.
+
+    The budget also keeps the number of retries made, so it can be reported
+    by the instrumentation once the render is done.
+    """
+
+    def __init__(self, seconds: float):
+        """
+        Initialize the budget.
+
+        args:
+            seconds: Time available from now for every call of the render.
+        """
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+        self.retries = 0
+
+    def remaining(self) -> float:
+        """
+        Return the seconds left before the deadline, zero if it's already over.
+        """
+        return max(self.deadline - time.monotonic(), 0)
+
+    def expired(self) -> bool:
+        """
+        Return whether the deadline is over.
+        """
+        return self.remaining() <= 0
+
+    def timeout(self, timeout: float) -> float:
+        """
+        Return the timeout for the next call, bounded by the remaining budget.
+        """
+        return min(timeout, self.remaining())
+
+    def record_retry(self) -> None:
+        """
+        Count a retry made within the budget.
+        """
+        self.retries += 1
+
+
+def get_current_budget() -> RequestBudget | None:
+    """
+    Return the budget of the current render, if any.
+    """
+    return _current_budget.get()
+
+
+@contextmanager
+def request_budget(seconds: float | None = None):
+    """
+    Bound every LimeSurvey API call made in the block to a single time budget.
+
+    args:
+        seconds: Time available, `LIMESURVEY_RENDER_BUDGET` by default.
+    """
+    if seconds is None:
+        seconds = getattr(settings, "LIMESURVEY_RENDER_BUDGET", DEFAULT_RENDER_BUDGET)
+    budget = RequestBudget(seconds)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
@@ -0,0 +1,151 @@
+"""
+Circuit breaker for the LimeSurvey API shared across processes through the Django cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CIRCUIT_BREAKER_CACHE_PREFIX = "limesurvey.circuit_breaker"
+
+DEFAULT_FAILURE_RATE = 0.5
+DEFAULT_MIN_CALLS = 10
+DEFAULT_WINDOW = 60
+DEFAULT_SLOW_CALL = 3
+DEFAULT_RESET_TIMEOUT = 30
+
+
+class CircuitBreaker:
+    """
+    Stop calling a LimeSurvey API endpoint while it's failing or too slow.
+
+    Calls and failures are counted by endpoint in fixed time windows. Slow
+    calls count as failures. When the failure rate of the current window
+    reaches the threshold, the circuit opens and no call is allowed for the
+    reset timeout. Then a single probe call is let through (half-open): the
+    circuit closes if it succeeds and opens again if it fails.
+    """
+
+    @staticmethod
+    def get_setting(name: str, default):
+        """
+        Return the LIMESURVEY_CIRCUIT_BREAKER_<name> setting.
+        """
+        return getattr(settings, f"LIMESURVEY_CIRCUIT_BREAKER_{name}", default)
+
+    def enabled(self) -> bool:
+        """
+        Return whether the circuit breaker is enabled.
+        """
+        return self.get_setting("ENABLED", True)
+
+    @staticmethod
+    def cache_key(endpoint: str, suffix: str) -> str:
+        """
+        Return the cache key for the state of the endpoint.
+        """
+        digest = hashlib.sha256(endpoint.encode("utf8")).hexdigest()
+        return f"{CIRCUIT_BREAKER_CACHE_PREFIX}.{digest}.{suffix}"
+
+    def opened_at(self, endpoint: str) -> float | None:
+        """
+        Return the time the circuit of the endpoint was opened, if it's not closed.
+        """
+        return cache.get(self.cache_key(endpoint, "opened_at"))
+
+    def is_open(self, endpoint: str) -> bool:
+        """
+        Return whether calls to the endpoint are rejected without probing it.
+        """
+        if not self.enabled():
+            return False
+        opened_at = self.opened_at(endpoint)
+        return opened_at is not None and time.time() - opened_at < self.get_setting(
+            "RESET_TIMEOUT", DEFAULT_RESET_TIMEOUT,
+        )
+
+    def allow_request(self, endpoint: str) -> bool:
+        """
+        Return whether a call to the endpoint can be sent.
+
+        When the reset timeout is over, only the first caller is allowed to
+        probe the endpoint.
+        """
+        if not self.enabled() or self.opened_at(endpoint) is None:
+            return True
+        if self.is_open(endpoint):
+            return False
+        return cache.add(
+            self.cache_key(endpoint, "probe"), True, self.get_setting("RESET_TIMEOUT", DEFAULT_RESET_TIMEOUT),
+        )
+
+    def record_success(self, endpoint: str, duration: float) -> None:
+        """
+        Record a call to the endpoint that got a response after `duration` seconds.
+        """
+        if not self.enabled():
+            return
+        if duration > self.get_setting("SLOW_CALL", DEFAULT_SLOW_CALL):
+            self.record_failure(endpoint)
+            return
+        if self.opened_at(endpoint) is not None:
+            cache.delete_many([self.cache_key(endpoint, "opened_at"), self.cache_key(endpoint, "probe")])
+        self._count(endpoint, failed=False)
+
+    def record_failure(self, endpoint: str) -> None:
+        """
+        Record a failed call to the endpoint, opening the circuit if needed.
+        """
+        if not self.enabled():
+            return
+        if self.opened_at(endpoint) is not None:
+            self._open(endpoint)
+            return
+        calls, failures = self._count(endpoint, failed=True)
+        min_calls = self.get_setting("MIN_CALLS", DEFAULT_MIN_CALLS)
+        if calls >= min_calls and failures / calls >= self.get_setting("FAILURE_RATE", DEFAULT_FAILURE_RATE):
+            self._open(endpoint)
+
+    def _open(self, endpoint: str) -> None:
+        """
+        Open the circuit of the endpoint.
+        """
+        reset_timeout = self.get_setting("RESET_TIMEOUT", DEFAULT_RESET_TIMEOUT)
+        cache.set(self.cache_key(endpoint, "opened_at"), time.time(), reset_timeout * 10)
+        cache.delete(self.cache_key(endpoint, "probe"))
+
+    def _count(self, endpoint: str, failed: bool) -> tuple[int, int]:
+        """
+        Count a call in the current window of the endpoint.
+
+        returns:
+            The number of calls and failures in the current window.
+        """
+        window = self.get_setting("WINDOW", DEFAULT_WINDOW)
+        current_window = int(time.time() // window)
+        calls = self._incr(self.cache_key(endpoint, f"calls.{current_window}"), window)
+        failures_key = self.cache_key(endpoint, f"failures.{current_window}")
+        if failed:
+            failures = self._incr(failures_key, window)
+        else:
+            failures = cache.get(failures_key, 0)
+        return calls, failures
+
+    @staticmethod
+    def _incr(key: str, timeout: int) -> int:
+        """
+        Atomically increment a counter of the cache, creating it if needed.
+        """
+        cache.add(key, 0, timeout * 2)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # The counter expired between the add and the incr
+            cache.set(key, 1, timeout * 2)
+            return 1
+
+
+circuit_breaker = CircuitBreaker()
@@ -0,0 +1,537 @@
+"""
+Client of the LimeSurvey RemoteControl API shared by the XBlock, the commands and the tasks.
+
+A client is kept per API endpoint and credentials in each process, see
+`get_client`. It sends the calls through the pooled transport, the circuit
+breaker, the rate limiter and the single-flight layer, records their metrics
+and shares its session key with the other processes through the cache.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable
+
+import requests
+from django.conf import settings
+
+from limesurvey.budget import get_current_budget
+from limesurvey.circuit_breaker import circuit_breaker
+from limesurvey.metrics import record_api_call, track_api_call
+from limesurvey.rate_limit import rate_limiter
+from limesurvey.session import session_manager
+from limesurvey.single_flight import single_flight
+from limesurvey.transport import get_transport
+from limesurvey.utils import _
+
+log = logging.getLogger(__name__)
+
+
+class LimeSurveyAPIError(Exception):
+    """Exception raised when the LimeSurvey API returns an error."""
+
+    def __init__(self, message=_("LimeSurvey API error.")):
+        """Initialize the exception.
+
+        args:
+            message: The error message for the LimeSurvey API error.
+        """
+        super().__init__(message)
+
+class NoParticipantFound(LimeSurveyAPIError):
+    """Exception raised when no participant is found for the user."""
+
+    def __init__(self, message=_("No participant in the survey.")):
+        """Initialize the exception.
+
+        args:
+            message: The error message for the no participant error.
+        """
+        super().__init__(message)
+
+
+class ExceededLoginAttempts(LimeSurveyAPIError):
+    """Exception raised when the user has exceeded the number of login attempts."""
+
+    def __init__(self, message=_("Exceeded the number of login attempts.")):
+        """Initialize the exception.
+
+        args:
+            message: The error message for the exceeded login attempts error.
+        """
+        super().__init__(message)
+
+
+class InvalidSessionKey(LimeSurveyAPIError):
+    """Exception raised when the session key is expired."""
+
+    # Session key rejected by the API, set by the caller that sent it
+    session_key = None
+
+    def __init__(self, message=_("Invalid session key.")):
+        """Initialize the exception.
+
+        args:
+            message: The error message for the invalid session key error.
+        """
+        super().__init__(message)
+
+
+
+class InvalidCredentials(LimeSurveyAPIError):
+    """Exception raised when the credentials are invalid."""
+
+    def __init__(self, message=_("Invalid credentials to authenticate with LimeSurvey API.")):
+        """Initialize the exception.
+
+        args:
+            message: The error message for the invalid credentials error.
+        """
+        super().__init__(message)
+
+
+class LimeSurveyConnectionError(LimeSurveyAPIError):
+    """Exception raised when a request to the LimeSurvey API can't be completed."""
+
+    def __init__(self, message=_("The survey service could not be reached.")):
+        """Initialize the exception.
+
+        args:
+            message: The error message for the connection error.
+        """
+        super().__init__(message)
+
+
+class LimeSurveyUnavailable(LimeSurveyAPIError):
+    """Exception raised when the LimeSurvey API is failing and calls are not sent."""
+
+    def __init__(self, message=_("The survey service is temporarily unavailable. Please try again later.")):
+        """Initialize the exception.
+
+        args:
+            message: The error message for the unavailable service error.
+        """
+        super().__init__(message)
+
+
+class MisconfiguredLimeSurveyService(Exception):
+    """Exception raised when the survey service is misconfigured."""
+
+    def __init__(self, message=_("Survey service is misconfigured.")):
+        """Initialize the exception.
+
+        args:
+            message: The error message for the misconfigured survey service error.
+        """
+        super().__init__(message)
+
+
+API_EXCEPTIONS_MAPPING = defaultdict(lambda: LimeSurveyAPIError)
+API_EXCEPTIONS_MAPPING["Invalid session key"] = InvalidSessionKey
+API_EXCEPTIONS_MAPPING["No survey participants found."] = NoParticipantFound
+API_EXCEPTIONS_MAPPING["Invalid user name or password"] = InvalidCredentials
+
+# Read-only methods that can be retried on transient failures
+IDEMPOTENT_METHODS = frozenset({"get_summary", "list_participants", "get_participant_properties"})
+
+# Read-only methods whose identical concurrent calls share a single request
+COALESCED_METHODS = IDEMPOTENT_METHODS | {"get_session_key"}
+
+# Internal API URLs that rejected JSON-RPC batch requests in this process
+BATCH_UNSUPPORTED_APIS = set()
+
+
+class LimeSurveyClient:
+    """
+    Client of a LimeSurvey API endpoint with a set of credentials.
+
+    The client has no state of its own besides its settings: session keys,
+    connections and circuit state are shared by every client of the process,
+    and with the other processes when they're cached. Get the client of an
+    endpoint with `get_client` so it's reused.
+    """
+
+    def __init__(self, api_url: str, api_user: str | None, api_password: str | None):
+        """
+        Initialize the client.
+
+        args:
+            api_url: URL of the LimeSurvey RemoteControl API.
+            api_user: Username to authenticate with the API.
+            api_password: Password of the user.
+        """
+        self.api_url = api_url
+        self.api_user = api_user
+        self.api_password = api_password
+
+    @property
+    def session_key(self) -> str | None:
+        """
+        Authentication key for the LimeSurvey API shared by every client of the endpoint and user.
+        """
+        return session_manager.get(self.api_url, self.api_user)
+
+    @session_key.setter
+    def session_key(self, value: str) -> None:
+        """
+        Store the authentication key for the LimeSurvey API in the shared session manager.
+        """
+        session_manager.set(self.api_url, self.api_user, value)
+
+    def set_session_key(self, login: Callable | None = None) -> None:
+        """
+        Set the session key for the LimeSurvey API when there is no shared key available.
+
+        The key is not validated against the API, it's refreshed by `call_procedure`
+        only when the API reports it as invalid. A single process logs in at a
+        time, the others wait for the key it gets.
+
+        args:
+            login: Function requesting a new session key, `login` by default.
+
+        Raises:
+            LimeSurveyConnectionError: If no key was obtained in time by another process.
+        """
+        if self.session_key:
+            return
+
+        try:
+            session_manager.refresh(self.api_url, self.api_user, login or self.login)
+        except TimeoutError as error:
+            raise LimeSurveyConnectionError(_("The survey service could not be reached.")) from error
+
+    def login(self) -> str | None:
+        """
+        Request a new session key for the LimeSurvey API.
+
+        returns:
+            The new session key, or None if LimeSurvey didn't return one.
+
+        Raises:
+            MisconfiguredLimeSurveyService: If the credentials are not set.
+        """
+        if not self.api_user or not self.api_password:
+            raise MisconfiguredLimeSurveyService(
+                _("LimeSurvey API user or password not configured")
+            )
+
+        session_key = self.call_procedure("get_session_key", self.api_user, self.api_password, get_session_key=True)
+        return session_key if isinstance(session_key, str) else None
+
+    def call_procedure(self, method: str, *params, get_session_key=False, login: Callable | None = None) -> dict | None:
+        """
+        Invoke a method on the LimeSurvey API.
+
+        When the shared session key is reported as invalid, it's refreshed and
+        the call is retried once. The latency, the payload size and the error
+        of the call are sent to the metrics sink.
+
+        Arguments:
+            method: The method to invoke
+            params: The parameters to pass to the method
+            get_session_key: True if the method is get_session_key, False otherwise
+            login: Function requesting a new session key, `login` by default
+
+        Returns:
+            The response from the API.
+
+        Raises:
+            LimeSurveyAPIError: If the API call fails.
+            An exception from API_EXCEPTIONS_MAPPING if matches the error message.
+        """
+        with track_api_call(method, {"method": method, "params": params}):
+            if get_session_key:
+                return self._coalesce(method, params, lambda: self._call_procedure(method, [*params]))
+
+            session_key = self.session_key
+
+            def call():
+                try:
+                    return self._call_procedure(method, [session_key, *params])
+                except InvalidSessionKey as error:
+                    error.session_key = session_key
+                    raise
+
+            try:
+                return self._coalesce(method, params, call)
+            except InvalidSessionKey as error:
+                # The error of a coalesced call carries the key of the caller that sent it,
+                # which is only removed while it's still the shared one
+                if error.session_key is not None:
+                    session_manager.invalidate(self.api_url, self.api_user, error.session_key)
+                self.set_session_key(login)
+                return self._call_procedure(method, [self.session_key, *params])
+
+    def _coalesce(self, method: str, params: tuple, call: Callable):
+        """
+        Send the call, sharing it with identical concurrent calls if it's read-only.
+
+        Arguments:
+            method: The method to invoke
+            params: The parameters of the call, without the session key
+            call: Function sending the call
+        """
+        if method not in COALESCED_METHODS:
+            return call()
+        return single_flight.do(single_flight.get_key(self.api_url, self.api_user, method, params), call)
+
+    def call_procedure_batch(self, calls: list, login: Callable | None = None) -> list:
+        """
+        Invoke several methods on the LimeSurvey API in a single JSON-RPC batch request.
+
+        When the shared session key is reported as invalid, it's refreshed and
+        the batch is retried once. If the server answers batch requests with
+        anything but a list of responses, the calls are sent one after the other.
+
+        Arguments:
+            calls: List of (method, params) tuples, params without the session key.
+            login: Function requesting a new session key, `login` by default
+
+        Returns:
+            A list with the result of each call, in the same order. Failed calls
+            are returned as the exception from API_EXCEPTIONS_MAPPING matching
+            the error, so each caller decides whether to raise it.
+        """
+        start = time.monotonic()
+        session_key = self.session_key
+        results = self._call_procedure_batch(
+            [(method, [session_key, *params]) for method, params in calls]
+        )
+        if any(isinstance(result, InvalidSessionKey) for result in results):
+            session_manager.invalidate(self.api_url, self.api_user, session_key)
+            self.set_session_key(login)
+            results = self._call_procedure_batch(
+                [(method, [self.session_key, *params]) for method, params in calls]
+            )
+
+        duration = time.monotonic() - start
+        for (method, params), result in zip(calls, results):
+            record_api_call(
+                method,
+                duration,
+                {"method": method, "params": params},
+                result if isinstance(result, Exception) else None,
+            )
+        return results
+
+    def _call_procedure_batch(self, calls: list) -> list:
+        """
+        Send a JSON-RPC batch request to the LimeSurvey API.
+
+        Arguments:
+            calls: List of (method, params) tuples, including the session key if needed.
+
+        Returns:
+            A list with the result or the exception of each call.
+        """
+        limesurvey_api_url = self.api_url
+        if limesurvey_api_url in BATCH_UNSUPPORTED_APIS:
+            return self._call_procedure_sequence(calls)
+
+        payload = [
+            {"method": method, "params": params, "id": uuid.uuid4().hex}
+            for method, params in calls
+        ]
+
+        response = self._post(payload, idempotent=all(method in IDEMPOTENT_METHODS for method, __ in calls))
+
+        if not response.ok:
+            # A failing server says nothing about its batch support, the calls fail with it
+            error = LimeSurveyConnectionError(response.text)
+            return [error] * len(calls)
+
+        try:
+            responses = response.json()
+        except ValueError:
+            responses = None
+        if not isinstance(responses, list):
+            log.info("LimeSurvey API %s does not support batch requests", limesurvey_api_url)
+            BATCH_UNSUPPORTED_APIS.add(limesurvey_api_url)
+            return self._call_procedure_sequence(calls)
+
+        responses_by_id = {item.get("id"): item for item in responses if isinstance(item, dict)}
+        results = []
+        for call in payload:
+            item = responses_by_id.get(call["id"])
+            try:
+                if item is None:
+                    raise LimeSurveyAPIError(_("Missing response in batch request."))
+                if item.get("error"):
+                    raise LimeSurveyAPIError(str(item["error"]))
+                results.append(self._parse_result(item.get("result")))
+            except LimeSurveyAPIError as error:
+                results.append(error)
+        return results
+
+    def _call_procedure_sequence(self, calls: list) -> list:
+        """
+        Send the calls one after the other, as a fallback for batch requests.
+
+        Arguments:
+            calls: List of (method, params) tuples, including the session key if needed.
+
+        Returns:
+            A list with the result or the exception of each call.
+        """
+        results = []
+        for method, params in calls:
+            try:
+                results.append(self._call_procedure(method, params))
+            except LimeSurveyAPIError as error:
+                results.append(error)
+        return results
+
+    def _call_procedure(self, method: str, params: list) -> dict | None:
+        """
+        Send a single JSON-RPC request to the LimeSurvey API.
+
+        Arguments:
+            method: The method to invoke
+            params: The full list of parameters, including the session key if needed
+
+        Returns:
+            The response from the API.
+        """
+        payload = {
+            "method": method,
+            "params": params,
+            "id": uuid.uuid4().hex,
+        }
+
+        response = self._post(payload, idempotent=method in IDEMPOTENT_METHODS)
+
+        if not response.ok:
+            raise LimeSurveyConnectionError(response.text)
+
+        return self._parse_result(response.json().get("result"))
+
+    def _post(self, payload: dict | list, idempotent: bool = False):
+        """
+        Send a JSON-RPC payload to the LimeSurvey API, retrying transient failures of idempotent calls.
+
+        Retries use exponential backoff with full jitter and are only made
+        while the time budget of the current render allows them.
+
+        Arguments:
+            payload: The JSON-RPC request or batch of requests.
+            idempotent: Whether every call of the payload can be safely repeated.
+
+        Raises:
+            LimeSurveyUnavailable: If the circuit of the endpoint is open or its rate limit is reached.
+            LimeSurveyConnectionError: If the request can't be completed.
+        """
+        max_retries = getattr(settings, "LIMESURVEY_API_RETRIES", 2) if idempotent else 0
+        attempt = 0
+        while True:
+            try:
+                response = self._send(payload)
+            except LimeSurveyConnectionError:
+                if not self._wait_before_retry(attempt, max_retries):
+                    raise
+            else:
+                if response.ok or not self._wait_before_retry(attempt, max_retries):
+                    return response
+            attempt += 1
+
+    @staticmethod
+    def _wait_before_retry(attempt: int, max_retries: int) -> bool:
+        """
+        Wait before retrying a failed call, if the retries and the time budget allow it.
+
+        returns:
+            True if the call can be retried.
+        """
+        if attempt >= max_retries:
+            return False
+
+        backoff = min(
+            getattr(settings, "LIMESURVEY_API_RETRY_BACKOFF_MAX", 1),
+            getattr(settings, "LIMESURVEY_API_RETRY_BACKOFF", 0.1) * 2 ** attempt,
+        )
+        delay = random.uniform(0, backoff)
+        budget = get_current_budget()
+        if budget is not None:
+            if budget.remaining() <= delay:
+                return False
+            budget.record_retry()
+
+        time.sleep(delay)
+        return True
+
+    def _send(self, payload: dict | list):
+        """
+        Send a JSON-RPC payload to the LimeSurvey API through the circuit breaker and rate limiter of the endpoint.
+
+        Raises:
+            LimeSurveyUnavailable: If the circuit of the endpoint is open or its rate limit is reached.
+            LimeSurveyConnectionError: If the request can't be completed.
+        """
+        limesurvey_api_url = self.api_url
+        if not circuit_breaker.allow_request(limesurvey_api_url):
+            raise LimeSurveyUnavailable
+        if not rate_limiter.acquire(limesurvey_api_url, len(payload) if isinstance(payload, list) else 1):
+            log.warning("LimeSurvey API rate limit reached for %s", limesurvey_api_url)
+            raise LimeSurveyUnavailable
+
+        timeout = getattr(settings, "LIMESURVEY_API_TIMEOUT", 5)
+        budget = get_current_budget()
+        if budget is not None:
+            if budget.expired():
+                raise LimeSurveyConnectionError(_("The time to contact the survey service is over."))
+            timeout = budget.timeout(timeout)
+
+        start = time.monotonic()
+        try:
+            response = get_transport().post(
+                url=limesurvey_api_url,
+                json=payload,
+                timeout=timeout,
+            )
+        except requests.RequestException as error:
+            circuit_breaker.record_failure(limesurvey_api_url)
+            raise LimeSurveyConnectionError(str(error)) from error
+
+        if response.ok:
+            circuit_breaker.record_success(limesurvey_api_url, time.monotonic() - start)
+        else:
+            circuit_breaker.record_failure(limesurvey_api_url)
+        return response
+
+    @staticmethod
+    def _parse_result(result):
+        """
+        Return the result of a JSON-RPC call or raise the error it reports.
+
+        Raises:
+            An exception from API_EXCEPTIONS_MAPPING if the result has an error status.
+        """
+        if not isinstance(result, dict):
+            return result
+
+        if result.get("status") not in ("OK", None):
+            log.error("LimeSurvey API error: %s", result.get("status"))
+            raise API_EXCEPTIONS_MAPPING[result.get("status")]()
+
+        return result
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_url: str, api_user: str | None, api_password: str | None) -> LimeSurveyClient:
+    """
+    Return the client of the process for the LimeSurvey API endpoint and credentials.
+    """
+    key = (api_url, api_user, api_password)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = LimeSurveyClient(api_url, api_user, api_password)
+    return client
@@ -0,0 +1,57 @@
+"""
+Cache of the LimeSurvey blocks of each course, used by the instructor dashboard.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from limesurvey.edxapp_wrapper.xmodule import modulestore
+
+LIMESURVEY_BLOCK_CATEGORY = "limesurvey"
+COURSE_BLOCKS_CACHE_PREFIX = "limesurvey.course_blocks"
+DEFAULT_COURSE_BLOCKS_CACHE_TTL = 86400
+
+
+def cache_key(course_key) -> str:
+    """
+    Return the cache key of the LimeSurvey blocks of the course.
+    """
+    digest = hashlib.sha256(str(course_key).encode("utf8")).hexdigest()
+    return f"{COURSE_BLOCKS_CACHE_PREFIX}.{digest}"
+
+
+def get_course_limesurvey_blocks(course_key) -> list:
+    """
+    Return the LimeSurvey blocks of the course, walking the modulestore only when they're not cached.
+
+    The cache is invalidated when the course is published.
+
+    returns:
+        A list of (display_name, limesurvey_url, location) tuples, where
+        `limesurvey_url` is empty when the block uses the service configurations.
+    """
+    key = cache_key(course_key)
+    blocks = cache.get(key)
+    if blocks is None:
+        blocks = [
+            (block.display_name, block.limesurvey_url, str(block.location))
+            for block in modulestore().get_items(
+                course_key, qualifiers={"category": LIMESURVEY_BLOCK_CATEGORY}
+            )
+        ]
+        cache.set(
+            key,
+            blocks,
+            getattr(settings, "LIMESURVEY_COURSE_BLOCKS_CACHE_TTL", DEFAULT_COURSE_BLOCKS_CACHE_TTL),
+        )
+    return blocks
+
+
+def invalidate_course_limesurvey_blocks(course_key) -> None:
+    """
+    Remove the cached LimeSurvey blocks of the course.
+    """
+    cache.delete(cache_key(course_key))
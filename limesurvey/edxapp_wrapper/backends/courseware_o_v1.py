@@ -1,7 +1,10 @@
 """
 Courseware definitions for Open edX Olive release.
 """
+import json
+
 from lms.djangoapps.courseware.module_render import get_module_by_usage_id  # pylint: disable=import-error
+from lms.djangoapps.courseware.models import StudentModule  # pylint: disable=import-error
 
 
 def get_object_by_usage_id(request, course_id, location, disable_staff_debug_info=False, course=None):
@@ -26,3 +29,25 @@ def get_object_by_usage_id(request, course_id, location, disable_staff_debug_inf
         course=course,
     )
     return block
+
+
+def update_student_module_state(user, course_id, location, state):
+    """
+    Update the stored state of a block for the given user.
+
+    Args:
+        user (User): Django user.
+        course_id (CourseKey): Course key.
+        location (UsageKey): block location.
+        state (dict): fields to update in the block state.
+    """
+    student_module, __ = StudentModule.objects.get_or_create(
+        student=user,
+        course_id=course_id,
+        module_state_key=location,
+        defaults={"module_type": location.block_type, "state": "{}"},
+    )
+    current_state = json.loads(student_module.state or "{}")
+    current_state.update(state)
+    student_module.state = json.dumps(current_state)
+    student_module.save()
@@ -0,0 +1,47 @@
+"""
+Student definitions for Open edX Palm release.
+"""
+from common.djangoapps.student.models import CourseEnrollment  # pylint: disable=import-error
+from common.djangoapps.student.models import (  # pylint: disable=import-error
+    anonymous_id_for_user as edxapp_anonymous_id_for_user,
+)
+from common.djangoapps.student.signals import ENROLL_STATUS_CHANGE  # pylint: disable=import-error
+
+
+def get_course_enrollments(course_key):
+    """
+    Get the active enrollments of the course.
+
+    Args:
+        course_key (CourseKey): Course key.
+
+    Returns:
+        QuerySet: Active enrollments with their users, ordered by ID.
+    """
+    return CourseEnrollment.objects.filter(
+        course_id=course_key, is_active=True,
+    ).select_related("user", "user__profile").order_by("id")
+
+
+def anonymous_id_for_user(user, course_id):
+    """
+    Get the anonymous user ID of the user for the course, as seen by the XBlock user service.
+
+    Args:
+        user (User): Django user.
+        course_id (CourseKey): Course key.
+
+    Returns:
+        str: Anonymous user ID.
+    """
+    return edxapp_anonymous_id_for_user(user, course_id)
+
+
+def get_enroll_status_change_signal():
+    """
+    Get the signal sent when a user enrolls in or unenrolls from a course.
+
+    Returns:
+        Signal: Signal sent with the `event`, `user` and `course_id` arguments.
+    """
+    return ENROLL_STATUS_CHANGE
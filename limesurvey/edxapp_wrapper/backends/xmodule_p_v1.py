@@ -1,10 +1,17 @@
 """
 Xmodule definitions for Open edX Palm release.
 """
-from xmodule.modulestore.django import modulestore  # pylint: disable=import-error
+from xmodule.modulestore.django import SignalHandler, modulestore  # pylint: disable=import-error
 
 def get_modulestore(*args, **kwargs):
     """
     Get the modulestore object.
     """
     return modulestore(*args, **kwargs)
+
+
+def get_course_published_signal():
+    """
+    Get the signal sent when a course is published.
+    """
+    return SignalHandler.course_published
@@ -15,4 +15,14 @@ def get_object_by_usage_id_function(*args, **kwargs):
     return backend.get_object_by_usage_id(*args, **kwargs)
 
 
+def update_student_module_state_function(*args, **kwargs):
+    """Update the stored state of a block for a user."""
+
+    backend_function = settings.LIMESURVEY_COURSEWARE_BACKEND
+    backend = import_module(backend_function)
+
+    return backend.update_student_module_state(*args, **kwargs)
+
+
 get_object_by_usage_id = get_object_by_usage_id_function
+update_student_module_state = update_student_module_state_function
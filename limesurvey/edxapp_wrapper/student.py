@@ -0,0 +1,38 @@
+"""
+Student generalized definitions.
+"""
+
+from importlib import import_module
+from django.conf import settings
+
+
+def get_course_enrollments_function(*args, **kwargs):
+    """Get the active enrollments of the given course."""
+
+    backend_function = settings.LIMESURVEY_STUDENT_BACKEND
+    backend = import_module(backend_function)
+
+    return backend.get_course_enrollments(*args, **kwargs)
+
+
+def anonymous_id_for_user_function(*args, **kwargs):
+    """Get the anonymous user ID of the user for the given course."""
+
+    backend_function = settings.LIMESURVEY_STUDENT_BACKEND
+    backend = import_module(backend_function)
+
+    return backend.anonymous_id_for_user(*args, **kwargs)
+
+
+def get_enroll_status_change_signal_function(*args, **kwargs):
+    """Get the signal sent when a user enrolls in or unenrolls from a course."""
+
+    backend_function = settings.LIMESURVEY_STUDENT_BACKEND
+    backend = import_module(backend_function)
+
+    return backend.get_enroll_status_change_signal(*args, **kwargs)
+
+
+get_course_enrollments = get_course_enrollments_function
+anonymous_id_for_user = anonymous_id_for_user_function
+get_enroll_status_change_signal = get_enroll_status_change_signal_function
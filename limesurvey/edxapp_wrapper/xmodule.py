@@ -15,4 +15,14 @@ def get_modulestore_function(*args, **kwargs):
     return backend.get_modulestore(*args, **kwargs)
 
 
+def get_course_published_signal_function(*args, **kwargs):
+    """Get the course published signal."""
+
+    backend_function = settings.LIMESURVEY_XMODULE_BACKEND
+    backend = import_module(backend_function)
+
+    return backend.get_course_published_signal(*args, **kwargs)
+
+
 modulestore = get_modulestore_function
+get_course_published_signal = get_course_published_signal_function
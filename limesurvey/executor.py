@@ -0,0 +1,163 @@
+"""
+Process-wide thread pool to provision independent survey blocks concurrently.
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+from django.conf import settings
+from django.db import connections
+
+from limesurvey.budget import get_current_budget
+
+DEFAULT_PROVISIONING_THREADS = 8
+DEFAULT_ENDPOINT_CONCURRENCY = 4
+
+
+class ProvisioningExecutor:
+    """
+    Bounded thread pool running LimeSurvey API work of a render concurrently.
+
+    Tasks run in a copy of the caller's context, so they share its time
+    budget and tracing span. The number of tasks running at once against the
+    same endpoint is bounded, so a page with many surveys can't flood a
+    single LimeSurvey server. When the caller's deadline is over, the tasks
+    not started yet are cancelled and the running ones stop at their next
+    call, which checks the same deadline.
+    """
+
+    def __init__(self, max_workers: int, endpoint_concurrency: int):
+        """
+        Initialize the executor.
+
+        args:
+            max_workers: Threads of the pool, shared by every request of the process.
+            endpoint_concurrency: Tasks allowed to run at once for each endpoint.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="limesurvey-provisioning")
+        self.endpoint_concurrency = endpoint_concurrency
+        self.semaphores = {}
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def get_semaphore(self, endpoint: str) -> threading.BoundedSemaphore:
+        """
+        Return the semaphore bounding the tasks running against the endpoint.
+        """
+        with self.lock:
+            if endpoint not in self.semaphores:
+                self.semaphores[endpoint] = threading.BoundedSemaphore(self.endpoint_concurrency)
+            return self.semaphores[endpoint]
+
+    def run(self, tasks: list) -> list:
+        """
+        Run the tasks concurrently, waiting at most the remaining time budget of the caller.
+
+        args:
+            tasks: (endpoint, function) tuples, the function is called without arguments.
+
+        returns:
+            The result of each task in order, or the exception it raised.
+            Tasks not done before the deadline get a TimeoutError.
+        """
+        futures = [self.submit(endpoint, function) for endpoint, function in tasks]
+        budget = get_current_budget()
+        done, not_done = wait(futures, timeout=None if budget is None else budget.remaining())
+        for future in not_done:
+            future.cancel()
+
+        results = []
+        for future in futures:
+            if future not in done:
+                results.append(TimeoutError("The time to contact the survey service is over."))
+            elif future.exception() is not None:
+                results.append(future.exception())
+            else:
+                results.append(future.result())
+        return results
+
+    def submit(self, endpoint: str, function: Callable) -> Future:
+        """
+        Schedule the task in a copy of the caller's context, keeping its future until it's done.
+        """
+        future = self.executor.submit(contextvars.copy_context().run, self.run_task, endpoint, function)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self.discard)
+        return future
+
+    def discard(self, future: Future) -> None:
+        """
+        Forget the future of a task once it's done.
+        """
+        with self.lock:
+            self.pending.discard(future)
+
+    def run_task(self, endpoint: str, function: Callable):
+        """
+        Call the function once the endpoint has a free slot, unless the deadline is over first.
+
+        Raises:
+            TimeoutError: If the deadline is over before the task could start.
+        """
+        budget = get_current_budget()
+        semaphore = self.get_semaphore(endpoint)
+        if not semaphore.acquire(timeout=None if budget is None else budget.remaining()):
+            raise TimeoutError("The time to contact the survey service is over.")
+        try:
+            if budget is not None and budget.expired():
+                raise TimeoutError("The time to contact the survey service is over.")
+            return function()
+        finally:
+            semaphore.release()
+            connections.close_all()
+
+    def shutdown(self) -> None:
+        """
+        Cancel the pending tasks and stop the threads once the running ones are done.
+        """
+        # ThreadPoolExecutor.shutdown only cancels the pending tasks itself from Python 3.9
+        with self.lock:
+            pending = list(self.pending)
+        for future in pending:
+            future.cancel()
+        self.executor.shutdown(wait=False)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_provisioning_executor() -> ProvisioningExecutor | None:
+    """
+    Return the process-wide provisioning executor, None if concurrent provisioning is disabled.
+    """
+    global _executor  # pylint: disable=global-statement
+    max_workers = getattr(settings, "LIMESURVEY_PROVISIONING_THREADS", DEFAULT_PROVISIONING_THREADS)
+    if not max_workers:
+        return None
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProvisioningExecutor(
+                    max_workers=max_workers,
+                    endpoint_concurrency=getattr(
+                        settings, "LIMESURVEY_PROVISIONING_ENDPOINT_CONCURRENCY", DEFAULT_ENDPOINT_CONCURRENCY,
+                    ),
+                )
+    return _executor
+
+
+def reset_provisioning_executor() -> None:
+    """
+    Shut the process-wide executor down so the next call builds it from the current settings.
+    """
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+        _executor = None
@@ -5,11 +5,10 @@ from crum import get_current_request
 from django.conf import settings
 from openedx_filters import PipelineStep
 
+from limesurvey.course_blocks import LIMESURVEY_BLOCK_CATEGORY, get_course_limesurvey_blocks
 from limesurvey.edxapp_wrapper.courseware import get_object_by_usage_id
-from limesurvey.edxapp_wrapper.xmodule import modulestore
 
 INSTRUCTOR_TEMPLATE_ABSOLUTE_PATH = "/instructor_dashboard/"
-LIMESURVEY_BLOCK_CATEGORY = "limesurvey"
 
 class AddInstructorLimesurveyTab(PipelineStep):
     """Add LimeSurvey tab to instructor dashboard."""
@@ -29,29 +28,25 @@ class AddInstructorLimesurveyTab(PipelineStep):
 
         course = context["course"]
         request = get_current_request()
-        limesurvey_blocks = modulestore().get_items(
-            course.id, qualifiers={"category": LIMESURVEY_BLOCK_CATEGORY}
-        )
-        limesurvey_block = None
-        if len(limesurvey_blocks) > 0:
-            limesurvey_block = limesurvey_blocks[0]
+        limesurvey_blocks = get_course_limesurvey_blocks(course.id)
 
         # Return if there is no LimeSurvey block in the course
-        if not limesurvey_block:
+        if not limesurvey_blocks:
             return {
                 "context": context,
                 "template_name": template_name,
             }
 
+        __, __, first_block_location = limesurvey_blocks[0]
         block = get_object_by_usage_id(
-            request, str(course.id), str(limesurvey_block.location),
+            request, str(course.id), first_block_location,
             disable_staff_debug_info=True, course=course
         )
 
-        limesurvey_url = getattr(settings, "LIMESURVEY_URL", None)
+        default_limesurvey_url = getattr(settings, "LIMESURVEY_URL", None)
         xblock_urls = [
-            (block.display_name, block.limesurvey_url or limesurvey_url)
-            for block in limesurvey_blocks
+            (display_name, limesurvey_url or default_limesurvey_url)
+            for display_name, limesurvey_url, __ in limesurvey_blocks
         ]
 
         section_data = {
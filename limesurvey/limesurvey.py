@@ -1,15 +1,14 @@
 """XBlock to embed a LimeSurvey survey in Open edX."""
 from __future__ import annotations
 
+import hashlib
+import hmac
 import logging
-import uuid
-from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Tuple
 
-import pkg_resources
 import pytz
-import requests
+from crum import get_current_user
 from django.conf import settings
 from django.utils import translation
 from web_fragments.fragment import Fragment
@@ -17,87 +16,35 @@ from xblock.core import XBlock
 from xblock.fields import Boolean, DateTime, Integer, Scope, String
 from xblockutils.resources import ResourceLoader
 
+from limesurvey.budget import request_budget
+from limesurvey.circuit_breaker import circuit_breaker
+from limesurvey.client import (  # pylint: disable=unused-import
+    API_EXCEPTIONS_MAPPING,
+    BATCH_UNSUPPORTED_APIS,
+    COALESCED_METHODS,
+    IDEMPOTENT_METHODS,
+    ExceededLoginAttempts,
+    InvalidCredentials,
+    InvalidSessionKey,
+    LimeSurveyAPIError,
+    LimeSurveyClient,
+    LimeSurveyConnectionError,
+    LimeSurveyUnavailable,
+    MisconfiguredLimeSurveyService,
+    NoParticipantFound,
+    get_client,
+)
+from limesurvey.metrics import record_render_budget, record_stale_access_code
+from limesurvey.provisioning import get_request_collector
+from limesurvey.resources import get_resource_string, get_statici18n_js_path
+from limesurvey.tracing import start_span
 from limesurvey.utils import _
 
 log = logging.getLogger(__name__)
 loader = ResourceLoader(__name__)
 
-class LimeSurveyAPIError(Exception):
-    """Exception raised when the LimeSurvey API returns an error."""
-
-    def __init__(self, message=_("LimeSurvey API error.")):
-        """Initialize the exception.
-
-        args:
-            message: The error message for the LimeSurvey API error.
-        """
-        super().__init__(message)
-
-class NoParticipantFound(LimeSurveyAPIError):
-    """Exception raised when no participant is found for the user."""
-
-    def __init__(self, message=_("No participant in the survey.")):
-        """Initialize the exception.
-
-        args:
-            message: The error message for the no participant error.
-        """
-        super().__init__(message)
-
-
-class ExceededLoginAttempts(LimeSurveyAPIError):
-    """Exception raised when the user has exceeded the number of login attempts."""
-
-    def __init__(self, message=_("Exceeded the number of login attempts.")):
-        """Initialize the exception.
-
-        args:
-            message: The error message for the exceeded login attempts error.
-        """
-        super().__init__(message)
-
-
-class InvalidSessionKey(LimeSurveyAPIError):
-    """Exception raised when the session key is expired."""
-
-    def __init__(self, message=_("Invalid session key.")):
-        """Initialize the exception.
-
-        args:
-            message: The error message for the invalid session key error.
-        """
-        super().__init__(message)
-
-
-
-class InvalidCredentials(LimeSurveyAPIError):
-    """Exception raised when the credentials are invalid."""
-
-    def __init__(self, message=_("Invalid credentials to authenticate with LimeSurvey API.")):
-        """Initialize the exception.
-
-        args:
-            message: The error message for the invalid credentials error.
-        """
-        super().__init__(message)
-
-
-class MisconfiguredLimeSurveyService(Exception):
-    """Exception raised when the survey service is misconfigured."""
-
-    def __init__(self, message=_("Survey service is misconfigured.")):
-        """Initialize the exception.
-
-        args:
-            message: The error message for the misconfigured survey service error.
-        """
-        super().__init__(message)
-
-
-API_EXCEPTIONS_MAPPING = defaultdict(lambda: LimeSurveyAPIError)
-API_EXCEPTIONS_MAPPING["Invalid session key"] = InvalidSessionKey
-API_EXCEPTIONS_MAPPING["No survey participants found."] = NoParticipantFound
-API_EXCEPTIONS_MAPPING["Invalid user name or password"] = InvalidCredentials
+# Length of the derived participant tokens, LimeSurvey tokens are up to 35 characters
+PARTICIPANT_TOKEN_LENGTH = 32
 
 
 @XBlock.wants("user")
@@ -171,16 +118,17 @@ class LimeSurveyXBlock(XBlock):
         ),
     )
 
-    session_key = String(
-        default=None,
-        scope=Scope.user_state_summary,
-        help=_("Authentication key for the LimeSurvey API"),
-    )
-
-    survey_url = String(
-        default=None,
-        scope=Scope.user_state_summary,
-        help=_("The URL of the survey for the current student."),
+    derive_participant_tokens = Boolean(
+        display_name=_("Derive participant tokens"),
+        default=False,
+        scope=Scope.settings,
+        help=_(
+            "Whether the access codes of the learners are derived from the survey and "
+            "their anonymized id, so they're registered with a single call. It needs "
+            "LIMESURVEY_PARTICIPANT_TOKEN_SECRET in the service configurations. Enable "
+            "it only for surveys without participants yet: learners registered before "
+            "with a token generated by LimeSurvey would be added again."
+        ),
     )
 
     limesurvey_internal_api = String(
@@ -200,6 +148,18 @@ class LimeSurveyXBlock(XBlock):
         help=_("The access code of the user for the survey"),
     )
 
+    access_code_survey_url = String(
+        default=None,
+        scope=Scope.user_state,
+        help=_("The URL of the survey the access code of the user was issued for"),
+    )
+
+    access_code_validated = DateTime(
+        default=None,
+        scope=Scope.user_state,
+        help=_("The time the access code of the user was last validated against LimeSurvey"),
+    )
+
     last_login_attempt = DateTime(
         default=None,
         scope=Scope.user_state,
@@ -208,8 +168,7 @@ class LimeSurveyXBlock(XBlock):
 
     def resource_string(self, path):
         """Handy helper for getting resources from our kit."""
-        data = pkg_resources.resource_string(__name__, path)
-        return data.decode("utf8")
+        return get_resource_string(path)
 
     def render_template(self, template_path, context=None) -> str:
         """
@@ -245,20 +204,157 @@ class LimeSurveyXBlock(XBlock):
         """
         return user.opt_attrs.get("edx-platform.anonymous_user_id")
 
-    def setup_student_view_survey(self, user, anonymous_user_id):
+    def setup_student_view_survey(
+        self, user, anonymous_user_id, defer_provisioning=False, provision_siblings=True,
+    ) -> bool:
         """
         Setup LimeSurvey configurations for the student view of the XBlock.
+
+        args:
+            user: The current user
+            anonymous_user_id: The anonymous user ID of the user
+            defer_provisioning: Whether the calls to the LimeSurvey API can be
+                left to the `provision_survey` handler.
+            provision_siblings: Whether the sibling surveys of the unit are
+                provisioned in the same batch, through the request collector.
+
+        returns:
+            True if the student still needs to be provisioned by the frontend.
+        """
+        with self.trace_span("resolve_config"):
+            survey_url = self.get_survey_url()
+            if self.anonymous_survey or self.has_valid_access_code():
+                return False
+
+        try:
+            if defer_provisioning:
+                if circuit_breaker.is_open(self.get_api_url()):
+                    raise LimeSurveyUnavailable
+                return True
+
+            collector = get_request_collector() if provision_siblings else None
+            if collector is None:
+                self.provision_student(user, anonymous_user_id)
+            else:
+                collector.provision(self, user, anonymous_user_id)
+        except LimeSurveyAPIError as error:
+            if not self.has_stale_access_code(survey_url):
+                raise
+            self.use_stale_access_code(anonymous_user_id, error)
+            return False
+
+        self.set_user_state(
+            access_code_survey_url=survey_url,
+            access_code_validated=datetime.now().replace(tzinfo=pytz.utc),
+        )
+        return False
+
+    def provision_student(self, user, anonymous_user_id) -> None:
+        """
+        Check the session key and add the student to the survey if needed, setting their access code.
+        """
+        with self.trace_span("session_key"):
+            self.set_session_key()
+        self.provision_participant(user, anonymous_user_id)
+
+    def set_user_state(self, **values) -> None:
+        """
+        Assign the given user state fields whose value changed.
+
+        An XBlock field assigned before its value is cached is written when the
+        block is saved, even with its stored value. The unchanged fields are
+        skipped instead of assigned, so they're never written.
+        """
+        for name, value in values.items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+
+    @property
+    def survey_url(self) -> str:
+        """
+        The URL of the configured survey, derived from the block settings instead of persisted.
+        """
+        return self.get_survey_url()
+
+    def get_survey_url(self) -> str:
+        """
+        Return the URL of the configured survey.
+
+        Raises:
+            MisconfiguredLimeSurveyService: If the LimeSurvey URL is not set.
         """
         limesurvey_url = self.limesurvey_url or getattr(settings, "LIMESURVEY_URL", None)
         if not limesurvey_url:
             raise MisconfiguredLimeSurveyService("LIMESURVEY_URL is not set in your service configurations.")
 
-        self.survey_url = f"{limesurvey_url}/index.php/{self.survey_id}"
+        return f"{limesurvey_url}/index.php/{self.survey_id}"
 
-        if not self.anonymous_survey:
-            self.set_session_key()
-            self.add_participant_to_survey(user, anonymous_user_id)
-            self.set_student_access_code(anonymous_user_id)
+    def has_valid_access_code(self) -> bool:
+        """
+        Check whether the stored access code can be used without calling the LimeSurvey API.
+
+        The access code is revalidated when the survey changed since it was
+        issued (e.g. the survey ID was updated from Studio), when it's older
+        than `LIMESURVEY_ACCESS_CODE_MAX_AGE` seconds or when the frontend
+        reported it as invalid.
+        """
+        return self.has_access_code(self.survey_url, "LIMESURVEY_ACCESS_CODE_MAX_AGE")
+
+    def has_stale_access_code(self, survey_url: str) -> bool:
+        """
+        Check whether the stored access code can be served while LimeSurvey fails.
+
+        The access code must have been issued for the same survey and validated
+        less than `LIMESURVEY_STALE_ACCESS_CODE_MAX_AGE` seconds ago. Access codes
+        reported as invalid by the frontend are discarded, so they're never served.
+        """
+        return self.has_access_code(survey_url, "LIMESURVEY_STALE_ACCESS_CODE_MAX_AGE")
+
+    def has_access_code(self, survey_url: str, max_age_setting: str) -> bool:
+        """
+        Check whether the stored access code was issued for the survey and validated recently enough.
+
+        args:
+            survey_url: The URL of the survey the access code must have been issued for.
+            max_age_setting: Name of the setting with the maximum age of the
+                validation in seconds, None to never expire.
+        """
+        if not self.access_code or self.access_code_survey_url != survey_url:
+            return False
+
+        max_age = getattr(settings, max_age_setting, None)
+        if max_age is None:
+            return True
+
+        current_time = datetime.now().replace(tzinfo=pytz.utc)
+        return bool(self.access_code_validated) and \
+            self.access_code_validated > current_time - timedelta(seconds=max_age)
+
+    def use_stale_access_code(self, anonymous_user_id: str, error: Exception) -> None:
+        """
+        Keep the stored access code after a failed revalidation, and revalidate it in the background.
+
+        The learner is queued in the participant sync, which stores their
+        current access code once LimeSurvey answers again.
+        """
+        log.warning(
+            "Serving the stored access code of %s for survey %s after a LimeSurvey error: %s",
+            anonymous_user_id, self.survey_id, error,
+        )
+        record_stale_access_code(error)
+
+        user = get_current_user()
+        if user is None or not getattr(user, "is_authenticated", False):
+            return
+
+        # The participant sync loads the blocks, which are defined in this module
+        from limesurvey.participant_sync import (  # pylint: disable=import-outside-toplevel
+            ParticipantChange,
+            participant_sync_queue,
+        )
+        participant_sync_queue.enqueue(
+            str(self.scope_ids.usage_id), anonymous_user_id, ParticipantChange(user, enrolled=True, refresh=True),
+        )
 
     def student_view(self, show_survey):
         """
@@ -269,33 +365,74 @@ class LimeSurveyXBlock(XBlock):
         show_survey = self.is_student(user) or self.user_is_staff(user)
         anonymous_user_id = self.anonymous_user_id(user)
         error_message = None
+        deferred_provisioning = False
 
         if show_survey:
-            try:
-                self.setup_student_view_survey(user, anonymous_user_id)
-            except Exception as e:  # pylint: disable=broad-except
-                log.exception("Error while setting up student view of LimeSurveyXBlock")
-                error_message = str(e)
+            with request_budget() as budget:
+                try:
+                    with self.trace_span("setup_survey"):
+                        deferred_provisioning = self.setup_student_view_survey(
+                            user,
+                            anonymous_user_id,
+                            defer_provisioning=getattr(settings, "LIMESURVEY_DEFERRED_PROVISIONING", True),
+                        )
+                except Exception as e:  # pylint: disable=broad-except
+                    log.exception("Error while setting up student view of LimeSurveyXBlock")
+                    error_message = str(e)
+            self.log_budget("student_view", budget)
 
         context = {
             "self": self,
             "show_survey": show_survey,
             "error_message": error_message,
+            "deferred_provisioning": deferred_provisioning,
         }
 
         frag = Fragment()
-        frag.add_content(self.render_template("static/html/limesurvey.html", context))
-        frag.add_css(self.resource_string("static/css/limesurvey.css"))
+        with self.trace_span("render_template"):
+            frag.add_content(self.render_template("static/html/limesurvey.html", context))
 
-        # Add i18n js
-        statici18n_js_url = self._get_statici18n_js_url()
-        if statici18n_js_url:
-            frag.add_javascript_url(self.runtime.local_resource_url(self, statici18n_js_url))
+        with self.trace_span("assets"):
+            frag.add_css(self.resource_string("static/css/limesurvey.css"))
 
-        frag.add_javascript(self.resource_string("static/js/src/limesurvey.js"))
-        frag.initialize_js("LimeSurveyXBlock")
+            # Add i18n js
+            statici18n_js_url = self._get_statici18n_js_url()
+            if statici18n_js_url:
+                frag.add_javascript_url(self.runtime.local_resource_url(self, statici18n_js_url))
+
+            frag.add_javascript(self.resource_string("static/js/src/limesurvey.js"))
+            frag.initialize_js("LimeSurveyXBlock")
         return frag
 
+    def trace_span(self, stage: str):
+        """
+        Return a context manager tracing a stage of the block views in a span, if tracing is enabled.
+        """
+        return start_span(f"limesurvey.{stage}", self.get_span_attributes)
+
+    def get_span_attributes(self) -> dict:
+        """
+        Return the attributes of the spans of the block, without any information about the learner.
+        """
+        usage_id = self.scope_ids.usage_id
+        attributes = {
+            "limesurvey.course_id": str(getattr(usage_id, "course_key", "")),
+            "limesurvey.block_id": str(usage_id),
+            "limesurvey.survey_id": self.survey_id,
+            "limesurvey.anonymous_survey": self.anonymous_survey,
+        }
+        return {name: value for name, value in attributes.items() if value is not None}
+
+    def log_budget(self, view: str, budget) -> None:
+        """
+        Report the retries and the remaining time of the LimeSurvey API calls of a render to the metrics sink.
+        """
+        record_render_budget(view, budget)
+        log.debug(
+            "LimeSurvey API budget for %s: %d retries, %.3fs remaining of %.3fs",
+            self.scope_ids.usage_id, budget.retries, budget.remaining(), budget.seconds,
+        )
+
     def studio_view(self, context=None):
         """
         The studio view of the LimeSurveyXBlock, shown to instructors.
@@ -305,11 +442,13 @@ class LimeSurveyXBlock(XBlock):
             "limesurvey_url": self.limesurvey_url,
             "survey_id": self.survey_id,
             "anonymous_survey": self.anonymous_survey,
+            "derive_participant_tokens": self.derive_participant_tokens,
             "api_username": self.api_username,
             "api_password": self.api_password,
             "survey_id_field": self.fields["survey_id"],
             "display_name_field": self.fields["display_name"],
             "anonymous_survey_field": self.fields["anonymous_survey"],
+            "derive_participant_tokens_field": self.fields["derive_participant_tokens"],
             "limesurvey_url_field": self.fields["limesurvey_url"],
             "api_username_field": self.fields["api_username"],
             "api_password_field": self.fields["api_password"],
@@ -346,6 +485,45 @@ class LimeSurveyXBlock(XBlock):
         self.api_username = data.get("api_username", "")
         self.api_password = data.get("api_password", "")
         self.anonymous_survey = bool(data.get("anonymous_survey"))
+        self.derive_participant_tokens = bool(data.get("derive_participant_tokens"))
+
+    @XBlock.json_handler
+    def provision_survey(self, data, suffix=""):  # pylint: disable=unused-argument
+        """
+        Called by the frontend to add the student to the survey when it was deferred by the student view.
+
+        returns:
+            The survey URL and the access code of the student, or the error message.
+        """
+        user = self.runtime.service(self, "user").get_current_user()
+        if not (self.is_student(user) or self.user_is_staff(user)):
+            return {"error_message": _("The survey is only visible from the LMS.")}
+
+        with request_budget() as budget:
+            try:
+                with self.trace_span("setup_survey"):
+                    # Each deferred survey has its own handler request, which can't store the sibling access codes
+                    self.setup_student_view_survey(user, self.anonymous_user_id(user), provision_siblings=False)
+            except Exception as e:  # pylint: disable=broad-except
+                log.exception("Error while provisioning the student in LimeSurveyXBlock")
+                return {"error_message": str(e)}
+            finally:
+                self.log_budget("provision_survey", budget)
+
+        return {
+            "survey_url": self.survey_url,
+            "access_code": self.access_code,
+        }
+
+    @XBlock.json_handler
+    def report_survey_error(self, data, suffix=""):  # pylint: disable=unused-argument
+        """
+        Called by the frontend when the survey can't be loaded with the stored access code.
+
+        The access code is discarded so it's revalidated on the next view.
+        """
+        self.set_user_state(access_code=None)
+        return {"result": "success"}
 
     def get_survey_summary(self) -> dict:
         """
@@ -357,9 +535,9 @@ class LimeSurveyXBlock(XBlock):
 
         return self.call_procedure("get_summary", *params.values())
 
-    def check_user_in_survey(self, anonymous_user_id: str) -> bool:
+    def get_list_participants_params(self, anonymous_user_id: str) -> tuple:
         """
-        Check if the user is already in the survey.
+        Return the parameters of the `list_participants` call looking for the user.
         - `params` variable is a dict of parameters to pass to the API call.
             - survey_id: The ID of the survey
             - start: Retrieve participants starting from this index
@@ -370,9 +548,6 @@ class LimeSurveyXBlock(XBlock):
 
         args:
             anonymous_user_id (str): The anonymous user ID of the user
-
-        Returns:
-            bool: True if the user is in the survey, False otherwise
         """
         params = {
             "survey_id": self.survey_id,
@@ -382,8 +557,19 @@ class LimeSurveyXBlock(XBlock):
             "attributes": ["attribute_1"],
             "conditions": {"attribute_1": anonymous_user_id},
         }
+        return tuple(params.values())
 
-        response = self.call_procedure("list_participants", *params.values())
+    def check_user_in_survey(self, anonymous_user_id: str) -> bool:
+        """
+        Check if the user is already in the survey.
+
+        args:
+            anonymous_user_id (str): The anonymous user ID of the user
+
+        Returns:
+            bool: True if the user is in the survey, False otherwise
+        """
+        response = self.call_procedure("list_participants", *self.get_list_participants_params(anonymous_user_id))
 
         if isinstance(response, list):
             return len(response) > 0
@@ -406,7 +592,7 @@ class LimeSurveyXBlock(XBlock):
             {"attribute_1": anonymous_user_id}
         )
 
-        self.access_code = response.get("token", "")
+        self.set_user_state(access_code=response.get("token", ""))
 
     @staticmethod
     def get_fullname(user) -> Tuple[str, str]:
@@ -430,20 +616,14 @@ class LimeSurveyXBlock(XBlock):
 
         return first_name, last_name
 
-    def add_participant_to_survey(self, user, anonymous_user_id: str):
+    def get_participant_data(self, user, anonymous_user_id: str) -> dict:
         """
-        Add the student as participant to specified survey.
+        Return the participant data of the user for the `add_participants` call.
 
         args:
             user: The user to add as participant
             anonymous_user_id: The anonymous user ID of the user
         """
-        try:
-            self.check_user_in_survey(anonymous_user_id)
-            return None
-        except NoParticipantFound:
-            pass
-
         firstname, lastname = self.get_fullname(user)
 
         participant = {
@@ -452,20 +632,204 @@ class LimeSurveyXBlock(XBlock):
             "firstname": firstname,
             "attribute_1": anonymous_user_id,
         }
+        token = self.get_participant_token(anonymous_user_id)
+        if token:
+            participant["token"] = token
+        return participant
 
-        return self.call_procedure("add_participants", self.survey_id, [participant])
+    def derives_participant_tokens(self) -> bool:
+        """
+        Return whether the participant tokens of the survey are derived instead of generated by LimeSurvey.
+        """
+        return self.derive_participant_tokens and bool(getattr(settings, "LIMESURVEY_PARTICIPANT_TOKEN_SECRET", None))
 
-    def set_session_key(self) -> None:
+    def get_participant_token(self, anonymous_user_id: str) -> str | None:
+        """
+        Return the token of the user derived from the survey and the anonymous user ID.
+
+        Tokens are only derived when the block enables `derive_participant_tokens`
+        and `LIMESURVEY_PARTICIPANT_TOKEN_SECRET` is set. They are sent in
+        `add_participants`, so the access code is known without reading it back
+        from LimeSurvey.
+
+        args:
+            anonymous_user_id: The anonymous user ID of the user
+
+        returns:
+            The HMAC-SHA256 of the survey ID and the anonymous user ID, or None.
         """
-        Set the session key for the LimeSurvey API when expires.
+        if not self.derives_participant_tokens():
+            return None
+
+        secret = settings.LIMESURVEY_PARTICIPANT_TOKEN_SECRET
+        message = f"{self.survey_id}:{anonymous_user_id}".encode("utf8")
+        digest = hmac.new(secret.encode("utf8"), message, hashlib.sha256).hexdigest()
+        return digest[:PARTICIPANT_TOKEN_LENGTH]
+
+    def add_participant_to_survey(self, user, anonymous_user_id: str):
+        """
+        Add the student as participant to specified survey.
+
+        args:
+            user: The user to add as participant
+            anonymous_user_id: The anonymous user ID of the user
         """
         try:
-            # Check first if the current session key is still valid
-            self.get_survey_summary()
-            return
-        except InvalidSessionKey:
+            self.check_user_in_survey(anonymous_user_id)
+            return None
+        except NoParticipantFound:
             pass
 
+        participant = self.get_participant_data(user, anonymous_user_id)
+
+        return self.call_procedure("add_participants", self.survey_id, [participant])
+
+    def provision_participant(self, user, anonymous_user_id: str) -> None:
+        """
+        Add the student to the survey if needed and set their access code.
+
+        The participant lookup and the token fetch are sent in a single batch,
+        so a returning student costs one round trip. A new student is added with
+        `add_participants`, which already returns the generated token. When the
+        block derives the tokens, the student is added directly in a single call.
+
+        args:
+            user: The user to add as participant
+            anonymous_user_id: The anonymous user ID of the user
+        """
+        if self.get_participant_token(anonymous_user_id):
+            self.add_participant_with_token(user, anonymous_user_id)
+            return
+
+        with self.trace_span("participant_lookup"):
+            participants, properties = self.call_procedure_batch([
+                ("list_participants", self.get_list_participants_params(anonymous_user_id)),
+                ("get_participant_properties", (self.survey_id, {"attribute_1": anonymous_user_id})),
+            ])
+
+        if isinstance(participants, NoParticipantFound) or participants == []:
+            with self.trace_span("participant_insert"):
+                participant = self.get_participant_data(user, anonymous_user_id)
+                response = self.call_procedure("add_participants", self.survey_id, [participant])
+            token = response[0].get("token") if isinstance(response, list) and response else None
+            if token:
+                self.set_user_state(access_code=token)
+            else:
+                with self.trace_span("token_fetch"):
+                    self.set_student_access_code(anonymous_user_id)
+            return
+
+        for result in (participants, properties):
+            if isinstance(result, Exception):
+                raise result
+
+        self.set_user_state(access_code=properties.get("token", ""))
+
+    def add_participant_with_token(self, user, anonymous_user_id: str) -> None:
+        """
+        Add the student to the survey with their derived token and set it as their access code.
+
+        No lookup is needed: LimeSurvey rejects the token if the student is
+        already a participant, which leaves the existing participant as is.
+
+        Raises:
+            LimeSurveyAPIError: If the participant is rejected for another reason.
+        """
+        with self.trace_span("participant_insert"):
+            response = self.call_procedure(
+                "add_participants",
+                self.survey_id,
+                [self.get_participant_data(user, anonymous_user_id)],
+                False,
+            )
+
+        self.set_user_state(access_code=self.get_added_participant_token(response, anonymous_user_id))
+
+    def get_added_participant_token(self, response, anonymous_user_id: str) -> str | None:
+        """
+        Return the token of the student from the response of an `add_participants` call.
+
+        A derived token rejected because the student is already a participant
+        is still their token.
+
+        Raises:
+            LimeSurveyAPIError: If the participant is rejected for another reason.
+        """
+        participant = response[0] if isinstance(response, list) and response else {}
+        token = self.get_participant_token(anonymous_user_id)
+        errors = participant.get("errors")
+        if errors and not (token and "token" in errors):
+            log.error("LimeSurvey API error adding participant to survey %s: %s", self.survey_id, errors)
+            raise LimeSurveyAPIError
+        return token or participant.get("token")
+
+    @property
+    def session_key(self) -> str | None:
+        """
+        Authentication key for the LimeSurvey API shared by every block using the same API and user.
+        """
+        return self.get_client().session_key
+
+    @session_key.setter
+    def session_key(self, value: str) -> None:
+        """
+        Store the authentication key for the LimeSurvey API in the shared session manager.
+        """
+        self.get_client().session_key = value
+
+    def get_api_url(self) -> str:
+        """
+        Return the URL of the LimeSurvey internal API.
+
+        Raises:
+            LimeSurveyAPIError: If the URL is not set in the XBlock nor in the service configurations.
+        """
+        limesurvey_api_url = self.limesurvey_internal_api or getattr(settings, "LIMESURVEY_INTERNAL_API", None)
+        if not limesurvey_api_url:
+            raise LimeSurveyAPIError(_(
+                "LimeSurvey URL for the service API is not set in "
+                "your service configurations or in the XBlock."
+            ))
+        return limesurvey_api_url
+
+    def get_api_user(self) -> str | None:
+        """
+        Return the username to authenticate with the LimeSurvey API.
+        """
+        return self.api_username or getattr(settings, "LIMESURVEY_API_USER", None)
+
+    def get_api_password(self) -> str | None:
+        """
+        Return the password to authenticate with the LimeSurvey API.
+        """
+        return self.api_password or getattr(settings, "LIMESURVEY_API_PASSWORD", None)
+
+    def get_client(self) -> LimeSurveyClient:
+        """
+        Return the client of the process for the LimeSurvey API and credentials of the block.
+        """
+        return get_client(self.get_api_url(), self.get_api_user(), self.get_api_password())
+
+    def set_session_key(self) -> None:
+        """
+        Set the session key for the LimeSurvey API when there is no shared key available.
+
+        The key is not validated against the API, it's refreshed by `call_procedure`
+        only when the API reports it as invalid. A single process logs in at a
+        time, the others wait for the key it gets.
+
+        Raises:
+            LimeSurveyConnectionError: If no key was obtained in time by another process.
+        """
+        self.get_client().set_session_key(self.login)
+
+    def login(self) -> str | None:
+        """
+        Request a new session key for the LimeSurvey API, unless the user logged in recently.
+
+        returns:
+            The new session key, or None if LimeSurvey didn't return one.
+        """
         current_time = datetime.now().replace(tzinfo=pytz.utc)
         login_attempts_exceeded = self.last_login_attempt and \
         self.last_login_attempt > current_time - timedelta(
@@ -477,8 +841,8 @@ class LimeSurveyXBlock(XBlock):
             raise ExceededLoginAttempts
 
         self.last_login_attempt = datetime.now()
-        limesurvey_api_user = self.api_username or getattr(settings, "LIMESURVEY_API_USER", None)
-        limesurvey_api_password = self.api_password or getattr(settings, "LIMESURVEY_API_PASSWORD", None)
+        limesurvey_api_user = self.get_api_user()
+        limesurvey_api_password = self.get_api_password()
         if not limesurvey_api_user or not limesurvey_api_password:
             raise MisconfiguredLimeSurveyService(
                 _("LimeSurvey API user or password not configured")
@@ -491,62 +855,34 @@ class LimeSurveyXBlock(XBlock):
             get_session_key=True,
         )
 
-        if isinstance(session_key, str):
-            self.session_key = session_key
+        return session_key if isinstance(session_key, str) else None
 
     def call_procedure(self, method: str, *params, get_session_key=False) -> dict | None:
         """
-        Invoke a method on the LimeSurvey API.
+        Invoke a method on the LimeSurvey API through the client of the block.
 
         Arguments:
             method: The method to invoke
             params: The parameters to pass to the method
             get_session_key: True if the method is get_session_key, False otherwise
 
-        Returns:
-            The response from the API.
-
         Raises:
             LimeSurveyAPIError: If the API call fails.
             An exception from API_EXCEPTIONS_MAPPING if matches the error message.
         """
-        limesurvey_api_url = self.limesurvey_internal_api or getattr(settings, "LIMESURVEY_INTERNAL_API", None)
-        if not limesurvey_api_url:
-            raise LimeSurveyAPIError(_(
-                "LimeSurvey URL for the service API is not set in "
-                "your service configurations or in the XBlock."
-            ))
-
-        if get_session_key:
-            params = [*params]
-        else:
-            params = [self.session_key, *params]
-
-        payload = {
-            "method": method,
-            "params": params,
-            "id": uuid.uuid4().hex,
-        }
+        return self.get_client().call_procedure(method, *params, get_session_key=get_session_key, login=self.login)
 
-        response = requests.post(
-            url=limesurvey_api_url,
-            json=payload,
-            timeout=getattr(settings, "LIMESURVEY_API_TIMEOUT", 5),
-        )
-
-        if not response.ok:
-            raise LimeSurveyAPIError(response.text)
-
-        result = response.json().get("result")
-
-        if not isinstance(result, dict):
-            return result
+    def call_procedure_batch(self, calls: list) -> list:
+        """
+        Invoke several methods on the LimeSurvey API through the client of the block.
 
-        if result.get("status") not in ("OK", None):
-            log.error("LimeSurvey API error: %s", result.get("status"))
-            raise API_EXCEPTIONS_MAPPING[result.get("status")]
+        Arguments:
+            calls: List of (method, params) tuples, params without the session key.
 
-        return result
+        Returns:
+            A list with the result of each call, in the same order, see `LimeSurveyClient.call_procedure_batch`.
+        """
+        return self.get_client().call_procedure_batch(calls, login=self.login)
 
     def instructor_view(self, context: dict):
         """
@@ -595,13 +931,7 @@ class LimeSurveyXBlock(XBlock):
         locale_code = translation.get_language()
         if locale_code is None:
             return None
-        text_js = 'public/js/translations/{locale_code}/text.js'
-        lang_code = locale_code.split('-')[0]
-        for code in (locale_code, lang_code, 'en'):
-            if pkg_resources.resource_exists(
-                    loader.module_name, text_js.format(locale_code=code)):
-                return text_js.format(locale_code=code)
-        return None
+        return get_statici18n_js_path(locale_code)
 
     @staticmethod
     def get_dummy():
@@ -0,0 +1,210 @@
+"""
+Register the enrolled learners of a course as participants of its LimeSurvey surveys.
+
+Learners are otherwise added one at a time when they first open a survey. Running
+this command before a cohort launch registers them with batched `add_participants`
+calls and stores their access codes, so their first view doesn't call LimeSurvey.
+
+Example:
+    ./manage.py lms provision_limesurvey_participants course-v1:edX+DemoX+Demo_Course --batch-size 500
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytz
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from limesurvey.client import NoParticipantFound
+from limesurvey.course_blocks import LIMESURVEY_BLOCK_CATEGORY
+from limesurvey.edxapp_wrapper.courseware import update_student_module_state
+from limesurvey.edxapp_wrapper.student import anonymous_id_for_user, get_course_enrollments
+from limesurvey.edxapp_wrapper.xmodule import modulestore
+from limesurvey.limesurvey import LimeSurveyXBlock
+from limesurvey.participant_sync import chunks
+from limesurvey.rate_limit import BULK_POOL, rate_limit_pool
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Register the enrolled learners of a course in the closed-access surveys of the course.
+    """
+
+    help = "Register the enrolled learners of a course as participants of its LimeSurvey surveys."
+
+    def add_arguments(self, parser):
+        """
+        Add the command arguments.
+        """
+        parser.add_argument("course_key", help="Course key, e.g. course-v1:edX+DemoX+Demo_Course")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "LIMESURVEY_PROVISIONING_BATCH_SIZE", 500),
+            help="Number of participants sent in each add_participants call.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "LIMESURVEY_PROVISIONING_CONCURRENCY", 4),
+            help="Number of add_participants calls sent at the same time.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Provision the enrolled learners in every closed-access survey of the course.
+        """
+        try:
+            course_key = CourseKey.from_string(options["course_key"])
+        except InvalidKeyError as error:
+            raise CommandError(f"Invalid course key: {options['course_key']}") from error
+
+        if options["batch_size"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--batch-size and --concurrency must be positive.")
+
+        blocks = modulestore().get_items(course_key, qualifiers={"category": LIMESURVEY_BLOCK_CATEGORY})
+        for block in blocks:
+            if block.anonymous_survey:
+                self.stdout.write(f"Skipping open-access survey {block.location}")
+                continue
+
+            with rate_limit_pool(BULK_POOL):
+                added, stored = self.provision_block(
+                    course_key, block, options["batch_size"], options["concurrency"],
+                )
+            self.stdout.write(
+                f"Survey {block.survey_id} ({block.location}): "
+                f"{added} participants added, {stored} access codes stored"
+            )
+
+    @staticmethod
+    def get_existing_tokens(block, client, batch_size) -> dict:
+        """
+        Return the tokens of the participants already in the survey by anonymous user ID.
+        """
+        tokens = {}
+        start = 0
+        while True:
+            try:
+                participants = client.call_procedure(
+                    "list_participants", block.survey_id, start, batch_size, False, ["attribute_1"],
+                )
+            except NoParticipantFound:
+                break
+            if not isinstance(participants, list) or not participants:
+                break
+            for participant in participants:
+                anonymous_user_id = participant.get("attribute_1")
+                if anonymous_user_id:
+                    tokens[anonymous_user_id] = participant.get("token")
+            if len(participants) < batch_size:
+                break
+            start += batch_size
+        return tokens
+
+    def provision_block(self, course_key, block, batch_size, concurrency):
+        """
+        Provision the enrolled learners in the survey of the block.
+
+        The enrollments are read in chunks of the batch size, and each chunk is
+        provisioned end to end before the next ones are read: its missing
+        learners are added in one add_participants call and their access codes
+        stored. Up to `concurrency` chunks are sent to LimeSurvey at once.
+
+        Returns:
+            The number of participants added and of access codes stored.
+        """
+        client = block.get_client()
+        client.set_session_key()
+        survey_url = block.get_survey_url()
+        tokens = self.get_existing_tokens(block, client, batch_size)
+        validated = LimeSurveyXBlock.access_code_validated.to_json(datetime.now().replace(tzinfo=pytz.utc))
+
+        # Derived tokens are sent in the participant data and must be kept by LimeSurvey
+        create_token = not block.derives_participant_tokens()
+
+        def add_participants(participants):
+            if not participants:
+                return []
+            # The executor threads don't inherit the rate limit pool of the command
+            with rate_limit_pool(BULK_POOL):
+                return client.call_procedure("add_participants", block.survey_id, participants, create_token)
+
+        enrollments = get_course_enrollments(course_key).iterator(chunk_size=batch_size)
+        added = stored = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for window in chunks(chunks(enrollments, batch_size), concurrency):
+                users_by_chunk = [
+                    {anonymous_id_for_user(enrollment.user, course_key): enrollment.user for enrollment in chunk}
+                    for chunk in window
+                ]
+                pending = [
+                    [
+                        self.get_participant_data(block, user, anonymous_user_id)
+                        for anonymous_user_id, user in users.items() if anonymous_user_id not in tokens
+                    ]
+                    for users in users_by_chunk
+                ]
+                for users, response in zip(users_by_chunk, executor.map(add_participants, pending)):
+                    chunk_tokens = {
+                        anonymous_user_id: tokens[anonymous_user_id] for anonymous_user_id in users
+                        if anonymous_user_id in tokens
+                    }
+                    added_tokens = self.get_added_tokens(block, response)
+                    added += len(added_tokens)
+                    chunk_tokens.update(added_tokens)
+                    stored += self.store_access_codes(course_key, block, users, chunk_tokens, survey_url, validated)
+
+        return added, stored
+
+    @staticmethod
+    def get_participant_data(block, user, anonymous_user_id: str) -> dict:
+        """
+        Return the participant data of an enrolled learner.
+        """
+        profile = getattr(user, "profile", None)
+        return block.get_participant_data(
+            SimpleNamespace(emails=[user.email], full_name=getattr(profile, "name", "")),
+            anonymous_user_id,
+        )
+
+    @staticmethod
+    def get_added_tokens(block, response) -> dict:
+        """
+        Return the tokens of the participants added by an add_participants call by anonymous user ID.
+        """
+        if not isinstance(response, list):
+            log.error("Unexpected add_participants response for survey %s: %s", block.survey_id, response)
+            return {}
+        return {
+            participant.get("attribute_1"): participant["token"]
+            for participant in response
+            if participant.get("token") and not participant.get("errors")
+        }
+
+    @staticmethod
+    def store_access_codes(course_key, block, users: dict, tokens: dict, survey_url: str, validated: str) -> int:
+        """
+        Store the access codes of the learners in the user state of the block.
+
+        Returns:
+            The number of access codes stored.
+        """
+        stored = 0
+        for anonymous_user_id, user in users.items():
+            token = tokens.get(anonymous_user_id)
+            if not token:
+                continue
+            update_student_module_state(user, course_key, block.location, {
+                "access_code": token,
+                "access_code_survey_url": survey_url,
+                "access_code_validated": validated,
+            })
+            stored += 1
+        return stored
@@ -0,0 +1,247 @@
+"""
+Latency, error and payload size metrics of the LimeSurvey API calls, stale access codes served and render budgets.
+
+Metrics are sent to the sink configured in `LIMESURVEY_METRICS_SINK`, the
+dotted path of a `MetricsSink` subclass. The default sink drops them.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+DEFAULT_METRICS_SINK = "limesurvey.metrics.MetricsSink"
+
+LATENCY_METRIC = "limesurvey.api.latency"
+ERRORS_METRIC = "limesurvey.api.errors"
+PAYLOAD_SIZE_METRIC = "limesurvey.api.payload_bytes"
+STALE_ACCESS_CODES_METRIC = "limesurvey.stale_access_codes"
+RETRIES_METRIC = "limesurvey.render.retries"
+BUDGET_REMAINING_METRIC = "limesurvey.render.budget_remaining"
+
+
+class MetricsSink:
+    """
+    Sink dropping every metric, and base class of the other sinks.
+    """
+
+    # Whether the metrics are sent somewhere, so they aren't computed otherwise
+    enabled = False
+
+    def timing(self, name: str, seconds: float, tags: dict) -> None:
+        """
+        Record a duration in the histogram of the metric.
+        """
+
+    def histogram(self, name: str, value: float, tags: dict) -> None:
+        """
+        Record a value in the histogram of the metric.
+        """
+
+    def increment(self, name: str, tags: dict) -> None:
+        """
+        Increment the counter of the metric.
+        """
+
+
+class StatsdMetricsSink(MetricsSink):
+    """
+    Send the metrics to a statsd server, requires the `statsd` package.
+
+    Statsd has no tags, so they are appended to the metric name, e.g.
+    `limesurvey.api.errors.list_participants.NoParticipantFound`.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        """
+        Initialize the statsd client from the LIMESURVEY_STATSD_* settings.
+        """
+        try:
+            from statsd import StatsClient  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise ImproperlyConfigured("The statsd package is required by StatsdMetricsSink.") from error
+
+        self.client = StatsClient(
+            host=getattr(settings, "LIMESURVEY_STATSD_HOST", "localhost"),
+            port=getattr(settings, "LIMESURVEY_STATSD_PORT", 8125),
+            prefix=getattr(settings, "LIMESURVEY_STATSD_PREFIX", None),
+        )
+
+    @staticmethod
+    def get_name(name: str, tags: dict) -> str:
+        """
+        Return the statsd name of the metric with its tags.
+        """
+        return ".".join([name, *tags.values()])
+
+    def timing(self, name: str, seconds: float, tags: dict) -> None:
+        """
+        Send a duration in milliseconds.
+        """
+        self.client.timing(self.get_name(name, tags), seconds * 1000)
+
+    def histogram(self, name: str, value: float, tags: dict) -> None:
+        """
+        Send a value as a timer, so statsd aggregates its distribution.
+        """
+        self.client.timing(self.get_name(name, tags), value)
+
+    def increment(self, name: str, tags: dict) -> None:
+        """
+        Increment a counter.
+        """
+        self.client.incr(self.get_name(name, tags))
+
+
+class PrometheusMetricsSink(MetricsSink):
+    """
+    Export the metrics with the Prometheus client, requires the `prometheus_client` package.
+
+    The metrics are registered in the default registry, so they are exposed by
+    the Prometheus endpoint already served by the platform.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        """
+        Register the Prometheus metrics.
+        """
+        try:
+            # pylint: disable=import-outside-toplevel
+            from prometheus_client import Counter, Histogram
+        except ImportError as error:
+            raise ImproperlyConfigured(
+                "The prometheus_client package is required by PrometheusMetricsSink."
+            ) from error
+
+        self.metrics = {
+            LATENCY_METRIC: Histogram(
+                "limesurvey_api_latency_seconds", "Latency of the LimeSurvey API calls.", ["method"],
+            ),
+            PAYLOAD_SIZE_METRIC: Histogram(
+                "limesurvey_api_payload_bytes", "Size of the LimeSurvey API requests.", ["method"],
+                buckets=(128, 256, 512, 1024, 4096, 16384, 65536, 262144),
+            ),
+            ERRORS_METRIC: Counter(
+                "limesurvey_api_errors", "Errors of the LimeSurvey API calls.", ["method", "error"],
+            ),
+            STALE_ACCESS_CODES_METRIC: Counter(
+                "limesurvey_stale_access_codes", "Access codes served while LimeSurvey failed.", ["error"],
+            ),
+            RETRIES_METRIC: Counter(
+                "limesurvey_render_retries", "Retries of the LimeSurvey API calls made by the views.", ["view"],
+            ),
+            BUDGET_REMAINING_METRIC: Histogram(
+                "limesurvey_render_budget_remaining_seconds",
+                "Time budget left after the LimeSurvey API calls of the views.",
+                ["view"],
+            ),
+        }
+
+    def timing(self, name: str, seconds: float, tags: dict) -> None:
+        """
+        Observe a duration in seconds.
+        """
+        self.metrics[name].labels(**tags).observe(seconds)
+
+    def histogram(self, name: str, value: float, tags: dict) -> None:
+        """
+        Observe a value.
+        """
+        self.metrics[name].labels(**tags).observe(value)
+
+    def increment(self, name: str, tags: dict) -> None:
+        """
+        Increment a counter.
+        """
+        self.metrics[name].labels(**tags).inc()
+
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+
+def get_metrics_sink() -> MetricsSink:
+    """
+    Return the process-wide instance of the sink configured in `LIMESURVEY_METRICS_SINK`.
+    """
+    path = getattr(settings, "LIMESURVEY_METRICS_SINK", None) or DEFAULT_METRICS_SINK
+    sink = _sinks.get(path)
+    if sink is None:
+        with _sinks_lock:
+            sink = _sinks.get(path)
+            if sink is None:
+                sink = _sinks[path] = import_string(path)()
+    return sink
+
+
+def record_api_call(method: str, duration: float, payload, error: Exception | None = None) -> None:
+    """
+    Record the latency, the payload size and the error, if any, of a LimeSurvey API call.
+
+    args:
+        method: Name of the RPC method.
+        duration: Seconds taken by the call, including retries.
+        payload: The JSON-RPC request sent, measured only if the sink is enabled.
+        error: The exception raised or returned by the call.
+    """
+    sink = get_metrics_sink()
+    if not sink.enabled:
+        return
+    tags = {"method": method}
+    sink.timing(LATENCY_METRIC, duration, tags)
+    sink.histogram(PAYLOAD_SIZE_METRIC, len(json.dumps(payload)), tags)
+    if error is not None:
+        sink.increment(ERRORS_METRIC, {**tags, "error": type(error).__name__})
+
+
+def record_stale_access_code(error: Exception) -> None:
+    """
+    Count a stored access code served without revalidation because the LimeSurvey API failed.
+    """
+    sink = get_metrics_sink()
+    if sink.enabled:
+        sink.increment(STALE_ACCESS_CODES_METRIC, {"error": type(error).__name__})
+
+
+def record_render_budget(view: str, budget) -> None:
+    """
+    Record the retries and the remaining time of the LimeSurvey API calls made while rendering a view.
+
+    args:
+        view: Name of the view or handler.
+        budget: The RequestBudget of the render.
+    """
+    sink = get_metrics_sink()
+    if not sink.enabled:
+        return
+    tags = {"view": view}
+    for __ in range(budget.retries):
+        sink.increment(RETRIES_METRIC, tags)
+    sink.timing(BUDGET_REMAINING_METRIC, budget.remaining(), tags)
+
+
+@contextmanager
+def track_api_call(method: str, payload):
+    """
+    Record the metrics of the LimeSurvey API call made in the context.
+
+    args:
+        method: Name of the RPC method.
+        payload: The JSON-RPC request sent.
+    """
+    start = time.monotonic()
+    try:
+        yield
+    except Exception as error:
+        record_api_call(method, time.monotonic() - start, payload, error)
+        raise
+    record_api_call(method, time.monotonic() - start, payload)
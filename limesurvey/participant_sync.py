@@ -0,0 +1,243 @@
+"""
+Sync of the LimeSurvey participants with the course enrollments.
+
+Enrollment changes are queued per survey block and flushed by a background
+timer after `LIMESURVEY_ENROLLMENT_SYNC_DELAY` seconds, so the changes of a
+busy period are sent in batched `add_participants` and `delete_participants`
+calls instead of one call per learner. The queue lives in the memory of each
+process: changes still pending when a process stops are lost, and those
+learners are then provisioned on their first view as usual.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from types import SimpleNamespace
+from typing import NamedTuple
+
+import pytz
+from django.conf import settings
+from django.db import connections
+from opaque_keys.edx.keys import UsageKey
+
+from limesurvey.client import NoParticipantFound
+from limesurvey.course_blocks import get_course_limesurvey_blocks
+from limesurvey.edxapp_wrapper.courseware import update_student_module_state
+from limesurvey.edxapp_wrapper.student import anonymous_id_for_user
+from limesurvey.edxapp_wrapper.xmodule import modulestore
+from limesurvey.limesurvey import LimeSurveyXBlock
+from limesurvey.rate_limit import BULK_POOL, rate_limit_pool
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SYNC_DELAY = 30
+DEFAULT_BATCH_SIZE = 500
+
+
+def chunks(iterable, size):
+    """
+    Yield lists of at most `size` items from the iterable.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ParticipantChange(NamedTuple):
+    """
+    Pending change of a learner in the participants of a survey.
+
+    With `refresh`, the access code of an enrolled learner already registered
+    is stored again, e.g. to revalidate an access code served while
+    LimeSurvey was failing.
+    """
+
+    user: object
+    enrolled: bool
+    refresh: bool = False
+
+
+class ParticipantSyncQueue:
+    """
+    Debounced queue of the participant changes of each survey block.
+
+    Only the last change of each learner is kept, so a learner enrolling and
+    unenrolling before the flush costs no call.
+    """
+
+    def __init__(self):
+        """
+        Initialize the queue.
+        """
+        self.lock = threading.Lock()
+        self.pending = defaultdict(dict)
+        self.timer = None
+
+    def enqueue_enrollment(self, user, course_key, enrolled: bool) -> None:
+        """
+        Queue the enrollment change of the user for every LimeSurvey block of the course.
+        """
+        blocks = get_course_limesurvey_blocks(course_key)
+        if not blocks:
+            return
+
+        anonymous_user_id = anonymous_id_for_user(user, course_key)
+        for __, __, location in blocks:
+            self.enqueue(location, anonymous_user_id, ParticipantChange(user, enrolled))
+
+    def enqueue(self, location: str, anonymous_user_id: str, change: ParticipantChange) -> None:
+        """
+        Queue a participant change for the block, scheduling a flush if none is pending.
+        """
+        with self.lock:
+            self.pending[location][anonymous_user_id] = change
+            if self.timer is None:
+                self.timer = threading.Timer(
+                    getattr(settings, "LIMESURVEY_ENROLLMENT_SYNC_DELAY", DEFAULT_SYNC_DELAY),
+                    self.flush_in_background,
+                )
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush_in_background(self) -> None:
+        """
+        Flush the queue from the timer thread, closing its database connections afterwards.
+        """
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
+
+    def flush(self) -> None:
+        """
+        Send the queued changes of every block to LimeSurvey.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(dict)
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = None
+
+        with rate_limit_pool(BULK_POOL):
+            for location, changes in pending.items():
+                try:
+                    self.sync_block(location, changes)
+                except Exception:  # pylint: disable=broad-except
+                    log.exception("Error while syncing the LimeSurvey participants of %s", location)
+
+    def sync_block(self, location: str, changes: dict) -> None:
+        """
+        Add the enrolled learners missing from the survey of the block and delete the unenrolled ones.
+
+        The learners are looked up in batched `list_participants` calls first,
+        so re-enrolled learners are not added twice.
+
+        args:
+            location: Usage key of the block.
+            changes: ParticipantChange by anonymous user ID.
+        """
+        usage_key = UsageKey.from_string(location)
+        block = modulestore().get_item(usage_key)
+        if block.anonymous_survey:
+            return
+
+        batch_size = getattr(settings, "LIMESURVEY_PROVISIONING_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+        client = block.get_client()
+        client.set_session_key()
+
+        to_add, to_delete, to_refresh = [], [], {}
+        for anonymous_user_ids in chunks(changes, batch_size):
+            results = client.call_procedure_batch([
+                ("list_participants", block.get_list_participants_params(anonymous_user_id))
+                for anonymous_user_id in anonymous_user_ids
+            ])
+            for anonymous_user_id, result in zip(anonymous_user_ids, results):
+                if isinstance(result, NoParticipantFound) or result == []:
+                    participant = None
+                elif isinstance(result, Exception):
+                    log.error("Error looking up participant %s in %s: %s", anonymous_user_id, location, result)
+                    continue
+                else:
+                    participant = result[0]
+
+                change = changes[anonymous_user_id]
+                if change.enrolled and participant is None:
+                    to_add.append(anonymous_user_id)
+                elif not change.enrolled and participant is not None:
+                    to_delete.append(participant["tid"])
+                elif change.refresh and participant is not None and participant.get("token"):
+                    to_refresh[anonymous_user_id] = participant["token"]
+
+        self.add_participants(block, client, usage_key, changes, to_add, batch_size)
+        self.refresh_access_codes(block, usage_key, changes, to_refresh)
+        for token_ids in chunks(to_delete, batch_size):
+            client.call_procedure("delete_participants", block.survey_id, token_ids)
+
+        log.info(
+            "Synced the LimeSurvey participants of %s: %d added, %d deleted, %d refreshed",
+            location, len(to_add), len(to_delete), len(to_refresh),
+        )
+
+    @staticmethod
+    def refresh_access_codes(block, usage_key, changes: dict, tokens: dict) -> None:
+        """
+        Store the current access codes of learners already registered in the survey.
+
+        args:
+            tokens: Participant token by anonymous user ID.
+        """
+        validated = LimeSurveyXBlock.access_code_validated.to_json(datetime.now().replace(tzinfo=pytz.utc))
+        survey_url = block.get_survey_url()
+        for anonymous_user_id, token in tokens.items():
+            update_student_module_state(changes[anonymous_user_id].user, usage_key.course_key, usage_key, {
+                "access_code": token,
+                "access_code_survey_url": survey_url,
+                "access_code_validated": validated,
+            })
+
+    @staticmethod
+    def add_participants(
+        block, client, usage_key, changes: dict, anonymous_user_ids: list, batch_size: int,
+    ) -> None:
+        """
+        Add the learners to the survey and store their access codes.
+        """
+        create_token = not block.derives_participant_tokens()
+        validated = LimeSurveyXBlock.access_code_validated.to_json(datetime.now().replace(tzinfo=pytz.utc))
+        survey_url = block.get_survey_url()
+
+        for chunk in chunks(anonymous_user_ids, batch_size):
+            participants = []
+            for anonymous_user_id in chunk:
+                user = changes[anonymous_user_id].user
+                participants.append(block.get_participant_data(
+                    SimpleNamespace(
+                        emails=[user.email],
+                        full_name=getattr(getattr(user, "profile", None), "name", ""),
+                    ),
+                    anonymous_user_id,
+                ))
+
+            response = client.call_procedure("add_participants", block.survey_id, participants, create_token)
+            if not isinstance(response, list):
+                log.error("Unexpected add_participants response for survey %s: %s", block.survey_id, response)
+                continue
+
+            for participant in response:
+                change = changes.get(participant.get("attribute_1"))
+                if change is None or not participant.get("token") or participant.get("errors"):
+                    continue
+                update_student_module_state(change.user, usage_key.course_key, usage_key, {
+                    "access_code": participant["token"],
+                    "access_code_survey_url": survey_url,
+                    "access_code_validated": validated,
+                })
+
+
+participant_sync_queue = ParticipantSyncQueue()
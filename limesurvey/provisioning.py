@@ -0,0 +1,241 @@
+"""
+Batched provisioning of the survey blocks of a unit rendered in the same request.
+
+When the first closed-access survey of a unit is rendered, the request-scoped
+collector provisions the learner in every sibling survey that needs it, with
+one batched participant lookup and one batched insert per LimeSurvey API.
+The following blocks of the unit take their access code from the collector.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from functools import partial
+
+from crum import get_current_request
+
+from limesurvey.client import LimeSurveyConnectionError, NoParticipantFound
+from limesurvey.executor import get_provisioning_executor
+
+COLLECTOR_ATTRIBUTE = "limesurvey_provisioning_collector"
+
+
+def get_request_collector() -> ProvisioningCollector | None:
+    """
+    Return the provisioning collector of the current request, if any.
+    """
+    request = get_current_request()
+    if request is None:
+        return None
+
+    collector = getattr(request, COLLECTOR_ATTRIBUTE, None)
+    if collector is None:
+        collector = ProvisioningCollector()
+        setattr(request, COLLECTOR_ATTRIBUTE, collector)
+    return collector
+
+
+class ProvisioningCollector:
+    """
+    Access codes of the learner by (API endpoint, survey ID), shared by the blocks rendered in a request.
+
+    A failed provisioning is kept as the exception raised for it, so every
+    block of the survey reports the same error without calling the API again.
+    """
+
+    def __init__(self):
+        """
+        Initialize the collector.
+        """
+        self.access_codes = {}
+
+    @staticmethod
+    def get_key(block) -> tuple:
+        """
+        Return the key of the survey of the block.
+        """
+        return block.get_api_url(), block.survey_id
+
+    def provision(self, block, user, anonymous_user_id: str) -> None:
+        """
+        Set the access code of the learner in the survey of the block, provisioning the unit if needed.
+
+        Raises:
+            The exception raised while provisioning the survey, if any.
+        """
+        key = self.get_key(block)
+        if key not in self.access_codes:
+            blocks = self.get_pending_blocks(block)
+            if len(blocks) > 1:
+                self.provision_blocks(blocks, user, anonymous_user_id)
+            else:
+                block.provision_student(user, anonymous_user_id)
+                self.access_codes[key] = block.access_code
+
+        access_code = self.access_codes[key]
+        if isinstance(access_code, Exception):
+            raise access_code
+        block.set_user_state(access_code=access_code)
+
+    def get_pending_blocks(self, block) -> list:
+        """
+        Return the block and its sibling surveys that the learner still needs to be provisioned in.
+
+        Blocks of the same survey are only returned once.
+        """
+        blocks = {self.get_key(block): block}
+        for sibling in self.get_siblings(block):
+            try:
+                if sibling.anonymous_survey or sibling.has_valid_access_code():
+                    continue
+                key = self.get_key(sibling)
+            except Exception:  # pylint: disable=broad-except
+                # Misconfigured siblings report their error when they're rendered
+                continue
+            if key not in self.access_codes:
+                blocks.setdefault(key, sibling)
+        return list(blocks.values())
+
+    @staticmethod
+    def get_siblings(block) -> list:
+        """
+        Return the other LimeSurvey blocks of the parent of the block.
+        """
+        try:
+            parent = block.get_parent()
+        except Exception:  # pylint: disable=broad-except
+            return []
+        if parent is None:
+            return []
+
+        return [
+            child for child in parent.get_children()
+            if child is not block and child.scope_ids.block_type == block.scope_ids.block_type
+        ]
+
+    def provision_blocks(self, blocks: list, user, anonymous_user_id: str) -> None:
+        """
+        Provision the learner in the surveys of the blocks, batching the calls to each LimeSurvey API.
+
+        Groups of different endpoints or credentials can't share a batch, so
+        they're provisioned concurrently by the provisioning executor, if enabled.
+        The session keys are set and the access codes stored in the request
+        thread: the tasks only call the API, so the ones still running after
+        the deadline don't change the fields of the blocks or the collector.
+        """
+        groups = defaultdict(list)
+        for block in blocks:
+            groups[(block.get_api_url(), block.get_api_user())].append(block)
+
+        results = {}
+        for key, group in groups.items():
+            lead = group[0]
+            try:
+                with lead.trace_span("session_key"):
+                    lead.set_session_key()
+            except Exception as error:  # pylint: disable=broad-except
+                results[key] = error
+
+        pending = {key: group for key, group in groups.items() if key not in results}
+        executor = get_provisioning_executor()
+        if executor is None or len(pending) <= 1:
+            for key, group in pending.items():
+                try:
+                    results[key] = self.provision_group(group, user, anonymous_user_id)
+                except Exception as error:  # pylint: disable=broad-except
+                    results[key] = error
+        else:
+            results.update(zip(pending, executor.run([
+                (api_url, partial(self.provision_group, group, user, anonymous_user_id))
+                for (api_url, __), group in pending.items()
+            ])))
+
+        for key, result in results.items():
+            if isinstance(result, TimeoutError):
+                result = LimeSurveyConnectionError(str(result))
+            if isinstance(result, Exception):
+                for block in groups[key]:
+                    self.access_codes.setdefault(self.get_key(block), result)
+            else:
+                self.access_codes.update(result)
+
+    def provision_group(self, blocks: list, user, anonymous_user_id: str) -> dict:
+        """
+        Provision the learner in the surveys of blocks sharing the same LimeSurvey API and credentials.
+
+        The participant lookups and token fetches of every survey are sent in
+        one batch, then the learner is added to the surveys missing them in a
+        second batch. With derived tokens, only the second batch is needed.
+        The calls are sent by the client of the blocks, which logs in again
+        without the fields of the blocks if the session key expires meanwhile.
+
+        returns:
+            The access code, or the exception raised for it, by survey key.
+        """
+        lead = blocks[0]
+        client = lead.get_client()
+
+        if all(block.get_participant_token(anonymous_user_id) for block in blocks):
+            access_codes, missing = {}, blocks
+        else:
+            access_codes, missing = self.lookup_participants(lead, client, blocks, anonymous_user_id)
+
+        if not missing:
+            return access_codes
+
+        with lead.trace_span("participant_insert"):
+            responses = client.call_procedure_batch([
+                (
+                    "add_participants",
+                    (
+                        block.survey_id,
+                        [block.get_participant_data(user, anonymous_user_id)],
+                        block.get_participant_token(anonymous_user_id) is None,
+                    ),
+                )
+                for block in missing
+            ])
+
+        for block, response in zip(missing, responses):
+            key = self.get_key(block)
+            if isinstance(response, Exception):
+                access_codes[key] = response
+                continue
+            try:
+                token = block.get_added_participant_token(response, anonymous_user_id)
+                if not token:
+                    token = client.call_procedure(
+                        "get_participant_properties", block.survey_id, {"attribute_1": anonymous_user_id},
+                    ).get("token", "")
+            except Exception as error:  # pylint: disable=broad-except
+                token = error
+            access_codes[key] = token
+        return access_codes
+
+    def lookup_participants(self, lead, client, blocks: list, anonymous_user_id: str) -> tuple:
+        """
+        Look the learner up in the surveys of the blocks in a single batch.
+
+        returns:
+            The access codes found by survey key, and the blocks of the surveys
+            the learner is not a participant of.
+        """
+        calls = []
+        for block in blocks:
+            calls.append(("list_participants", block.get_list_participants_params(anonymous_user_id)))
+            calls.append(("get_participant_properties", (block.survey_id, {"attribute_1": anonymous_user_id})))
+
+        with lead.trace_span("participant_lookup"):
+            results = client.call_procedure_batch(calls)
+
+        access_codes, missing = {}, []
+        for index, block in enumerate(blocks):
+            participants, properties = results[2 * index:2 * index + 2]
+            if isinstance(participants, NoParticipantFound) or participants == []:
+                missing.append(block)
+            elif isinstance(participants, Exception):
+                access_codes[self.get_key(block)] = participants
+            elif isinstance(properties, Exception):
+                access_codes[self.get_key(block)] = properties
+            else:
+                access_codes[self.get_key(block)] = properties.get("token", "")
+        return access_codes, missing
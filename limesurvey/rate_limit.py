@@ -0,0 +1,156 @@
+"""
+Token-bucket rate limiting of the LimeSurvey API calls, shared across processes through the Django cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+from limesurvey.budget import get_current_budget
+
+RATE_LIMIT_CACHE_PREFIX = "limesurvey.rate_limit"
+
+# Calls made while rendering the views of the learners
+PROVISIONING_POOL = "provisioning"
+# Calls made by commands, background tasks and the instructor tools
+BULK_POOL = "bulk"
+
+# Buckets are kept in windows of this many seconds, each one starting with the credit left in the previous one
+BUCKET_WINDOW = 3600
+
+_current_pool = ContextVar("limesurvey_rate_limit_pool", default=PROVISIONING_POOL)
+
+
+def get_current_pool() -> str:
+    """
+    Return the rate limit pool of the calls made in the current context.
+    """
+    return _current_pool.get()
+
+
+@contextmanager
+def rate_limit_pool(pool: str):
+    """
+    Count the LimeSurvey API calls made in the context against the budget of the pool.
+    """
+    token = _current_pool.set(pool)
+    try:
+        yield
+    finally:
+        _current_pool.reset(token)
+
+
+class RateLimiter:
+    """
+    Limit the calls sent to each LimeSurvey API endpoint with a token bucket per pool.
+
+    A bucket holds up to `BURST` tokens and earns `RATE` tokens per second,
+    each RPC of a request taking one. The tokens taken are counted with atomic
+    cache increments, so the bucket is shared by every worker using the same
+    cache: a request is allowed while the tokens taken don't exceed the tokens
+    earned. When the credit of an idle bucket grows above the burst, the count
+    is moved forward by the excess, with another increment, so the unused
+    tokens don't pile up. The count of each
+    window starts from the credit left at the end of the previous one, or a
+    full bucket when there is none.
+
+    Learner renders fail fast when their bucket is empty, so the error or a
+    stale access code is shown instead of adding load to a struggling server.
+    Bulk callers wait for the tokens instead.
+    """
+
+    @staticmethod
+    def get_setting(pool: str, name: str, default=None):
+        """
+        Return the LIMESURVEY_RATE_LIMIT_<pool>_<name> setting.
+        """
+        return getattr(settings, f"LIMESURVEY_RATE_LIMIT_{pool.upper()}_{name}", default)
+
+    @staticmethod
+    def cache_key(endpoint: str, pool: str, window: int) -> str:
+        """
+        Return the cache key of the tokens taken from the bucket of the endpoint and pool in the window.
+        """
+        digest = hashlib.sha256(endpoint.encode("utf8")).hexdigest()
+        return f"{RATE_LIMIT_CACHE_PREFIX}.{digest}.{pool}.{window}"
+
+    def try_acquire(self, endpoint: str, pool: str, tokens: int = 1) -> bool:
+        """
+        Take the tokens from the bucket of the endpoint and pool, if it has enough of them.
+        """
+        rate = self.get_setting(pool, "RATE")
+        if not rate:
+            return True
+        burst = self.get_setting(pool, "BURST") or rate
+        # Requests with more calls than the burst would never fit in the bucket
+        tokens = min(tokens, burst)
+
+        now = time.time()
+        window = int(now // BUCKET_WINDOW)
+        # Tokens earned since the start of the window, plus the bucket it starts with
+        earned = (now - window * BUCKET_WINDOW) * rate + burst
+        key = self.cache_key(endpoint, pool, window)
+
+        try:
+            taken = cache.incr(key, tokens)
+        except ValueError:
+            credit = self.get_carried_credit(endpoint, pool, window, rate, burst)
+            cache.add(key, int(earned - credit), BUCKET_WINDOW * 2)
+            try:
+                taken = cache.incr(key, tokens)
+            except ValueError:
+                # Evicted since it was added, the bucket starts full again
+                return True
+
+        if taken > earned:
+            cache.decr(key, tokens)
+            return False
+        excess = int(earned - (taken - tokens) - burst)
+        if excess > 0:
+            # Only the excess is added, so the concurrent increments of other workers are kept. Two workers
+            # racing here both move the count forward, which only leaves the bucket emptier than it should be.
+            try:
+                cache.incr(key, excess)
+            except ValueError:
+                pass
+        return True
+
+    def get_carried_credit(self, endpoint: str, pool: str, window: int, rate: float, burst: int) -> float:
+        """
+        Return the tokens left in the bucket of the endpoint and pool at the end of the window before `window`.
+        """
+        taken = cache.get(self.cache_key(endpoint, pool, window - 1))
+        if taken is None:
+            return burst
+        return min(max(BUCKET_WINDOW * rate + burst - taken, 0), burst)
+
+    def acquire(self, endpoint: str, tokens: int = 1) -> bool:
+        """
+        Take the tokens for a request to the endpoint from the bucket of the current pool.
+
+        Bulk calls wait for the tokens, within the time budget of the context if any.
+
+        returns:
+            Whether the request can be sent.
+        """
+        pool = get_current_pool()
+        if self.try_acquire(endpoint, pool, tokens):
+            return True
+        if pool != BULK_POOL:
+            return False
+
+        budget = get_current_budget()
+        delay = 1 / self.get_setting(pool, "RATE")
+        while budget is None or budget.remaining() > delay:
+            time.sleep(delay)
+            if self.try_acquire(endpoint, pool, tokens):
+                return True
+        return False
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,67 @@
+"""
+Signal receivers for the LimeSurvey plugin.
+"""
+import logging
+
+from django.conf import settings
+
+from limesurvey.course_blocks import invalidate_course_limesurvey_blocks
+from limesurvey.edxapp_wrapper.student import get_enroll_status_change_signal
+from limesurvey.edxapp_wrapper.xmodule import get_course_published_signal
+from limesurvey.participant_sync import participant_sync_queue
+
+log = logging.getLogger(__name__)
+
+# Values of the `event` argument of the enrollment status change signal
+ENROLL_EVENT = "enroll"
+UNENROLL_EVENT = "unenroll"
+
+
+def invalidate_course_limesurvey_blocks_cache(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the cached LimeSurvey blocks of a course when it's published.
+    """
+    invalidate_course_limesurvey_blocks(course_key)
+
+
+def sync_enrollment_participants(  # pylint: disable=unused-argument
+    sender, event=None, user=None, course_id=None, **kwargs,
+):
+    """
+    Queue the enrollment change of the user in the LimeSurvey surveys of the course.
+    """
+    if not getattr(settings, "LIMESURVEY_ENROLLMENT_SYNC_ENABLED", False) or event not in (
+        ENROLL_EVENT, UNENROLL_EVENT,
+    ):
+        return
+
+    try:
+        participant_sync_queue.enqueue_enrollment(user, course_id, enrolled=event == ENROLL_EVENT)
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Error while queueing the LimeSurvey participant change of %s", course_id)
+
+
+def connect_receivers():
+    """
+    Connect the receivers to the Open edX signals, when running inside the platform.
+    """
+    try:
+        course_published = get_course_published_signal()
+    except ImportError:
+        log.info("Course published signal not available, the LimeSurvey blocks cache relies on its timeout.")
+    else:
+        course_published.connect(
+            invalidate_course_limesurvey_blocks_cache,
+            dispatch_uid="limesurvey.invalidate_course_limesurvey_blocks_cache",
+        )
+
+    try:
+        enroll_status_change = get_enroll_status_change_signal()
+    except ImportError:
+        log.info("Enrollment signal not available, the LimeSurvey participants are added on their first view.")
+        return
+
+    enroll_status_change.connect(
+        sync_enrollment_participants,
+        dispatch_uid="limesurvey.sync_enrollment_participants",
+    )
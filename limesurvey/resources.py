@@ -0,0 +1,75 @@
+"""
+Index of the static resources packaged with the LimeSurvey XBlock.
+
+The resources don't change while the process runs, so they're read once and
+every render gets them from memory instead of probing the filesystem.
+"""
+from __future__ import annotations
+
+import functools
+
+import pkg_resources
+
+STATIC_DIRECTORIES = ("static/css", "static/js/src")
+STATICI18N_JS_DIRECTORY = "public/js/translations"
+STATICI18N_JS_PATH = STATICI18N_JS_DIRECTORY + "/{locale_code}/text.js"
+
+
+@functools.lru_cache(maxsize=None)
+def get_static_resources() -> dict:
+    """
+    Return the content of the packaged CSS and JS files by path.
+    """
+    resources = {}
+    for directory in STATIC_DIRECTORIES:
+        if not pkg_resources.resource_isdir(__name__, directory):
+            continue
+        for name in pkg_resources.resource_listdir(__name__, directory):
+            path = f"{directory}/{name}"
+            if not pkg_resources.resource_isdir(__name__, path):
+                resources[path] = pkg_resources.resource_string(__name__, path).decode("utf8")
+    return resources
+
+
+def get_resource_string(path: str) -> str:
+    """
+    Return the content of a packaged resource, from the index when available.
+    """
+    resources = get_static_resources()
+    if path in resources:
+        return resources[path]
+    return pkg_resources.resource_string(__name__, path).decode("utf8")
+
+
+@functools.lru_cache(maxsize=None)
+def get_statici18n_locales() -> frozenset:
+    """
+    Return the locale codes with a packaged JavaScript translations file.
+    """
+    if not pkg_resources.resource_isdir(__name__, STATICI18N_JS_DIRECTORY):
+        return frozenset()
+    return frozenset(
+        locale_code
+        for locale_code in pkg_resources.resource_listdir(__name__, STATICI18N_JS_DIRECTORY)
+        if pkg_resources.resource_exists(__name__, STATICI18N_JS_PATH.format(locale_code=locale_code))
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_statici18n_js_path(locale_code: str) -> str | None:
+    """
+    Return the JavaScript translations file for the locale, falling back to its language and to English.
+    """
+    locales = get_statici18n_locales()
+    for code in (locale_code, locale_code.split("-")[0], "en"):
+        if code in locales:
+            return STATICI18N_JS_PATH.format(locale_code=code)
+    return None
+
+
+def build_resources_index() -> None:
+    """
+    Read the packaged resources so no render has to.
+    """
+    get_static_resources()
+    get_statici18n_locales()
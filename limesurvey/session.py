@@ -0,0 +1,127 @@
+"""
+Process-wide management of LimeSurvey RemoteControl session keys.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from limesurvey.budget import get_current_budget
+
+SESSION_KEY_CACHE_PREFIX = "limesurvey.session_key"
+
+# LimeSurvey expires RemoteControl sessions after 2 hours by default
+# (``iSessionExpirationTime``), the cached keys expire a few minutes before.
+DEFAULT_SESSION_KEY_TTL = 6600
+
+DEFAULT_LOCK_TIMEOUT = 10
+POLL_INTERVAL = 0.05
+
+
+class LimeSurveySessionManager:
+    """
+    Share LimeSurvey session keys between blocks, threads and processes.
+
+    Keys are stored in the Django cache and indexed by the internal API URL
+    and the API user, so every block configured against the same service and
+    credentials reuses the same LimeSurvey session. New keys are requested
+    under a lock in the same cache, so a single process logs in when the
+    shared key expires.
+    """
+
+    @staticmethod
+    def cache_key(api_url: str, api_user: str) -> str:
+        """
+        Return the cache key for the session of the given API URL and user.
+
+        The parts are hashed so the key is valid for any cache backend.
+        """
+        digest = hashlib.sha256(f"{api_url}|{api_user}".encode("utf8")).hexdigest()
+        return f"{SESSION_KEY_CACHE_PREFIX}.{digest}"
+
+    @staticmethod
+    def timeout() -> int:
+        """
+        Return the time in seconds a session key is kept in the cache.
+        """
+        return getattr(settings, "LIMESURVEY_SESSION_KEY_TTL", DEFAULT_SESSION_KEY_TTL)
+
+    def get(self, api_url: str, api_user: str) -> str | None:
+        """
+        Return the cached session key for the API URL and user, if any.
+        """
+        return cache.get(self.cache_key(api_url, api_user))
+
+    def set(self, api_url: str, api_user: str, session_key: str) -> None:
+        """
+        Store the session key for the API URL and user.
+        """
+        cache.set(self.cache_key(api_url, api_user), session_key, self.timeout())
+
+    @staticmethod
+    def lock_timeout() -> int:
+        """
+        Return the time in seconds a login holds the lock, and the others wait for it.
+        """
+        return getattr(settings, "LIMESURVEY_SESSION_KEY_LOCK_TIMEOUT", DEFAULT_LOCK_TIMEOUT)
+
+    def refresh(self, api_url: str, api_user: str, login: Callable[[], str | None]) -> str | None:
+        """
+        Return the session key for the API URL and user, logging in if there is none.
+
+        Only the caller holding the lock of the API URL and user logs in. The
+        others wait for the key it stores, and try to log in themselves if the
+        lock is released without a key, e.g. when the login failed.
+
+        args:
+            login: Function requesting a new session key to LimeSurvey.
+
+        Raises:
+            TimeoutError: If no key was stored before the lock timeout or the
+                time budget of the render is over.
+        """
+        lock_key = f"{self.cache_key(api_url, api_user)}.lock"
+        wait = self.lock_timeout()
+        budget = get_current_budget()
+        if budget is not None:
+            wait = budget.timeout(wait)
+        deadline = time.monotonic() + wait
+
+        while True:
+            session_key = self.get(api_url, api_user)
+            if session_key:
+                return session_key
+
+            if cache.add(lock_key, True, self.lock_timeout()):
+                try:
+                    # The key may have been stored between the first check and the lock
+                    session_key = self.get(api_url, api_user) or login()
+                    if session_key:
+                        self.set(api_url, api_user, session_key)
+                    return session_key
+                finally:
+                    cache.delete(lock_key)
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError("Timed out waiting for the LimeSurvey session key.")
+            time.sleep(POLL_INTERVAL)
+
+    def invalidate(self, api_url: str, api_user: str, session_key: str | None = None) -> None:
+        """
+        Remove the cached session key for the API URL and user.
+
+        args:
+            session_key: When set, the key is only removed if it is still the
+                cached one, so a key already refreshed by another worker is kept.
+        """
+        key = self.cache_key(api_url, api_user)
+        if session_key is not None and cache.get(key) != session_key:
+            return
+        cache.delete(key)
+
+
+session_manager = LimeSurveySessionManager()
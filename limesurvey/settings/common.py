@@ -13,7 +13,89 @@ def plugin_settings(settings):
     settings.LIMESURVEY_API_TIMEOUT = 5
     settings.LIMESURVEY_API_USER = None
     settings.LIMESURVEY_API_PASSWORD = None
+    # Shared session keys expire a bit before LimeSurvey's 2 hours session lifetime
+    settings.LIMESURVEY_SESSION_KEY_TTL = 6600
+
+    # Pooled keep-alive HTTP transport for the LimeSurvey API
+    settings.LIMESURVEY_HTTP_POOL_CONNECTIONS = 10
+    settings.LIMESURVEY_HTTP_POOL_MAXSIZE = 10
+    settings.LIMESURVEY_HTTP_MAX_RETRIES = 0
+    settings.LIMESURVEY_HTTP_RETRY_BACKOFF_FACTOR = 0.1
+    settings.LIMESURVEY_HTTP_KEEP_ALIVE = True
+
+    # Seconds a stored access code is used without revalidation, None to never expire
+    settings.LIMESURVEY_ACCESS_CODE_MAX_AGE = 86400
+
+    # Leave the LimeSurvey API calls of new learners to a handler called by the frontend for each survey.
+    # The surveys of a unit are only provisioned in batches, and concurrently, when this is disabled.
+    settings.LIMESURVEY_DEFERRED_PROVISIONING = True
+
+    # Bulk provisioning defaults for the provision_limesurvey_participants command
+    settings.LIMESURVEY_PROVISIONING_BATCH_SIZE = 500
+    settings.LIMESURVEY_PROVISIONING_CONCURRENCY = 4
+
+    # Circuit breaker for the LimeSurvey API, slow calls (in seconds) count as failures
+    settings.LIMESURVEY_CIRCUIT_BREAKER_ENABLED = True
+    settings.LIMESURVEY_CIRCUIT_BREAKER_FAILURE_RATE = 0.5
+    settings.LIMESURVEY_CIRCUIT_BREAKER_MIN_CALLS = 10
+    settings.LIMESURVEY_CIRCUIT_BREAKER_WINDOW = 60
+    settings.LIMESURVEY_CIRCUIT_BREAKER_SLOW_CALL = 3
+    settings.LIMESURVEY_CIRCUIT_BREAKER_RESET_TIMEOUT = 30
+
+    # Retries of idempotent LimeSurvey API calls, bounded by the time budget (in seconds) of each render
+    settings.LIMESURVEY_API_RETRIES = 2
+    settings.LIMESURVEY_API_RETRY_BACKOFF = 0.1
+    settings.LIMESURVEY_API_RETRY_BACKOFF_MAX = 1
+    settings.LIMESURVEY_RENDER_BUDGET = 4
+
+    # Timeout of the cached LimeSurvey blocks of each course, also invalidated when the course is published
+    settings.LIMESURVEY_COURSE_BLOCKS_CACHE_TTL = 86400
+
+    # Sink of the LimeSurvey API metrics, e.g. "limesurvey.metrics.StatsdMetricsSink"
+    settings.LIMESURVEY_METRICS_SINK = "limesurvey.metrics.MetricsSink"
+    settings.LIMESURVEY_STATSD_HOST = "localhost"
+    settings.LIMESURVEY_STATSD_PORT = 8125
+    settings.LIMESURVEY_STATSD_PREFIX = None
+
+    # Trace the stages of the student view in OpenTelemetry spans, requires the opentelemetry-api package
+    settings.LIMESURVEY_TRACING_ENABLED = False
+
+    # Secret to derive the participant tokens instead of reading them back from LimeSurvey, disabled if empty
+    settings.LIMESURVEY_PARTICIPANT_TOKEN_SECRET = None
+
+    # Sync the participants of closed-access surveys with the course enrollments, flushing the changes every few seconds
+    settings.LIMESURVEY_ENROLLMENT_SYNC_ENABLED = False
+    settings.LIMESURVEY_ENROLLMENT_SYNC_DELAY = 30
+
+    # Threads provisioning the surveys of different LimeSurvey APIs of a unit concurrently (0 to disable), per API
+    # limit, used when LIMESURVEY_DEFERRED_PROVISIONING is disabled
+    settings.LIMESURVEY_PROVISIONING_THREADS = 8
+    settings.LIMESURVEY_PROVISIONING_ENDPOINT_CONCURRENCY = 4
+
+    # Seconds a stored access code is still served while LimeSurvey fails, None to never expire, 0 to disable
+    settings.LIMESURVEY_STALE_ACCESS_CODE_MAX_AGE = 604800
+
+    # Share identical concurrent read-only LimeSurvey API calls, across processes through the cache if shared,
+    # waiting at most the lock timeout
+    settings.LIMESURVEY_SINGLE_FLIGHT_ENABLED = True
+    settings.LIMESURVEY_SINGLE_FLIGHT_SHARED = False
+    settings.LIMESURVEY_SINGLE_FLIGHT_LOCK_TIMEOUT = 5
+    settings.LIMESURVEY_SINGLE_FLIGHT_RESULT_TTL = 2
+
+    # Seconds a session key login holds its lock, other workers wait for its key at most that long
+    settings.LIMESURVEY_SESSION_KEY_LOCK_TIMEOUT = 10
+
+    # Token buckets of the calls to each LimeSurvey API shared through the cache, in calls per second
+    # (None to disable) and burst size, for the learner views and for the bulk tools
+    settings.LIMESURVEY_RATE_LIMIT_PROVISIONING_RATE = None
+    settings.LIMESURVEY_RATE_LIMIT_PROVISIONING_BURST = None
+    settings.LIMESURVEY_RATE_LIMIT_BULK_RATE = None
+    settings.LIMESURVEY_RATE_LIMIT_BULK_BURST = None
+
+    # Requests in flight at once for each asyncio LimeSurvey client of the bulk tools
+    settings.LIMESURVEY_ASYNC_CONCURRENCY = 10
 
     # Limesurvey backend settings
     settings.LIMESURVEY_COURSEWARE_BACKEND = "limesurvey.edxapp_wrapper.backends.courseware_p_v1"
     settings.LIMESURVEY_XMODULE_BACKEND = "limesurvey.edxapp_wrapper.backends.xmodule_p_v1"
+    settings.LIMESURVEY_STUDENT_BACKEND = "limesurvey.edxapp_wrapper.backends.student_p_v1"
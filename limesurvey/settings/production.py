@@ -22,6 +22,174 @@ def plugin_settings(settings):
         "LIMESURVEY_API_PASSWORD",
         settings.LIMESURVEY_API_PASSWORD
     )
+    settings.LIMESURVEY_SESSION_KEY_TTL = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_SESSION_KEY_TTL",
+        settings.LIMESURVEY_SESSION_KEY_TTL
+    )
+    settings.LIMESURVEY_HTTP_POOL_CONNECTIONS = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_HTTP_POOL_CONNECTIONS",
+        settings.LIMESURVEY_HTTP_POOL_CONNECTIONS
+    )
+    settings.LIMESURVEY_HTTP_POOL_MAXSIZE = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_HTTP_POOL_MAXSIZE",
+        settings.LIMESURVEY_HTTP_POOL_MAXSIZE
+    )
+    settings.LIMESURVEY_HTTP_MAX_RETRIES = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_HTTP_MAX_RETRIES",
+        settings.LIMESURVEY_HTTP_MAX_RETRIES
+    )
+    settings.LIMESURVEY_HTTP_RETRY_BACKOFF_FACTOR = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_HTTP_RETRY_BACKOFF_FACTOR",
+        settings.LIMESURVEY_HTTP_RETRY_BACKOFF_FACTOR
+    )
+    settings.LIMESURVEY_HTTP_KEEP_ALIVE = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_HTTP_KEEP_ALIVE",
+        settings.LIMESURVEY_HTTP_KEEP_ALIVE
+    )
+    settings.LIMESURVEY_ACCESS_CODE_MAX_AGE = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_ACCESS_CODE_MAX_AGE",
+        settings.LIMESURVEY_ACCESS_CODE_MAX_AGE
+    )
+    settings.LIMESURVEY_DEFERRED_PROVISIONING = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_DEFERRED_PROVISIONING",
+        settings.LIMESURVEY_DEFERRED_PROVISIONING
+    )
+    settings.LIMESURVEY_PROVISIONING_BATCH_SIZE = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_PROVISIONING_BATCH_SIZE",
+        settings.LIMESURVEY_PROVISIONING_BATCH_SIZE
+    )
+    settings.LIMESURVEY_PROVISIONING_CONCURRENCY = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_PROVISIONING_CONCURRENCY",
+        settings.LIMESURVEY_PROVISIONING_CONCURRENCY
+    )
+    settings.LIMESURVEY_CIRCUIT_BREAKER_ENABLED = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_CIRCUIT_BREAKER_ENABLED",
+        settings.LIMESURVEY_CIRCUIT_BREAKER_ENABLED
+    )
+    settings.LIMESURVEY_CIRCUIT_BREAKER_FAILURE_RATE = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_CIRCUIT_BREAKER_FAILURE_RATE",
+        settings.LIMESURVEY_CIRCUIT_BREAKER_FAILURE_RATE
+    )
+    settings.LIMESURVEY_CIRCUIT_BREAKER_MIN_CALLS = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_CIRCUIT_BREAKER_MIN_CALLS",
+        settings.LIMESURVEY_CIRCUIT_BREAKER_MIN_CALLS
+    )
+    settings.LIMESURVEY_CIRCUIT_BREAKER_WINDOW = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_CIRCUIT_BREAKER_WINDOW",
+        settings.LIMESURVEY_CIRCUIT_BREAKER_WINDOW
+    )
+    settings.LIMESURVEY_CIRCUIT_BREAKER_SLOW_CALL = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_CIRCUIT_BREAKER_SLOW_CALL",
+        settings.LIMESURVEY_CIRCUIT_BREAKER_SLOW_CALL
+    )
+    settings.LIMESURVEY_CIRCUIT_BREAKER_RESET_TIMEOUT = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_CIRCUIT_BREAKER_RESET_TIMEOUT",
+        settings.LIMESURVEY_CIRCUIT_BREAKER_RESET_TIMEOUT
+    )
+    settings.LIMESURVEY_API_RETRIES = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_API_RETRIES",
+        settings.LIMESURVEY_API_RETRIES
+    )
+    settings.LIMESURVEY_API_RETRY_BACKOFF = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_API_RETRY_BACKOFF",
+        settings.LIMESURVEY_API_RETRY_BACKOFF
+    )
+    settings.LIMESURVEY_API_RETRY_BACKOFF_MAX = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_API_RETRY_BACKOFF_MAX",
+        settings.LIMESURVEY_API_RETRY_BACKOFF_MAX
+    )
+    settings.LIMESURVEY_RENDER_BUDGET = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_RENDER_BUDGET",
+        settings.LIMESURVEY_RENDER_BUDGET
+    )
+    settings.LIMESURVEY_COURSE_BLOCKS_CACHE_TTL = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_COURSE_BLOCKS_CACHE_TTL",
+        settings.LIMESURVEY_COURSE_BLOCKS_CACHE_TTL
+    )
+    settings.LIMESURVEY_METRICS_SINK = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_METRICS_SINK",
+        settings.LIMESURVEY_METRICS_SINK
+    )
+    settings.LIMESURVEY_STATSD_HOST = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_STATSD_HOST",
+        settings.LIMESURVEY_STATSD_HOST
+    )
+    settings.LIMESURVEY_STATSD_PORT = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_STATSD_PORT",
+        settings.LIMESURVEY_STATSD_PORT
+    )
+    settings.LIMESURVEY_STATSD_PREFIX = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_STATSD_PREFIX",
+        settings.LIMESURVEY_STATSD_PREFIX
+    )
+    settings.LIMESURVEY_TRACING_ENABLED = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_TRACING_ENABLED",
+        settings.LIMESURVEY_TRACING_ENABLED
+    )
+    settings.LIMESURVEY_PARTICIPANT_TOKEN_SECRET = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_PARTICIPANT_TOKEN_SECRET",
+        settings.LIMESURVEY_PARTICIPANT_TOKEN_SECRET
+    )
+    settings.LIMESURVEY_ENROLLMENT_SYNC_ENABLED = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_ENROLLMENT_SYNC_ENABLED",
+        settings.LIMESURVEY_ENROLLMENT_SYNC_ENABLED
+    )
+    settings.LIMESURVEY_ENROLLMENT_SYNC_DELAY = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_ENROLLMENT_SYNC_DELAY",
+        settings.LIMESURVEY_ENROLLMENT_SYNC_DELAY
+    )
+    settings.LIMESURVEY_PROVISIONING_THREADS = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_PROVISIONING_THREADS",
+        settings.LIMESURVEY_PROVISIONING_THREADS
+    )
+    settings.LIMESURVEY_PROVISIONING_ENDPOINT_CONCURRENCY = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_PROVISIONING_ENDPOINT_CONCURRENCY",
+        settings.LIMESURVEY_PROVISIONING_ENDPOINT_CONCURRENCY
+    )
+    settings.LIMESURVEY_STALE_ACCESS_CODE_MAX_AGE = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_STALE_ACCESS_CODE_MAX_AGE",
+        settings.LIMESURVEY_STALE_ACCESS_CODE_MAX_AGE
+    )
+    settings.LIMESURVEY_SINGLE_FLIGHT_ENABLED = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_SINGLE_FLIGHT_ENABLED",
+        settings.LIMESURVEY_SINGLE_FLIGHT_ENABLED
+    )
+    settings.LIMESURVEY_SINGLE_FLIGHT_SHARED = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_SINGLE_FLIGHT_SHARED",
+        settings.LIMESURVEY_SINGLE_FLIGHT_SHARED
+    )
+    settings.LIMESURVEY_SINGLE_FLIGHT_LOCK_TIMEOUT = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_SINGLE_FLIGHT_LOCK_TIMEOUT",
+        settings.LIMESURVEY_SINGLE_FLIGHT_LOCK_TIMEOUT
+    )
+    settings.LIMESURVEY_SINGLE_FLIGHT_RESULT_TTL = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_SINGLE_FLIGHT_RESULT_TTL",
+        settings.LIMESURVEY_SINGLE_FLIGHT_RESULT_TTL
+    )
+    settings.LIMESURVEY_SESSION_KEY_LOCK_TIMEOUT = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_SESSION_KEY_LOCK_TIMEOUT",
+        settings.LIMESURVEY_SESSION_KEY_LOCK_TIMEOUT
+    )
+    settings.LIMESURVEY_RATE_LIMIT_PROVISIONING_RATE = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_RATE_LIMIT_PROVISIONING_RATE",
+        settings.LIMESURVEY_RATE_LIMIT_PROVISIONING_RATE
+    )
+    settings.LIMESURVEY_RATE_LIMIT_PROVISIONING_BURST = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_RATE_LIMIT_PROVISIONING_BURST",
+        settings.LIMESURVEY_RATE_LIMIT_PROVISIONING_BURST
+    )
+    settings.LIMESURVEY_RATE_LIMIT_BULK_RATE = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_RATE_LIMIT_BULK_RATE",
+        settings.LIMESURVEY_RATE_LIMIT_BULK_RATE
+    )
+    settings.LIMESURVEY_RATE_LIMIT_BULK_BURST = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_RATE_LIMIT_BULK_BURST",
+        settings.LIMESURVEY_RATE_LIMIT_BULK_BURST
+    )
+    settings.LIMESURVEY_ASYNC_CONCURRENCY = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_ASYNC_CONCURRENCY",
+        settings.LIMESURVEY_ASYNC_CONCURRENCY
+    )
 
     # Limesurvey backend settings
     settings.LIMESURVEY_COURSEWARE_BACKEND = getattr(settings, "ENV_TOKENS", {}).get(
@@ -32,3 +200,7 @@ def plugin_settings(settings):
         "LIMESURVEY_XMODULE_BACKEND",
         settings.LIMESURVEY_XMODULE_BACKEND
     )
+    settings.LIMESURVEY_STUDENT_BACKEND = getattr(settings, "ENV_TOKENS", {}).get(
+        "LIMESURVEY_STUDENT_BACKEND",
+        settings.LIMESURVEY_STUDENT_BACKEND
+    )
@@ -57,6 +57,7 @@ LIMESURVEY_INTERNAL_API = "https://test-url.com/index.php/admin/remotecontrol"
 # Limesurvey backend settings
 LIMESURVEY_COURSEWARE_BACKEND = "limesurvey.edxapp_wrapper.backends.courseware_p_v1"
 LIMESURVEY_XMODULE_BACKEND = "limesurvey.edxapp_wrapper.backends.xmodule_p_v1"
+LIMESURVEY_STUDENT_BACKEND = "limesurvey.edxapp_wrapper.backends.student_p_v1"
 
 # LimeSurvey features settings
 FEATURES = {
@@ -0,0 +1,155 @@
+"""
+Coalescing of identical concurrent read-only calls to the LimeSurvey API.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from limesurvey.budget import get_current_budget
+
+SINGLE_FLIGHT_CACHE_PREFIX = "limesurvey.single_flight"
+
+DEFAULT_LOCK_TIMEOUT = 5
+DEFAULT_RESULT_TTL = 2
+POLL_INTERVAL = 0.05
+
+
+class Flight:
+    """
+    Call in progress, shared by the threads waiting for its result.
+    """
+
+    def __init__(self):
+        """
+        Initialize the call.
+        """
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Share one in-flight LimeSurvey API call between identical concurrent callers.
+
+    Within a process, the first caller of a key (the leader) sends the call and
+    the others wait for its result or error. With `LIMESURVEY_SINGLE_FLIGHT_SHARED`,
+    the leader also takes a short-lived lock in the Django cache and stores its
+    result there, so the leaders of the other processes reuse it too. Callers
+    never wait longer than the lock timeout or their time budget: they send the
+    call themselves instead.
+    """
+
+    def __init__(self):
+        """
+        Initialize the calls in progress.
+        """
+        self.lock = threading.Lock()
+        self.flights = {}
+
+    @staticmethod
+    def get_setting(name: str, default):
+        """
+        Return the LIMESURVEY_SINGLE_FLIGHT_<name> setting.
+        """
+        return getattr(settings, f"LIMESURVEY_SINGLE_FLIGHT_{name}", default)
+
+    def enabled(self) -> bool:
+        """
+        Return whether the calls are coalesced.
+        """
+        return self.get_setting("ENABLED", True)
+
+    @staticmethod
+    def get_key(endpoint: str, api_user: str | None, method: str, params) -> str:
+        """
+        Return the key identifying a call, hashed so it's valid for any cache backend.
+
+        args:
+            params: The parameters of the call, without the session key.
+        """
+        call = json.dumps([endpoint, api_user, method, params], sort_keys=True, default=str)
+        return hashlib.sha256(call.encode("utf8")).hexdigest()
+
+    def get_wait_timeout(self) -> float:
+        """
+        Return the seconds a caller waits for the result of another one.
+        """
+        timeout = self.get_setting("LOCK_TIMEOUT", DEFAULT_LOCK_TIMEOUT)
+        budget = get_current_budget()
+        return timeout if budget is None else budget.timeout(timeout)
+
+    def do(self, key: str, function: Callable):
+        """
+        Return the result of the function, shared with the concurrent callers of the same key.
+
+        Raises:
+            The exception raised by the function, for the leader and its followers.
+        """
+        if not self.enabled():
+            return function()
+
+        with self.lock:
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = Flight()
+
+        if not leader:
+            if not flight.done.wait(self.get_wait_timeout()):
+                return function()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            flight.result = self.do_shared(key, function)
+            return flight.result
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+
+    def do_shared(self, key: str, function: Callable):
+        """
+        Return the result of the function, shared with the other processes if enabled.
+        """
+        if not self.get_setting("SHARED", False):
+            return function()
+
+        lock_key = f"{SINGLE_FLIGHT_CACHE_PREFIX}.{key}.lock"
+        result_key = f"{SINGLE_FLIGHT_CACHE_PREFIX}.{key}.result"
+        lock_timeout = self.get_setting("LOCK_TIMEOUT", DEFAULT_LOCK_TIMEOUT)
+
+        if not cache.add(lock_key, True, lock_timeout):
+            deadline = time.monotonic() + self.get_wait_timeout()
+            while time.monotonic() < deadline:
+                stored = cache.get(result_key)
+                if stored is not None:
+                    return stored[0]
+                if cache.get(lock_key) is None:
+                    break
+                time.sleep(POLL_INTERVAL)
+            return function()
+
+        try:
+            result = function()
+            # Wrapped so a None result can be told apart from a missing one
+            cache.set(result_key, (result,), self.get_setting("RESULT_TTL", DEFAULT_RESULT_TTL))
+            return result
+        finally:
+            cache.delete(lock_key)
+
+
+single_flight = SingleFlight()
@@ -1 +1,40 @@
-// /* Javascript for LimeSurveyXBlock. */
+/* Javascript for LimeSurveyXBlock. */
+function LimeSurveyXBlock(runtime, element) {
+
+    function showError(errorMessage) {
+        $(element).find('.survey-loading').remove();
+        $(element).find('.survey-error-message').text(errorMessage);
+        $(element).find('.survey-error').removeAttr('hidden');
+        $(element).find('.survey-reload').hide();
+    }
+
+    if ($(element).find('.survey-loading').length) {
+        var provisionUrl = runtime.handlerUrl(element, 'provision_survey');
+        $.post(provisionUrl, JSON.stringify({})).done(function(response) {
+            if (response.error_message) {
+                showError(response.error_message);
+                return;
+            }
+            var src = response.survey_url;
+            if (response.access_code) {
+                src += '?token=' + encodeURIComponent(response.access_code);
+            }
+            $('<iframe>').attr({
+                'class': 'survey-iframe',
+                'src': src,
+                'frameborder': '0'
+            }).insertAfter($(element).find('.survey-loading'));
+            $(element).find('.survey-loading').remove();
+        }).fail(function() {
+            showError(gettext('The survey service is not available.'));
+        });
+    }
+
+    $(element).find('.survey-reload-link').bind('click', function(e) {
+        e.preventDefault();
+        var handlerUrl = runtime.handlerUrl(element, 'report_survey_error');
+        $.post(handlerUrl, JSON.stringify({})).done(function(response) {
+            window.location.reload(false);
+        });
+    });
+}
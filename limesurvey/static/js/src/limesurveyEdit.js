@@ -10,6 +10,7 @@ function LimeSurveyXBlock(runtime, element) {
             api_username: $(element).find('input[name=limesurvey_api_username]').val(),
             api_password: $(element).find('input[name=limesurvey_api_password]').val(),
             anonymous_survey: Number($(element).find('select[name=limesurvey_anonymous_survey]').val()),
+            derive_participant_tokens: Number($(element).find('select[name=limesurvey_derive_participant_tokens]').val()),
         };
         $.post(handlerUrl, JSON.stringify(data)).done(function(response) {
           window.location.reload(false);
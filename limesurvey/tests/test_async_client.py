@@ -0,0 +1,160 @@
+"""
+Tests for the asyncio LimeSurvey client against the fake LimeSurvey server.
+"""
+import asyncio
+import time
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from xblock.field_data import DictFieldData
+
+from limesurvey.async_client import AsyncLimeSurveyClient
+from limesurvey.limesurvey import InvalidCredentials, LimeSurveyXBlock, NoParticipantFound
+from limesurvey.rate_limit import BULK_POOL, get_current_pool
+from test_utils.mixins import FakeLimeSurveyMixin
+
+SURVEY_ID = 123456
+
+
+class TestAsyncLimeSurveyClient(FakeLimeSurveyMixin, TestCase):
+    """
+    Test suite for the asyncio LimeSurvey client.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a slow fake LimeSurvey server.
+        """
+        self.server = self.start_fake_limesurvey(
+            {
+                "LIMESURVEY_API_USER": "test-user",
+                "LIMESURVEY_API_PASSWORD": "test-password",
+                "LIMESURVEY_API_RETRY_BACKOFF": 0,
+            },
+            latency=0.2,
+            username="test-user",
+            password="test-password",
+        )
+
+    def run_client(self, function, concurrency=None, password="test-password"):
+        """
+        Run the coroutine function with a client of the fake server.
+        """
+        async def main():
+            async with AsyncLimeSurveyClient(self.server.url, "test-user", password, concurrency) as client:
+                return await function(client)
+
+        return asyncio.run(main())
+
+    def test_calls_overlap(self):
+        """
+        Check concurrent calls wait on the network at the same time.
+
+        Expected result:
+            - Ten calls take much less than ten times the latency of the server.
+        """
+        start = time.monotonic()
+
+        results = self.run_client(
+            lambda client: asyncio.gather(*(client.call_procedure("get_summary", SURVEY_ID) for __ in range(10)))
+        )
+
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertEqual([0] * 10, [result["completed_responses"] for result in results])
+        self.assertEqual(1, self.server.limesurvey.calls["get_session_key"])
+
+    def test_bounded_concurrency(self):
+        """
+        Check no more requests than the concurrency are in flight at once.
+
+        Expected result:
+            - Four calls with a concurrency of two take at least two latencies.
+        """
+        async def summaries(client):
+            await client.get_session_key()
+            return await asyncio.gather(*(client.call_procedure("get_summary", SURVEY_ID) for __ in range(4)))
+
+        start = time.monotonic()
+        self.run_client(summaries, concurrency=2)
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.2 * 3)
+
+    def test_client_created_outside_event_loop(self):
+        """
+        Check a client created before the event loop runs can bound its calls in that loop.
+
+        Expected result:
+            - The calls contending for the client succeed.
+        """
+        client = AsyncLimeSurveyClient(self.server.url, "test-user", "test-password", concurrency=2)
+        self.addCleanup(client.close)
+
+        async def summaries():
+            return await asyncio.gather(*(client.call_procedure("get_summary", SURVEY_ID) for __ in range(4)))
+
+        results = asyncio.run(summaries())
+
+        self.assertEqual([0] * 4, [result["completed_responses"] for result in results])
+
+    def test_error_mapping(self):
+        """
+        Check the LimeSurvey errors are raised as the exceptions of the XBlock.
+
+        Expected result:
+            - NoParticipantFound is returned for the failed call of the batch.
+            - InvalidCredentials is raised for a wrong password.
+        """
+        results = self.run_client(lambda client: client.call_procedure_batch([
+            ("list_participants", [SURVEY_ID]),
+            ("get_summary", [SURVEY_ID]),
+        ]))
+
+        self.assertIsInstance(results[0], NoParticipantFound)
+        self.assertEqual(0, results[1]["completed_responses"])
+        cache.clear()
+        with self.assertRaises(InvalidCredentials):
+            self.run_client(lambda client: client.call_procedure("get_summary", SURVEY_ID), password="wrong")
+
+    def test_bulk_rate_limit(self):
+        """
+        Check the calls of the client count against the bulk rate limit of the endpoint.
+
+        Expected result:
+            - The login and the call acquire their rate limit tokens from the bulk pool.
+        """
+        pools = []
+
+        def acquire(endpoint, tokens=1):  # pylint: disable=unused-argument
+            pools.append(get_current_pool())
+            return True
+
+        with patch("limesurvey.client.rate_limiter.acquire", side_effect=acquire):
+            self.run_client(lambda client: client.call_procedure("get_summary", SURVEY_ID))
+
+        self.assertEqual([BULK_POOL] * 2, pools)
+
+    def test_expired_session_refreshed(self):
+        """
+        Check an expired session key shared with the XBlock is refreshed.
+
+        Expected result:
+            - The call succeeds after logging in again.
+        """
+        block = LimeSurveyXBlock(runtime=Mock(), field_data=DictFieldData({}), scope_ids=Mock())
+        block.limesurvey_internal_api = self.server.url
+        block.set_session_key()
+        self.server.limesurvey.expire_sessions()
+
+        result = asyncio.run(self.summary_from_block(block))
+
+        self.assertEqual(0, result["completed_responses"])
+        self.assertEqual(2, self.server.limesurvey.calls["get_session_key"])
+
+    @staticmethod
+    async def summary_from_block(block):
+        """
+        Return the summary of the survey with a client configured from the block.
+        """
+        async with AsyncLimeSurveyClient.from_block(block) as client:
+            return await client.call_procedure("get_summary", SURVEY_ID)
@@ -0,0 +1,103 @@
+"""
+Tests for the LimeSurvey API circuit breaker.
+"""
+from unittest import TestCase
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from limesurvey.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker(TestCase):
+    """
+    Test suite for the LimeSurvey API circuit breaker.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test suite.
+        """
+        cache.clear()
+        settings_override = override_settings(
+            LIMESURVEY_CIRCUIT_BREAKER_MIN_CALLS=4,
+            LIMESURVEY_CIRCUIT_BREAKER_FAILURE_RATE=0.5,
+            LIMESURVEY_CIRCUIT_BREAKER_RESET_TIMEOUT=30,
+            LIMESURVEY_CIRCUIT_BREAKER_SLOW_CALL=3,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.breaker = CircuitBreaker()
+        self.endpoint = "https://test-url.com/index.php/admin/remotecontrol"
+
+    def test_open_on_failure_rate(self):
+        """
+        Check the circuit opens when the failure rate reaches the threshold.
+
+        Expected result:
+            - The circuit stays closed until the minimum number of calls.
+            - The calls are rejected once the circuit is open.
+        """
+        self.breaker.record_success(self.endpoint, 0.1)
+        self.breaker.record_failure(self.endpoint)
+        self.breaker.record_failure(self.endpoint)
+        self.assertTrue(self.breaker.allow_request(self.endpoint))
+
+        self.breaker.record_success(self.endpoint, 0.1)
+        self.breaker.record_failure(self.endpoint)
+
+        self.assertTrue(self.breaker.is_open(self.endpoint))
+        self.assertFalse(self.breaker.allow_request(self.endpoint))
+        self.assertTrue(self.breaker.allow_request("https://other-url.com"))
+
+    def test_slow_calls_count_as_failures(self):
+        """
+        Check calls slower than the threshold count as failures.
+
+        Expected result:
+            - The circuit opens with slow calls only.
+        """
+        for _ in range(4):
+            self.breaker.record_success(self.endpoint, 5)
+
+        self.assertTrue(self.breaker.is_open(self.endpoint))
+
+    @patch("limesurvey.circuit_breaker.time")
+    def test_half_open_probe(self, time_mock):
+        """
+        Check a single probe is allowed after the reset timeout.
+
+        Expected result:
+            - Only one caller can probe the endpoint.
+            - A failed probe opens the circuit again.
+            - A successful probe closes the circuit.
+        """
+        time_mock.time.return_value = 1000
+        for _ in range(4):
+            self.breaker.record_failure(self.endpoint)
+
+        time_mock.time.return_value = 1031
+        self.assertTrue(self.breaker.allow_request(self.endpoint))
+        self.assertFalse(self.breaker.allow_request(self.endpoint))
+        self.breaker.record_failure(self.endpoint)
+        self.assertTrue(self.breaker.is_open(self.endpoint))
+
+        time_mock.time.return_value = 1062
+        self.assertTrue(self.breaker.allow_request(self.endpoint))
+        self.breaker.record_success(self.endpoint, 0.1)
+        self.assertFalse(self.breaker.is_open(self.endpoint))
+        self.assertTrue(self.breaker.allow_request(self.endpoint))
+
+    @override_settings(LIMESURVEY_CIRCUIT_BREAKER_ENABLED=False)
+    def test_disabled(self):
+        """
+        Check calls are always allowed when the circuit breaker is disabled.
+
+        Expected result:
+            - The circuit never opens.
+        """
+        for _ in range(4):
+            self.breaker.record_failure(self.endpoint)
+
+        self.assertTrue(self.breaker.allow_request(self.endpoint))
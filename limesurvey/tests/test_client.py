@@ -0,0 +1,144 @@
+"""
+Tests for the LimeSurvey client against the fake LimeSurvey server.
+"""
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from xblock.field_data import DictFieldData
+
+from limesurvey.client import (
+    InvalidSessionKey,
+    LimeSurveyClient,
+    MisconfiguredLimeSurveyService,
+    NoParticipantFound,
+    get_client,
+)
+from limesurvey.limesurvey import LimeSurveyXBlock
+from limesurvey.session import session_manager
+from test_utils.mixins import FakeLimeSurveyMixin
+
+SURVEY_ID = 123456
+
+
+class TestLimeSurveyClient(FakeLimeSurveyMixin, TestCase):
+    """
+    Test suite for the LimeSurvey client used without a block.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the fake LimeSurvey server.
+        """
+        self.server = self.start_fake_limesurvey(
+            {"LIMESURVEY_API_USER": "test-user", "LIMESURVEY_API_PASSWORD": "test-password"},
+            username="test-user",
+            password="test-password",
+        )
+
+    def test_get_client_shared(self):
+        """
+        Check a single client is kept per endpoint and credentials.
+
+        Expected result:
+            - The same client is returned for the same settings, another one for other credentials.
+        """
+        client = get_client(self.server.url, "test-user", "test-password")
+
+        self.assertIs(client, get_client(self.server.url, "test-user", "test-password"))
+        self.assertIsNot(client, get_client(self.server.url, "other-user", "test-password"))
+
+    def test_call_without_block(self):
+        """
+        Check the client logs in and calls the API on its own.
+
+        Expected result:
+            - A single login is sent and the errors are mapped to the API exceptions.
+        """
+        client = LimeSurveyClient(self.server.url, "test-user", "test-password")
+        client.set_session_key()
+
+        self.assertEqual(0, client.call_procedure("get_summary", SURVEY_ID)["completed_responses"])
+        with self.assertRaises(NoParticipantFound):
+            client.call_procedure("list_participants", SURVEY_ID, 0, 1, False, [], {"attribute_1": "missing"})
+        self.assertEqual(1, self.server.limesurvey.calls["get_session_key"])
+
+    def test_shared_invalid_session_key_error(self):
+        """
+        Check a caller sharing the call of another one doesn't drop a valid session key for a key it didn't send.
+
+        Expected result:
+            - The call is retried with the shared key, which is kept without logging in again.
+        """
+        client = LimeSurveyClient(self.server.url, "test-user", "test-password")
+        client.set_session_key()
+        session_key = client.session_key
+
+        error = InvalidSessionKey()
+        error.session_key = "expired-session-key"
+
+        with patch("limesurvey.client.single_flight.do", side_effect=error):
+            summary = client.call_procedure("get_summary", SURVEY_ID)
+
+        self.assertEqual(0, summary["completed_responses"])
+        self.assertEqual(session_key, client.session_key)
+        self.assertEqual(1, self.server.limesurvey.calls["get_session_key"])
+
+    def test_shared_call_with_rejected_session_key(self):
+        """
+        Check the callers sharing a call rejected for an expired session key don't retry with it.
+
+        Expected result:
+            - Both calls succeed after a single login with the expired key removed.
+        """
+        client = LimeSurveyClient(self.server.url, "test-user", "test-password")
+        client.set_session_key()
+        self.server.limesurvey.expire_sessions()
+        self.server.limesurvey.latency = 0.2
+        invalidate = session_manager.invalidate
+        results = []
+
+        def slow_invalidate(*args):
+            time.sleep(0.1)
+            invalidate(*args)
+
+        def summary():
+            results.append(client.call_procedure("get_summary", SURVEY_ID)["completed_responses"])
+
+        with patch("limesurvey.client.session_manager.invalidate", side_effect=slow_invalidate):
+            threads = [threading.Thread(target=summary) for __ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual([0, 0], results)
+        self.assertEqual(2, self.server.limesurvey.calls["get_session_key"])
+
+    def test_missing_credentials(self):
+        """
+        Check the client doesn't log in without credentials.
+
+        Expected result:
+            - MisconfiguredLimeSurveyService is raised.
+        """
+        with self.assertRaises(MisconfiguredLimeSurveyService):
+            LimeSurveyClient(self.server.url, "test-user", None).set_session_key()
+
+    def test_session_shared_with_blocks(self):
+        """
+        Check the blocks configured against the same service use the client and its session key.
+
+        Expected result:
+            - The block calls through the shared client without logging in again.
+        """
+        client = get_client(self.server.url, "test-user", "test-password")
+        client.set_session_key()
+        block = LimeSurveyXBlock(runtime=Mock(), field_data=DictFieldData({"survey_id": SURVEY_ID}), scope_ids=Mock())
+
+        block.set_session_key()
+        block.call_procedure("get_summary", SURVEY_ID)
+
+        self.assertIs(client, block.get_client())
+        self.assertEqual(1, self.server.limesurvey.calls["get_session_key"])
@@ -0,0 +1,145 @@
+"""
+Tests for the LimeSurvey management commands.
+"""
+from io import StringIO
+from unittest import TestCase
+from unittest.mock import Mock, call, patch
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from xblock.field_data import DictFieldData
+
+from limesurvey.client import LimeSurveyClient, NoParticipantFound
+from limesurvey.limesurvey import LimeSurveyXBlock
+
+COMMAND_MODULE = "limesurvey.management.commands.provision_limesurvey_participants"
+
+
+@patch(f"{COMMAND_MODULE}.update_student_module_state")
+@patch(f"{COMMAND_MODULE}.anonymous_id_for_user")
+@patch(f"{COMMAND_MODULE}.get_course_enrollments")
+@patch(f"{COMMAND_MODULE}.modulestore")
+class TestProvisionLimeSurveyParticipants(TestCase):
+    """
+    Test suite for the provision_limesurvey_participants command.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test suite.
+        """
+        cache.clear()
+        self.course_key = "course-v1:edX+DemoX+Demo_Course"
+        self.block = LimeSurveyXBlock(
+            runtime=Mock(),
+            field_data=DictFieldData({"survey_id": 123456, "anonymous_survey": False}),
+            scope_ids=Mock(),
+        )
+        self.block.location = Mock(block_type="limesurvey")
+        self.users = [
+            Mock(email=f"learner{index}@example.com", profile=Mock()) for index in range(5)
+        ]
+        for index, user in enumerate(self.users):
+            user.profile.name = f"Learner {index}"
+
+    def add_participants(self, method, survey_id, *params):
+        """
+        Fake LimeSurvey API: learner0 is already a participant, the rest are added.
+        """
+        if method == "list_participants":
+            if params[0] > 0:
+                raise NoParticipantFound
+            return [{"token": "token-0", "attribute_1": "anonymous-0"}]
+        return [{**participant, "token": f"token-{participant['attribute_1'][-1]}"} for participant in params[0]]
+
+    def test_provision_participants(self, modulestore_mock, enrollments_mock, anonymous_id_mock, update_state_mock):
+        """
+        Check the enrolled learners are added in batches and their access codes stored.
+
+        Expected result:
+            - Learners already in the survey are not added again.
+            - The missing learners of each chunk of enrollments of the batch size are added in one call.
+            - The access code of every learner is stored.
+        """
+        modulestore_mock.return_value.get_items.return_value = [self.block]
+        enrollments_mock.return_value.iterator.return_value = [Mock(user=user) for user in self.users]
+        anonymous_id_mock.side_effect = lambda user, course_key: f"anonymous-{self.users.index(user)}"
+
+        with patch.object(LimeSurveyClient, "set_session_key"), \
+                patch.object(LimeSurveyClient, "call_procedure", autospec=True) as call_procedure_mock:
+            call_procedure_mock.side_effect = lambda client, *args: self.add_participants(*args)
+            out = StringIO()
+            call_command(
+                "provision_limesurvey_participants", self.course_key, "--batch-size", "2", stdout=out,
+            )
+
+        add_calls = [
+            call_args for call_args in call_procedure_mock.call_args_list if call_args.args[1] == "add_participants"
+        ]
+        self.assertEqual(
+            [["anonymous-1"], ["anonymous-2", "anonymous-3"], ["anonymous-4"]],
+            [[participant["attribute_1"] for participant in add_call.args[3]] for add_call in add_calls],
+        )
+        self.assertEqual(5, update_state_mock.call_count)
+        update_state_mock.assert_has_calls([
+            call(self.users[0], enrollments_mock.call_args.args[0], self.block.location, {
+                "access_code": "token-0",
+                "access_code_survey_url": "https://test-url.com/index.php/123456",
+                "access_code_validated": update_state_mock.call_args.args[3]["access_code_validated"],
+            }),
+        ])
+        self.assertIn("4 participants added, 5 access codes stored", out.getvalue())
+
+    def test_enrollments_streamed(self, modulestore_mock, enrollments_mock, anonymous_id_mock, update_state_mock):
+        """
+        Check each chunk of enrollments is provisioned before the next one is read.
+
+        Expected result:
+            - The access codes of a chunk are stored before the enrollments of the next one are read.
+        """
+        stored_when_read = []
+
+        def enrollments():
+            for user in self.users:
+                stored_when_read.append(update_state_mock.call_count)
+                yield Mock(user=user)
+
+        modulestore_mock.return_value.get_items.return_value = [self.block]
+        enrollments_mock.return_value.iterator.return_value = enrollments()
+        anonymous_id_mock.side_effect = lambda user, course_key: f"anonymous-{self.users.index(user)}"
+
+        with patch.object(LimeSurveyClient, "set_session_key"), \
+                patch.object(LimeSurveyClient, "call_procedure", autospec=True) as call_procedure_mock:
+            call_procedure_mock.side_effect = lambda client, *args: self.add_participants(*args)
+            call_command(
+                "provision_limesurvey_participants", self.course_key, "--batch-size", "2", "--concurrency", "1",
+                stdout=StringIO(),
+            )
+
+        self.assertEqual([0, 0, 2, 2, 4], stored_when_read)
+        self.assertEqual(5, update_state_mock.call_count)
+
+    def test_skip_anonymous_surveys(self, modulestore_mock, enrollments_mock, _, update_state_mock):
+        """
+        Check open-access surveys are skipped.
+
+        Expected result:
+            - No learner is provisioned.
+        """
+        self.block.anonymous_survey = True
+        modulestore_mock.return_value.get_items.return_value = [self.block]
+
+        call_command("provision_limesurvey_participants", self.course_key, stdout=StringIO())
+
+        enrollments_mock.assert_not_called()
+        update_state_mock.assert_not_called()
+
+    def test_invalid_course_key(self, *_):
+        """
+        Check the command fails with an invalid course key.
+
+        Expected result:
+            - A CommandError is raised.
+        """
+        with self.assertRaises(CommandError):
+            call_command("provision_limesurvey_participants", "not-a-course-key")
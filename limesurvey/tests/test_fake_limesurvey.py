@@ -0,0 +1,187 @@
+"""
+Tests of the LimeSurveyXBlock API calls against the fake LimeSurvey server.
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import Mock
+
+from django.test.utils import override_settings
+from xblock.field_data import DictFieldData
+
+from limesurvey.limesurvey import (
+    BATCH_UNSUPPORTED_APIS,
+    InvalidCredentials,
+    LimeSurveyConnectionError,
+    LimeSurveyXBlock,
+    NoParticipantFound,
+)
+from test_utils.fake_limesurvey import NO_PARTICIPANTS_FOUND, FakeLimeSurveyServer
+from test_utils.mixins import FakeLimeSurveyMixin
+
+SURVEY_ID = 123456
+
+
+class TestFakeLimeSurvey(FakeLimeSurveyMixin, TestCase):
+    """
+    Test suite for the LimeSurveyXBlock API calls against the fake LimeSurvey server.
+    """
+
+    def start_server(self, **kwargs) -> FakeLimeSurveyServer:
+        """
+        Start a fake LimeSurvey server used by the blocks for the rest of the test.
+        """
+        return self.start_fake_limesurvey(
+            {"LIMESURVEY_API_RETRY_BACKOFF": 0}, username="test-user", password="test-password", **kwargs,
+        )
+
+    def setUp(self) -> None:
+        """
+        Set up the test suite.
+        """
+        BATCH_UNSUPPORTED_APIS.clear()
+
+    @staticmethod
+    def make_block(**fields) -> LimeSurveyXBlock:
+        """
+        Return a closed-access survey block with its own user state.
+        """
+        return LimeSurveyXBlock(
+            runtime=Mock(),
+            field_data=DictFieldData({"survey_id": SURVEY_ID, **fields}),
+            scope_ids=Mock(),
+        )
+
+    def test_expired_session_is_refreshed(self):
+        """
+        Check a session key expired on the server is replaced by a new one.
+
+        Expected result:
+            - The call is answered after logging in again.
+        """
+        server = self.start_server()
+        self.make_block().set_session_key()
+        server.limesurvey.expire_sessions()
+        block = self.make_block()
+
+        result = block.call_procedure("get_summary", SURVEY_ID)
+
+        self.assertEqual(0, result["completed_responses"])
+        self.assertEqual(2, server.limesurvey.calls["get_session_key"])
+        self.assertEqual(1, server.limesurvey.errors["Invalid session key"])
+
+    def test_invalid_credentials(self):
+        """
+        Check the credentials rejected by the server raise the mapped exception.
+
+        Expected result:
+            - InvalidCredentials is raised.
+        """
+        self.start_server()
+        block = self.make_block(api_username="someone", api_password="wrong")
+
+        with self.assertRaises(InvalidCredentials):
+            block.set_session_key()
+
+    def test_injected_status(self):
+        """
+        Check an injected LimeSurvey status raises the mapped exception only for the next call.
+
+        Expected result:
+            - NoParticipantFound is raised for the first call, the second one succeeds.
+        """
+        server = self.start_server()
+        block = self.make_block()
+        block.set_session_key()
+        block.call_procedure("add_participants", SURVEY_ID, [{"email": "learner@example.com"}])
+        server.limesurvey.inject_status("list_participants", NO_PARTICIPANTS_FOUND)
+
+        with self.assertRaises(NoParticipantFound):
+            block.call_procedure("list_participants", SURVEY_ID)
+
+        self.assertEqual(1, len(block.call_procedure("list_participants", SURVEY_ID)))
+
+    def test_http_errors_are_retried(self):
+        """
+        Check the HTTP errors of idempotent calls are retried until the retries are exhausted.
+
+        Expected result:
+            - Every retry reaches the server and LimeSurveyConnectionError is raised.
+        """
+        server = self.start_server()
+        block = self.make_block()
+        block.set_session_key()
+        server.limesurvey.error_rate = 1
+        server.limesurvey.reset_stats()
+
+        with override_settings(LIMESURVEY_API_RETRIES=2), self.assertRaises(LimeSurveyConnectionError):
+            block.call_procedure("get_summary", SURVEY_ID)
+
+        self.assertEqual(3, server.limesurvey.errors[503])
+
+    def test_provisioning_without_batch_support(self):
+        """
+        Check a learner is provisioned by a server that rejects batch requests.
+
+        Expected result:
+            - The calls are sent one by one and the access code is set.
+        """
+        server = self.start_server(batch_support=False)
+        block = self.make_block()
+        block.set_session_key()
+        user = SimpleNamespace(emails=["learner@example.com"], full_name="Learner")
+
+        block.provision_participant(user, "anonymous-user-id")
+
+        self.assertTrue(block.access_code)
+        self.assertIn(server.url, BATCH_UNSUPPORTED_APIS)
+        self.assertEqual(1, server.limesurvey.calls["add_participants"])
+
+    def test_provisioning_with_derived_tokens(self):
+        """
+        Check learners are provisioned with derived tokens in a single call, even after losing their state.
+
+        Expected result:
+            - The access code is the derived token and the learner is only added once.
+        """
+        server = self.start_server()
+        user = SimpleNamespace(emails=["learner@example.com"], full_name="Learner")
+        self.make_block().set_session_key()
+
+        with override_settings(LIMESURVEY_PARTICIPANT_TOKEN_SECRET="test-secret"):
+            for __ in range(2):
+                server.limesurvey.reset_stats()
+                block = self.make_block(derive_participant_tokens=True)
+                block.provision_participant(user, "anonymous-user-id")
+
+                self.assertEqual(block.get_participant_token("anonymous-user-id"), block.access_code)
+                self.assertEqual(1, server.limesurvey.requests)
+
+            self.assertNotEqual(
+                block.get_participant_token("anonymous-user-id"),
+                self.make_block(survey_id=654321, derive_participant_tokens=True).get_participant_token(
+                    "anonymous-user-id",
+                ),
+            )
+
+        self.assertEqual(1, len(server.limesurvey.participants[SURVEY_ID]))
+
+    def test_derived_tokens_opt_in(self):
+        """
+        Check the blocks not deriving tokens keep looking up the learners registered before the secret was set.
+
+        Expected result:
+            - The learner registered with a generated token isn't added again.
+        """
+        server = self.start_server()
+        user = SimpleNamespace(emails=["learner@example.com"], full_name="Learner")
+        block = self.make_block()
+        block.set_session_key()
+        block.provision_participant(user, "anonymous-user-id")
+        generated_token = block.access_code
+
+        with override_settings(LIMESURVEY_PARTICIPANT_TOKEN_SECRET="test-secret"):
+            block = self.make_block()
+            block.provision_participant(user, "anonymous-user-id")
+
+        self.assertEqual(generated_token, block.access_code)
+        self.assertEqual(1, len(server.limesurvey.participants[SURVEY_ID]))
@@ -6,20 +6,29 @@ from unittest import TestCase
 from unittest.mock import Mock, patch
 
 import pytz
+import requests
 from ddt import data, ddt, unpack
 from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import Signal
 from django.test.utils import override_settings
+from xblock.field_data import DictFieldData
 
 from limesurvey.limesurvey import (
+    BATCH_UNSUPPORTED_APIS,
     ExceededLoginAttempts,
     InvalidSessionKey,
     LimeSurveyAPIError,
+    LimeSurveyConnectionError,
+    LimeSurveyUnavailable,
     LimeSurveyXBlock,
     NoParticipantFound,
     MisconfiguredLimeSurveyService,
 )
 
+from limesurvey.budget import request_budget
 from limesurvey.extensions.filters import AddInstructorLimesurveyTab
+from limesurvey.receivers import connect_receivers, invalidate_course_limesurvey_blocks_cache
 
 class TestFilters(TestCase):
     """
@@ -30,10 +39,11 @@ class TestFilters(TestCase):
         """
         Set up the test suite.
         """
+        cache.clear()
         self.filter = AddInstructorLimesurveyTab(filter_type=Mock(), running_pipeline=Mock())
 
     @patch("limesurvey.extensions.filters.get_object_by_usage_id")
-    @patch("limesurvey.extensions.filters.modulestore")
+    @patch("limesurvey.course_blocks.modulestore")
     def test_run_filter_without_blocks(self, modulestore_mock, get_object_by_usage_id_mock):
         """
         Check the filter is not executed when there are no LimeSurvey blocks in the course.
@@ -50,7 +60,7 @@ class TestFilters(TestCase):
         get_object_by_usage_id_mock.assert_not_called()
 
     @patch("limesurvey.extensions.filters.get_object_by_usage_id")
-    @patch("limesurvey.extensions.filters.modulestore")
+    @patch("limesurvey.course_blocks.modulestore")
     def test_run_filter_with_blocks(self, modulestore_mock, get_object_by_usage_id_mock):
         """
         Check the filter is executed when there are LimeSurvey blocks in the course.
@@ -58,7 +68,9 @@ class TestFilters(TestCase):
         Expected result:
             - The context is returned with the LimeSurvey blocks information.
         """
-        modulestore_mock().get_items.return_value = [Mock(location="test-location")]
+        modulestore_mock().get_items.return_value = [
+            Mock(location="test-location", display_name="test-display-name", limesurvey_url=""),
+        ]
         context = {"course": Mock(id="test-course-id"), "sections": []}
         template_name = "test-template-name"
 
@@ -66,6 +78,50 @@ class TestFilters(TestCase):
 
         get_object_by_usage_id_mock.assert_called_once()
         self.assertEqual(1, len(result.get("context", {})["sections"]))
+        get_object_by_usage_id_mock.return_value.render.assert_called_once_with(
+            "instructor_view",
+            context={"xblock_urls": [("test-display-name", settings.LIMESURVEY_URL)]},
+        )
+
+    @patch("limesurvey.extensions.filters.get_object_by_usage_id")
+    @patch("limesurvey.course_blocks.modulestore")
+    def test_run_filter_cached_blocks(self, modulestore_mock, _):
+        """
+        Check the modulestore is only walked again after the course is published.
+
+        Expected result:
+            - The blocks are taken from the cache on following dashboard loads.
+            - The cache is invalidated by the course published receiver.
+        """
+        modulestore_mock().get_items.return_value = [
+            Mock(location="test-location", display_name="test-display-name", limesurvey_url=""),
+        ]
+        course = Mock(id="test-course-id")
+
+        self.filter.run_filter({"course": course, "sections": []}, "test-template-name")
+        self.filter.run_filter({"course": course, "sections": []}, "test-template-name")
+        self.assertEqual(1, modulestore_mock().get_items.call_count)
+
+        invalidate_course_limesurvey_blocks_cache(sender=None, course_key=course.id)
+        self.filter.run_filter({"course": course, "sections": []}, "test-template-name")
+        self.assertEqual(2, modulestore_mock().get_items.call_count)
+
+    @patch("limesurvey.receivers.get_enroll_status_change_signal", side_effect=ImportError)
+    @patch("limesurvey.receivers.get_course_published_signal")
+    @patch("limesurvey.receivers.invalidate_course_limesurvey_blocks")
+    def test_course_published_receiver_connected(self, invalidate_mock, get_signal_mock, _):
+        """
+        Check the cached blocks of a course are invalidated when the course published signal is sent.
+
+        Expected result:
+            - The receiver connected by the app invalidates the blocks of the published course.
+        """
+        get_signal_mock.return_value = Signal()
+        connect_receivers()
+
+        get_signal_mock.return_value.send(sender=None, course_key="test-course-id")
+
+        invalidate_mock.assert_called_once_with("test-course-id")
 
 class TestLimeSurveyXBlock(TestCase):
     """
@@ -84,17 +140,19 @@ class TestLimeSurveyXBlock(TestCase):
         self.xblock.resource_string = Mock()
         self.xblock.is_student = Mock()
         self.xblock.user_is_staff = Mock()
-        self.xblock.setup_student_view_survey = Mock()
+        self.xblock.setup_student_view_survey = Mock(return_value=False)
         self.xblock.display_name = "Test LimeSurvey"
         self.xblock.survey_id = "test-survey-id"
         self.xblock.limesurvey_url = "test-limesurvey-url"
         self.xblock.api_username = "test-api-username"
         self.xblock.api_password = "test-api-password"
         self.xblock.anonymous_survey = True
+        self.xblock.derive_participant_tokens = False
         self.xblock.fields = {
             "survey_id": "test-survey-id",
             "display_name": "Test LimeSurvey",
             "anonymous_survey": True,
+            "derive_participant_tokens": False,
             "limesurvey_url": "test-limesurvey-url",
             "api_username": "test-api-username",
             "api_password": "test-api-password",
@@ -116,12 +174,13 @@ class TestLimeSurveyXBlock(TestCase):
             "self": self.xblock,
             "show_survey": show_survey,
             "error_message": None,
+            "deferred_provisioning": False,
         }
 
         self.xblock.student_view(show_survey)
 
         self.xblock.setup_student_view_survey.assert_called_once_with(
-            self.student, self.anonymous_user_id
+            self.student, self.anonymous_user_id, defer_provisioning=True,
         )
         self.xblock.render_template.assert_called_once_with(
             "static/html/limesurvey.html", expected_context,
@@ -144,12 +203,13 @@ class TestLimeSurveyXBlock(TestCase):
             "self": self.xblock,
             "show_survey": show_survey,
             "error_message": "Test exception",
+            "deferred_provisioning": False,
         }
 
         self.xblock.student_view(show_survey)
 
         self.xblock.setup_student_view_survey.assert_called_once_with(
-            self.student, self.anonymous_user_id
+            self.student, self.anonymous_user_id, defer_provisioning=True,
         )
         self.xblock.render_template.assert_called_once_with(
             "static/html/limesurvey.html", expected_context,
@@ -174,6 +234,7 @@ class TestLimeSurveyXBlock(TestCase):
             "self": self.xblock,
             "show_survey": show_survey,
             "error_message": None,
+            "deferred_provisioning": False,
         }
 
         self.xblock.student_view(show_survey)
@@ -184,6 +245,62 @@ class TestLimeSurveyXBlock(TestCase):
         )
 
 
+    @patch("limesurvey.limesurvey.Fragment")
+    def test_student_view_deferred_provisioning(self, _):
+        """
+        Check student view is rendered without waiting for the LimeSurvey API.
+
+        Expected result:
+            - The provisioning is left to the frontend.
+        """
+        self.xblock.is_student.return_value = True
+        self.xblock.runtime.service.return_value.get_current_user.return_value = self.student
+        self.xblock.anonymous_user_id.return_value = self.anonymous_user_id
+        self.xblock.setup_student_view_survey.return_value = True
+
+        self.xblock.student_view(True)
+
+        self.assertTrue(self.xblock.render_template.call_args.args[1]["deferred_provisioning"])
+
+    def test_provision_survey(self):
+        """
+        Check the provision handler sets up the survey for the student.
+
+        Expected result:
+            - The student is provisioned without deferring it.
+            - The survey URL and access code are returned.
+        """
+        self.xblock.is_student.return_value = True
+        self.xblock.runtime.service.return_value.get_current_user.return_value = self.student
+        self.xblock.anonymous_user_id.return_value = self.anonymous_user_id
+        self.xblock.get_survey_url = Mock(return_value="test-survey-url")
+        self.xblock.access_code = "test-token"
+
+        response = self.xblock.provision_survey(Mock(method="POST", body=b"{}"))
+
+        self.xblock.setup_student_view_survey.assert_called_once_with(
+            self.student, self.anonymous_user_id, provision_siblings=False,
+        )
+        self.assertDictEqual(
+            {"survey_url": "test-survey-url", "access_code": "test-token"},
+            response.json,
+        )
+
+    def test_provision_survey_with_errors(self):
+        """
+        Check the provision handler returns the error when the set up fails.
+
+        Expected result:
+            - The error message is returned.
+        """
+        self.xblock.is_student.return_value = True
+        self.xblock.runtime.service.return_value.get_current_user.return_value = self.student
+        self.xblock.setup_student_view_survey.side_effect = Exception("Test exception")
+
+        response = self.xblock.provision_survey(Mock(method="POST", body=b"{}"))
+
+        self.assertDictEqual({"error_message": "Test exception"}, response.json)
+
     def test_studio_view(self):
         """
         Check studio view is rendered correctly.
@@ -196,10 +313,12 @@ class TestLimeSurveyXBlock(TestCase):
             "display_name": self.xblock.display_name,
             "limesurvey_url": self.xblock.limesurvey_url,
             "anonymous_survey": self.xblock.anonymous_survey,
+            "derive_participant_tokens": self.xblock.derive_participant_tokens,
             "api_username": self.xblock.api_username,
             "api_password": self.xblock.api_password,
             "survey_id_field": self.xblock.fields["survey_id"],
             "anonymous_survey_field": self.xblock.fields["anonymous_survey"],
+            "derive_participant_tokens_field": self.xblock.fields["derive_participant_tokens"],
             "limesurvey_url_field": self.xblock.fields["limesurvey_url"],
             "display_name_field": self.xblock.fields["display_name"],
             "api_username_field": self.xblock.fields["api_username"],
@@ -238,8 +357,8 @@ class TestLimeSurveyUtilities(TestCase):
         """
         Set up the test suite.
         """
+        cache.clear()
         self.xblock = LimeSurveyXBlock(runtime=Mock(), field_data=Mock(), scope_ids=Mock())
-        self.xblock.session_key = "test-session-key"
         self.xblock.survey_id = "test-survey-id"
         self.xblock.display_name = "Test LimeSurvey"
         self.xblock.survey_id = "test-survey-id"
@@ -247,9 +366,14 @@ class TestLimeSurveyUtilities(TestCase):
         self.xblock.limesurvey_internal_api = "https://test-limesurvey-internal-api.com"
         self.xblock.api_username = "test-api-username"
         self.xblock.api_password = "test-api-password"
+        self.xblock.session_key = "test-session-key"
+        self.xblock.last_login_attempt = None
+        self.xblock.access_code = None
+        self.xblock.access_code_survey_url = None
+        self.xblock.access_code_validated = None
 
-    @patch("limesurvey.limesurvey.uuid")
-    @patch("limesurvey.limesurvey.requests")
+    @patch("limesurvey.client.uuid")
+    @patch("limesurvey.client.get_transport")
     @data(
         (
             "get_session_key",
@@ -302,7 +426,7 @@ class TestLimeSurveyUtilities(TestCase):
         )
     )
     @unpack
-    def test_make_request_to_service(self, method, params, get_session_key, requests_mock, uuid_mock):
+    def test_make_request_to_service(self, method, params, get_session_key, transport_mock, uuid_mock):
         """
         Check requests to the LimeSurvey API are made correctly.
 
@@ -314,11 +438,11 @@ class TestLimeSurveyUtilities(TestCase):
         uuid_mock.uuid4.return_value.hex = 1
         expected_response = {"result": "test-response"}
         expected_params = params if get_session_key else [self.xblock.session_key, *params]
-        requests_mock.post.return_value = Mock(status_code=200, json=Mock(return_value=expected_response))
+        transport_mock.return_value.post.return_value = Mock(status_code=200, json=Mock(return_value=expected_response))
 
         response = self.xblock.call_procedure(method, *params, get_session_key=get_session_key)
 
-        requests_mock.post.assert_called_once_with(
+        transport_mock.return_value.post.assert_called_once_with(
             url=self.xblock.limesurvey_internal_api,
             json={
                 "method": method,
@@ -329,6 +453,334 @@ class TestLimeSurveyUtilities(TestCase):
         )
         self.assertEqual(expected_response.get("result"), response)
 
+    @patch("limesurvey.client.get_transport")
+    def test_refresh_session_key_when_invalid(self, transport_mock):
+        """
+        Check the shared session key is refreshed only when the API reports it as invalid.
+
+        Expected result:
+            - The call is retried once with the new session key.
+            - The new session key is shared with other blocks using the same API and user.
+        """
+        self.xblock.last_login_attempt = None
+        transport_mock.return_value.post.return_value.ok = True
+        transport_mock.return_value.post.return_value.json.side_effect = [
+            {"result": {"status": "Invalid session key"}},
+            {"result": "test-session-key-2"},
+            {"result": "test-response"},
+        ]
+        other_xblock = LimeSurveyXBlock(runtime=Mock(), field_data=DictFieldData({}), scope_ids=Mock())
+        other_xblock.limesurvey_internal_api = self.xblock.limesurvey_internal_api
+        other_xblock.api_username = self.xblock.api_username
+
+        response = self.xblock.call_procedure("get_summary", self.xblock.survey_id)
+
+        self.assertEqual("test-response", response)
+        self.assertEqual(3, transport_mock.return_value.post.call_count)
+        self.assertEqual(
+            ["test-session-key-2", self.xblock.survey_id],
+            transport_mock.return_value.post.call_args.kwargs["json"]["params"],
+        )
+        self.assertEqual("test-session-key-2", other_xblock.session_key)
+
+    @patch("limesurvey.client.uuid")
+    @patch("limesurvey.client.get_transport")
+    def test_call_procedure_batch(self, transport_mock, uuid_mock):
+        """
+        Check several calls are sent in a single JSON-RPC batch request.
+
+        Expected result:
+            - A single request is made with every call.
+            - Results and mapped errors are returned in the order of the calls.
+        """
+        BATCH_UNSUPPORTED_APIS.clear()
+        uuid_mock.uuid4.side_effect = [Mock(hex="1"), Mock(hex="2")]
+        transport_mock.return_value.post.return_value.ok = True
+        transport_mock.return_value.post.return_value.json.return_value = [
+            {"id": "2", "result": {"token": "test-token"}, "error": None},
+            {"id": "1", "result": {"status": "No survey participants found."}, "error": None},
+        ]
+
+        results = self.xblock.call_procedure_batch([
+            ("list_participants", (self.xblock.survey_id,)),
+            ("get_participant_properties", (self.xblock.survey_id, {"attribute_1": "test-attribute-1"})),
+        ])
+
+        transport_mock.return_value.post.assert_called_once_with(
+            url=self.xblock.limesurvey_internal_api,
+            json=[
+                {"method": "list_participants", "params": ["test-session-key", self.xblock.survey_id], "id": "1"},
+                {
+                    "method": "get_participant_properties",
+                    "params": ["test-session-key", self.xblock.survey_id, {"attribute_1": "test-attribute-1"}],
+                    "id": "2",
+                },
+            ],
+            timeout=settings.LIMESURVEY_API_TIMEOUT,
+        )
+        self.assertIsInstance(results[0], NoParticipantFound)
+        self.assertEqual({"token": "test-token"}, results[1])
+
+    @patch("limesurvey.client.get_transport")
+    def test_call_procedure_batch_unsupported(self, transport_mock):
+        """
+        Check calls are sent sequentially when the server rejects batch requests.
+
+        Expected result:
+            - The calls are sent one by one after the batch request is rejected.
+            - Following batches skip the batch request for the same API.
+        """
+        BATCH_UNSUPPORTED_APIS.clear()
+        transport_mock.return_value.post.return_value.ok = True
+        transport_mock.return_value.post.return_value.json.side_effect = [
+            {"id": None, "result": None, "error": "Invalid request"},
+            {"result": "test-response-1"},
+            {"result": "test-response-2"},
+            {"result": "test-response-3"},
+        ]
+        calls = [("get_summary", (self.xblock.survey_id,)), ("get_summary", (self.xblock.survey_id,))]
+
+        results = self.xblock.call_procedure_batch(calls)
+        self.xblock.call_procedure_batch(calls[:1])
+
+        self.assertEqual(["test-response-1", "test-response-2"], results)
+        self.assertEqual(4, transport_mock.return_value.post.call_count)
+        self.assertIn(self.xblock.limesurvey_internal_api, BATCH_UNSUPPORTED_APIS)
+
+    @patch("limesurvey.client.get_transport")
+    def test_call_procedure_batch_server_error(self, transport_mock):
+        """
+        Check a failing server doesn't disable the batch requests.
+
+        Expected result:
+            - Every call of the batch gets a LimeSurveyConnectionError.
+            - The calls aren't sent again one by one and the API keeps its batch support.
+        """
+        BATCH_UNSUPPORTED_APIS.clear()
+        transport_mock.return_value.post.return_value.ok = False
+        transport_mock.return_value.post.return_value.text = "Service Unavailable"
+        calls = [
+            ("add_participants", (self.xblock.survey_id, [])),
+            ("delete_participants", (self.xblock.survey_id, [])),
+        ]
+
+        results = self.xblock.call_procedure_batch(calls)
+
+        self.assertTrue(all(isinstance(result, LimeSurveyConnectionError) for result in results))
+        transport_mock.return_value.post.assert_called_once()
+        self.assertNotIn(self.xblock.limesurvey_internal_api, BATCH_UNSUPPORTED_APIS)
+
+    def test_provision_returning_participant(self):
+        """
+        Check a participant already in the survey only gets the access code.
+
+        Expected result:
+            - The participant is not added to the survey.
+            - The access code is taken from the batch results.
+        """
+        self.xblock.call_procedure = Mock()
+        self.xblock.call_procedure_batch = Mock(return_value=[["participant"], {"token": "test-token"}])
+
+        self.xblock.provision_participant(Mock(), "test-anonymous-user-id")
+
+        self.xblock.call_procedure.assert_not_called()
+        self.assertEqual("test-token", self.xblock.access_code)
+
+    def test_provision_unchanged_access_code(self):
+        """
+        Check the access code of a returning participant isn't written when it didn't change.
+
+        Expected result:
+            - No field of the block is marked to be saved.
+        """
+        xblock = LimeSurveyXBlock(
+            runtime=Mock(), field_data=DictFieldData({"access_code": "test-token"}), scope_ids=Mock(),
+        )
+        xblock.call_procedure_batch = Mock(return_value=[["participant"], {"token": "test-token"}])
+
+        xblock.provision_participant(Mock(), "test-anonymous-user-id")
+
+        self.assertEqual("test-token", xblock.access_code)
+        self.assertFalse(xblock._dirty_fields)  # pylint: disable=protected-access
+
+    def test_provision_new_participant(self):
+        """
+        Check a participant not in the survey is added with a single call.
+
+        Expected result:
+            - The participant is added to the survey.
+            - The access code is taken from the added participant.
+        """
+        user = Mock(emails=["test-email"], full_name="test-firstname test-lastname")
+        self.xblock.call_procedure = Mock(return_value=[{"token": "test-token"}])
+        self.xblock.call_procedure_batch = Mock(return_value=[NoParticipantFound(), LimeSurveyAPIError()])
+
+        self.xblock.provision_participant(user, "test-anonymous-user-id")
+
+        self.xblock.call_procedure.assert_called_once_with(
+            "add_participants",
+            self.xblock.survey_id,
+            [{
+                "email": "test-email",
+                "lastname": "test-lastname",
+                "firstname": "test-firstname",
+                "attribute_1": "test-anonymous-user-id",
+            }],
+        )
+        self.assertEqual("test-token", self.xblock.access_code)
+
+    @patch("limesurvey.client.circuit_breaker")
+    @patch("limesurvey.client.get_transport")
+    def test_call_procedure_circuit_open(self, transport_mock, circuit_breaker_mock):
+        """
+        Check no request is sent while the circuit of the endpoint is open.
+
+        Expected result:
+            - The unavailable service error is raised without calling the API.
+        """
+        circuit_breaker_mock.allow_request.return_value = False
+
+        with self.assertRaises(LimeSurveyUnavailable):
+            self.xblock.call_procedure("get_summary", self.xblock.survey_id)
+
+        transport_mock.return_value.post.assert_not_called()
+
+    @patch("limesurvey.client.circuit_breaker")
+    @patch("limesurvey.client.get_transport")
+    def test_call_procedure_records_failures(self, transport_mock, circuit_breaker_mock):
+        """
+        Check connection errors are recorded in the circuit breaker.
+
+        Expected result:
+            - The failure is recorded and raised as a LimeSurvey API error.
+        """
+        transport_mock.return_value.post.side_effect = requests.ConnectionError("Connection refused")
+
+        with self.assertRaises(LimeSurveyAPIError):
+            self.xblock.call_procedure("add_participants", self.xblock.survey_id, [])
+
+        circuit_breaker_mock.record_failure.assert_called_once_with(self.xblock.limesurvey_internal_api)
+
+    @override_settings(LIMESURVEY_API_RETRIES=2)
+    @patch("limesurvey.client.time.sleep")
+    @patch("limesurvey.client.get_transport")
+    @data(
+        ("get_summary", 3),
+        ("add_participants", 1),
+    )
+    @unpack
+    def test_retry_idempotent_calls(self, method, expected_calls, transport_mock, _):
+        """
+        Check only idempotent calls are retried on transient failures.
+
+        Expected result:
+            - Idempotent calls are retried up to the configured number of retries.
+            - Other calls are sent once.
+        """
+        transport_mock.return_value.post.side_effect = requests.Timeout("Read timed out")
+
+        with request_budget(10) as budget, self.assertRaises(LimeSurveyConnectionError):
+            self.xblock.call_procedure(method, self.xblock.survey_id)
+
+        self.assertEqual(expected_calls, transport_mock.return_value.post.call_count)
+        self.assertEqual(expected_calls - 1, budget.retries)
+
+    @override_settings(LIMESURVEY_API_RETRIES=5, LIMESURVEY_API_TIMEOUT=5)
+    @patch("limesurvey.client.get_transport")
+    def test_retries_bounded_by_budget(self, transport_mock):
+        """
+        Check retries and timeouts are bounded by the time budget of the render.
+
+        Expected result:
+            - The call timeout doesn't exceed the remaining budget.
+            - No call is sent once the budget is over.
+        """
+        transport_mock.return_value.post.side_effect = requests.Timeout("Read timed out")
+
+        with request_budget(0.05), self.assertRaises(LimeSurveyConnectionError):
+            self.xblock.call_procedure("get_summary", self.xblock.survey_id)
+
+        first_call_timeout = transport_mock.return_value.post.call_args_list[0].kwargs["timeout"]
+        self.assertLessEqual(first_call_timeout, 0.05)
+
+        with request_budget(0), self.assertRaises(LimeSurveyConnectionError):
+            self.xblock.call_procedure("get_summary", self.xblock.survey_id)
+
+    @patch("limesurvey.limesurvey.circuit_breaker")
+    def test_setup_student_view_survey_circuit_open(self, circuit_breaker_mock):
+        """
+        Check the error is rendered right away when the circuit of the endpoint is open.
+
+        Expected result:
+            - The unavailable service error is raised instead of deferring the provisioning.
+        """
+        self.xblock.anonymous_survey = False
+        circuit_breaker_mock.is_open.return_value = True
+
+        with self.assertRaises(LimeSurveyUnavailable):
+            self.xblock.setup_student_view_survey(Mock(), "test-anonymous-user-id", defer_provisioning=True)
+
+    @override_settings(LIMESURVEY_ACCESS_CODE_MAX_AGE=3600, LIMESURVEY_STALE_ACCESS_CODE_MAX_AGE=86400)
+    @patch("limesurvey.participant_sync.participant_sync_queue")
+    @patch("limesurvey.limesurvey.record_stale_access_code")
+    @patch("limesurvey.limesurvey.get_current_user")
+    @data(
+        (timedelta(hours=2), "test-survey-id", True),
+        (timedelta(days=2), "test-survey-id", False),
+        (timedelta(hours=2), "other-survey-id", False),
+    )
+    @unpack
+    def test_setup_student_view_survey_stale_access_code(
+        self, validated_ago, survey_id, served, get_current_user_mock, record_mock, queue_mock,
+    ):
+        """
+        Check the stored access code is served when LimeSurvey fails, unless it's too old or for another survey.
+
+        Expected result:
+            - The stale access code is served, counted and queued for revalidation, or the error is raised.
+        """
+        self.xblock.anonymous_survey = False
+        self.xblock.provision_student = Mock(side_effect=LimeSurveyConnectionError)
+        self.xblock.access_code = "test-token"
+        self.xblock.access_code_survey_url = f"{self.xblock.limesurvey_url}/index.php/{survey_id}"
+        self.xblock.access_code_validated = datetime.now().replace(tzinfo=pytz.utc) - validated_ago
+        self.xblock.scope_ids.usage_id = "test-usage-id"
+
+        if not served:
+            with self.assertRaises(LimeSurveyConnectionError):
+                self.xblock.setup_student_view_survey(Mock(), "test-anonymous-user-id")
+            record_mock.assert_not_called()
+            return
+
+        deferred = self.xblock.setup_student_view_survey(Mock(), "test-anonymous-user-id")
+
+        self.assertFalse(deferred)
+        self.assertEqual("test-token", self.xblock.access_code)
+        record_mock.assert_called_once()
+        location, anonymous_user_id, change = queue_mock.enqueue.call_args.args
+        self.assertEqual(("test-usage-id", "test-anonymous-user-id"), (location, anonymous_user_id))
+        self.assertEqual((get_current_user_mock.return_value, True, True), change)
+
+    @override_settings(LIMESURVEY_ACCESS_CODE_MAX_AGE=3600)
+    @patch("limesurvey.limesurvey.circuit_breaker")
+    def test_setup_student_view_survey_stale_circuit_open(self, circuit_breaker_mock):
+        """
+        Check the stored access code is served instead of deferring to an open circuit.
+
+        Expected result:
+            - The provisioning isn't deferred and no error is raised.
+        """
+        self.xblock.anonymous_survey = False
+        self.xblock.access_code = "test-token"
+        self.xblock.access_code_survey_url = f"{self.xblock.limesurvey_url}/index.php/{self.xblock.survey_id}"
+        self.xblock.access_code_validated = datetime.now().replace(tzinfo=pytz.utc) - timedelta(hours=2)
+        circuit_breaker_mock.is_open.return_value = True
+
+        with patch("limesurvey.limesurvey.get_current_user", return_value=None):
+            deferred = self.xblock.setup_student_view_survey(Mock(), "test-anonymous-user-id", defer_provisioning=True)
+
+        self.assertFalse(deferred)
+
     @override_settings(LIMESURVEY_INTERNAL_API=None)
     def test_limesurvey_service_not_configured(self):
         """
@@ -344,14 +796,14 @@ class TestLimeSurveyUtilities(TestCase):
         with self.assertRaises(LimeSurveyAPIError):
             self.xblock.call_procedure(method, *params)
 
-    @patch("limesurvey.limesurvey.requests")
+    @patch("limesurvey.client.get_transport")
     @data(
         ("Invalid session key", InvalidSessionKey, True),
         ("No survey participants found.", NoParticipantFound, True),
         ("Any other error!", LimeSurveyAPIError, False),
     )
     @unpack
-    def test_limesurvey_api_call_errors(self, status_message, exception, request_status_ok, requests_mock):
+    def test_limesurvey_api_call_errors(self, status_message, exception, request_status_ok, transport_mock):
         """
         Check exceptions are raised when the LimeSurvey API returns an error.
 
@@ -360,8 +812,8 @@ class TestLimeSurveyUtilities(TestCase):
         """
         method = "test_rpc_method"
         params = ["test-param-1", "test-param-2"]
-        requests_mock.post.return_value.ok = request_status_ok
-        requests_mock.post.return_value.json.return_value = {
+        transport_mock.return_value.post.return_value.ok = request_status_ok
+        transport_mock.return_value.post.return_value.json.return_value = {
             "result": {
                 "status": status_message,
             },
@@ -438,9 +890,9 @@ class TestLimeSurveyUtilities(TestCase):
             - The API credentials are set with the Xblock values.
         """
         new_session_key = "test-session-key-1"
+        cache.clear()
         self.xblock.last_login_attempt = None
         self.xblock.call_procedure = Mock(return_value=new_session_key)
-        self.xblock.get_survey_summary = Mock(side_effect=InvalidSessionKey)
 
         self.xblock.set_session_key()
 
@@ -454,12 +906,11 @@ class TestLimeSurveyUtilities(TestCase):
 
     def test_new_session_key_still_valid(self):
         """
-        Check that the session key is not set when it is still valid.
+        Check that the session key is not set when a shared key is available.
 
         Expected result:
             - No request is made to the LimeSurvey API.
         """
-        self.xblock.get_survey_summary = Mock()
         self.xblock.call_procedure = Mock()
 
         self.xblock.set_session_key()
@@ -479,7 +930,6 @@ class TestLimeSurveyUtilities(TestCase):
         """
         self.xblock.api_username = None
         self.xblock.api_password = None
-        self.xblock.get_survey_summary = Mock(side_effect=InvalidSessionKey)
         self.xblock.last_login_attempt = None
 
         with self.assertRaises(MisconfiguredLimeSurveyService):
@@ -503,6 +953,112 @@ class TestLimeSurveyUtilities(TestCase):
                 anonymous_user_id,
             )
 
+    @override_settings(LIMESURVEY_ACCESS_CODE_MAX_AGE=3600)
+    @data(
+        (None, False),
+        (timedelta(minutes=10), False),
+        (timedelta(hours=2), True),
+    )
+    @unpack
+    def test_setup_student_view_survey_access_code(self, validated_ago, provision):
+        """
+        Check the stored access code is used without API calls until it's stale.
+
+        Expected result:
+            - The student is only provisioned when the access code is missing or stale.
+        """
+        self.xblock.anonymous_survey = False
+        self.xblock.set_session_key = Mock()
+        self.xblock.provision_participant = Mock()
+        if validated_ago:
+            self.xblock.access_code = "test-token"
+            self.xblock.access_code_survey_url = f"{self.xblock.limesurvey_url}/index.php/{self.xblock.survey_id}"
+            self.xblock.access_code_validated = datetime.now().replace(tzinfo=pytz.utc) - validated_ago
+
+        self.xblock.setup_student_view_survey(Mock(), "test-anonymous-user-id")
+
+        self.assertEqual(
+            not validated_ago or provision,
+            self.xblock.provision_participant.called,
+        )
+
+    def test_setup_student_view_survey_deferred(self):
+        """
+        Check the LimeSurvey API is not called when the provisioning can be deferred.
+
+        Expected result:
+            - The student is not provisioned and the deferral is reported.
+        """
+        self.xblock.anonymous_survey = False
+        self.xblock.provision_participant = Mock()
+
+        deferred = self.xblock.setup_student_view_survey(Mock(), "test-anonymous-user-id", defer_provisioning=True)
+
+        self.assertTrue(deferred)
+        self.xblock.provision_participant.assert_not_called()
+
+    def test_setup_student_view_survey_changed(self):
+        """
+        Check the access code is revalidated when the survey changed since it was issued.
+
+        Expected result:
+            - The student is provisioned for the new survey.
+        """
+        self.xblock.anonymous_survey = False
+        self.xblock.set_session_key = Mock()
+        self.xblock.provision_participant = Mock()
+        self.xblock.access_code = "test-token"
+        self.xblock.access_code_survey_url = f"{self.xblock.limesurvey_url}/index.php/other-survey-id"
+        self.xblock.access_code_validated = datetime.now().replace(tzinfo=pytz.utc)
+
+        self.xblock.setup_student_view_survey(Mock(), "test-anonymous-user-id")
+
+        self.xblock.provision_participant.assert_called_once()
+        self.assertEqual(
+            f"{self.xblock.limesurvey_url}/index.php/{self.xblock.survey_id}",
+            self.xblock.access_code_survey_url,
+        )
+
+    def test_setup_student_view_survey_field_writes(self):
+        """
+        Check a render with a valid access code doesn't write any field.
+
+        Expected result:
+            - No field is left to save and the survey URL is derived from the settings.
+        """
+        survey_url = "https://test-limesurvey.com/index.php/123456"
+        xblock = LimeSurveyXBlock(
+            runtime=Mock(),
+            field_data=DictFieldData({
+                "survey_id": 123456,
+                "limesurvey_url": "https://test-limesurvey.com",
+                "anonymous_survey": False,
+                "access_code": "test-token",
+                "access_code_survey_url": survey_url,
+                "access_code_validated": datetime.now().replace(tzinfo=pytz.utc),
+            }),
+            scope_ids=Mock(),
+        )
+
+        xblock.setup_student_view_survey(Mock(), "test-anonymous-user-id")
+
+        self.assertEqual(survey_url, xblock.survey_url)
+        self.assertEqual([], xblock._get_fields_to_save())  # pylint: disable=protected-access
+
+    def test_report_survey_error(self):
+        """
+        Check the access code is discarded when the frontend reports an error.
+
+        Expected result:
+            - The access code is removed.
+        """
+        self.xblock.access_code = "test-token"
+        request = Mock(method="POST", body=b"{}")
+
+        self.xblock.report_survey_error(request)
+
+        self.assertIsNone(self.xblock.access_code)
+
     def test_login_attempt_exceeded(self):
         """
         Check that when login attempt is exceeded an exception is raised.
@@ -510,8 +1066,8 @@ class TestLimeSurveyUtilities(TestCase):
         Expected result:
             - The exception is raised.
         """
+        cache.clear()
         self.xblock.call_procedure = Mock()
-        self.xblock.get_survey_summary = Mock(side_effect=InvalidSessionKey)
         self.xblock.last_login_attempt = datetime.now().replace(tzinfo=pytz.utc)  + timedelta(days=1)
 
         with self.assertRaises(ExceededLoginAttempts):
@@ -525,8 +1081,8 @@ class TestLimeSurveyUtilities(TestCase):
             - The exception is raised.
         """
         new_session_key = "test-session-key-1"
+        cache.clear()
         self.xblock.call_procedure = Mock(return_value=new_session_key)
-        self.xblock.get_survey_summary = Mock(side_effect=InvalidSessionKey)
         self.xblock.last_login_attempt = datetime.now().replace(tzinfo=pytz.utc) - timedelta(days=1)
 
         self.xblock.set_session_key()
@@ -0,0 +1,167 @@
+"""
+Tests for the LimeSurvey API metrics.
+"""
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from django.test.utils import override_settings
+from xblock.field_data import DictFieldData
+
+from limesurvey.budget import RequestBudget
+from limesurvey.client import LimeSurveyClient
+from limesurvey.limesurvey import LimeSurveyConnectionError, LimeSurveyXBlock, NoParticipantFound
+from limesurvey.metrics import (
+    ERRORS_METRIC,
+    LATENCY_METRIC,
+    PAYLOAD_SIZE_METRIC,
+    BUDGET_REMAINING_METRIC,
+    RETRIES_METRIC,
+    STALE_ACCESS_CODES_METRIC,
+    MetricsSink,
+    get_metrics_sink,
+    record_render_budget,
+    record_stale_access_code,
+)
+
+
+class RecordingMetricsSink(MetricsSink):
+    """
+    Sink keeping the metrics in memory.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        """
+        Initialize the recorded metrics.
+        """
+        self.records = []
+
+    def timing(self, name, seconds, tags):
+        """
+        Record a duration.
+        """
+        self.records.append((name, tags))
+
+    def histogram(self, name, value, tags):
+        """
+        Record a value.
+        """
+        self.records.append((name, tags))
+
+    def increment(self, name, tags):
+        """
+        Record a counter increment.
+        """
+        self.records.append((name, tags))
+
+
+class TestMetrics(TestCase):
+    """
+    Test suite for the LimeSurvey API metrics.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test suite.
+        """
+        settings_override = override_settings(
+            LIMESURVEY_METRICS_SINK="limesurvey.tests.test_metrics.RecordingMetricsSink",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.xblock = LimeSurveyXBlock(runtime=Mock(), field_data=DictFieldData({}), scope_ids=Mock())
+        self.sink = get_metrics_sink()
+        self.sink.records.clear()
+
+    @override_settings(LIMESURVEY_METRICS_SINK=None)
+    def test_default_sink_is_disabled(self):
+        """
+        Check the default sink drops the metrics.
+
+        Expected result:
+            - The default sink is a disabled MetricsSink.
+        """
+        self.assertIs(MetricsSink, type(get_metrics_sink()))
+        self.assertFalse(get_metrics_sink().enabled)
+
+    @patch.object(LimeSurveyClient, "_call_procedure", return_value={"completed_responses": 1})
+    def test_call_procedure_metrics(self, _):
+        """
+        Check the latency and payload size of a successful call are recorded by method.
+
+        Expected result:
+            - No error is recorded.
+        """
+        self.xblock.call_procedure("get_session_key", "user", "password", get_session_key=True)
+
+        self.assertEqual([
+            (LATENCY_METRIC, {"method": "get_session_key"}),
+            (PAYLOAD_SIZE_METRIC, {"method": "get_session_key"}),
+        ], self.sink.records)
+
+    @patch.object(LimeSurveyClient, "_call_procedure", side_effect=NoParticipantFound)
+    def test_call_procedure_error_metrics(self, _):
+        """
+        Check the errors are counted by method and exception.
+
+        Expected result:
+            - The error is recorded with the exception name and raised.
+        """
+        with self.assertRaises(NoParticipantFound):
+            self.xblock.call_procedure("list_participants", 1, get_session_key=True)
+
+        self.assertIn(
+            (ERRORS_METRIC, {"method": "list_participants", "error": "NoParticipantFound"}), self.sink.records,
+        )
+
+    @patch.object(LimeSurveyClient, "session_key", "session-key")
+    @patch.object(LimeSurveyClient, "_call_procedure_batch")
+    def test_call_procedure_batch_metrics(self, call_procedure_batch_mock):
+        """
+        Check each call of a batch is recorded under its method.
+
+        Expected result:
+            - The error returned for a call of the batch is counted.
+        """
+        call_procedure_batch_mock.return_value = [NoParticipantFound(), {"token": "token"}]
+
+        self.xblock.call_procedure_batch([("list_participants", [1]), ("get_participant_properties", [1])])
+
+        self.assertIn(
+            (ERRORS_METRIC, {"method": "list_participants", "error": "NoParticipantFound"}), self.sink.records,
+        )
+        self.assertIn((LATENCY_METRIC, {"method": "get_participant_properties"}), self.sink.records)
+        self.assertNotIn((ERRORS_METRIC, {"method": "get_participant_properties"}), [
+            (name, {"method": tags["method"]}) for name, tags in self.sink.records
+        ])
+
+    def test_stale_access_code_metric(self):
+        """
+        Check the stale access codes served are counted by error.
+
+        Expected result:
+            - The counter is incremented with the exception name.
+        """
+        record_stale_access_code(LimeSurveyConnectionError())
+
+        self.assertEqual([(STALE_ACCESS_CODES_METRIC, {"error": "LimeSurveyConnectionError"})], self.sink.records)
+
+    def test_render_budget_metrics(self):
+        """
+        Check the retries and the remaining budget of a render are recorded by view.
+
+        Expected result:
+            - The retries counter is incremented once per retry and the remaining budget is recorded.
+        """
+        budget = RequestBudget(1)
+        budget.record_retry()
+        budget.record_retry()
+
+        record_render_budget("student_view", budget)
+
+        self.assertEqual([
+            (RETRIES_METRIC, {"view": "student_view"}),
+            (RETRIES_METRIC, {"view": "student_view"}),
+            (BUDGET_REMAINING_METRIC, {"view": "student_view"}),
+        ], self.sink.records)
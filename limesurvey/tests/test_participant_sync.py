@@ -0,0 +1,164 @@
+"""
+Tests for the sync of the LimeSurvey participants with the course enrollments.
+"""
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from django.test.utils import override_settings
+from xblock.field_data import DictFieldData
+
+from limesurvey.limesurvey import LimeSurveyXBlock
+from limesurvey.participant_sync import ParticipantChange, ParticipantSyncQueue
+from limesurvey.receivers import sync_enrollment_participants
+from test_utils.mixins import FakeLimeSurveyMixin
+
+SYNC_MODULE = "limesurvey.participant_sync"
+SURVEY_ID = 123456
+LOCATION = "block-v1:edX+DemoX+Demo_Course+type@limesurvey+block@survey"
+
+
+@patch(f"{SYNC_MODULE}.update_student_module_state")
+@patch(f"{SYNC_MODULE}.modulestore")
+class TestParticipantSyncQueue(FakeLimeSurveyMixin, TestCase):
+    """
+    Test suite for the participant sync queue.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a fake LimeSurvey server and a closed-access survey block.
+        """
+        self.server = self.start_fake_limesurvey()
+
+        self.block = LimeSurveyXBlock(
+            runtime=Mock(),
+            field_data=DictFieldData({"survey_id": SURVEY_ID, "anonymous_survey": False}),
+            scope_ids=Mock(),
+        )
+        self.queue = ParticipantSyncQueue()
+        self.users = [Mock(email=f"learner{index}@example.com", profile=Mock()) for index in range(3)]
+        for index, user in enumerate(self.users):
+            user.profile.name = f"Learner {index}"
+
+    def enqueue(self, index, enrolled):
+        """
+        Queue the enrollment change of a learner without scheduling the flush.
+        """
+        with patch(f"{SYNC_MODULE}.threading.Timer"):
+            self.queue.enqueue(LOCATION, f"anonymous-{index}", ParticipantChange(self.users[index], enrolled))
+
+    def test_flush(self, modulestore_mock, update_state_mock):
+        """
+        Check the queued changes are sent in batches.
+
+        Expected result:
+            - The enrolled learners are added in a single call and their access codes stored.
+            - The unenrolled participant is deleted.
+        """
+        modulestore_mock.return_value.get_item.return_value = self.block
+        self.server.limesurvey.participants[SURVEY_ID][1] = {
+            "tid": 1, "token": "token-2", "attribute_1": "anonymous-2",
+        }
+        self.enqueue(0, enrolled=True)
+        self.enqueue(1, enrolled=True)
+        self.enqueue(2, enrolled=False)
+
+        self.queue.flush()
+
+        self.assertEqual(
+            {"anonymous-0", "anonymous-1"},
+            {participant["attribute_1"] for participant in self.server.limesurvey.participants[SURVEY_ID].values()},
+        )
+        self.assertEqual(1, self.server.limesurvey.calls["add_participants"])
+        self.assertEqual(1, self.server.limesurvey.calls["delete_participants"])
+        self.assertEqual(2, update_state_mock.call_count)
+        self.assertEqual({}, self.queue.pending)
+
+    def test_refresh(self, modulestore_mock, update_state_mock):
+        """
+        Check the access code of a registered learner is stored again when a refresh is queued.
+
+        Expected result:
+            - The learner isn't added and their current token is stored.
+        """
+        modulestore_mock.return_value.get_item.return_value = self.block
+        self.server.limesurvey.participants[SURVEY_ID][1] = {
+            "tid": 1, "token": "token-0", "attribute_1": "anonymous-0",
+        }
+        with patch(f"{SYNC_MODULE}.threading.Timer"):
+            self.queue.enqueue(LOCATION, "anonymous-0", ParticipantChange(self.users[0], True, refresh=True))
+
+        self.queue.flush()
+
+        self.assertEqual(0, self.server.limesurvey.calls["add_participants"])
+        update_state_mock.assert_called_once()
+        self.assertEqual("token-0", update_state_mock.call_args.args[3]["access_code"])
+
+    def test_last_change_wins(self, modulestore_mock, update_state_mock):
+        """
+        Check a learner enrolling and unenrolling before the flush isn't added.
+
+        Expected result:
+            - No participant is added nor deleted.
+        """
+        modulestore_mock.return_value.get_item.return_value = self.block
+        self.enqueue(0, enrolled=True)
+        self.enqueue(0, enrolled=False)
+
+        self.queue.flush()
+
+        self.assertEqual(0, self.server.limesurvey.calls["add_participants"])
+        self.assertEqual(0, self.server.limesurvey.calls["delete_participants"])
+        update_state_mock.assert_not_called()
+
+    def test_enqueue_schedules_a_single_flush(self, modulestore_mock, _):
+        """
+        Check the changes queued before the flush share the same timer.
+
+        Expected result:
+            - A single timer is started.
+        """
+        with patch(f"{SYNC_MODULE}.threading.Timer") as timer_mock:
+            self.queue.enqueue(LOCATION, "anonymous-0", ParticipantChange(self.users[0], True))
+            self.queue.enqueue(LOCATION, "anonymous-1", ParticipantChange(self.users[1], True))
+
+        timer_mock.assert_called_once()
+        timer_mock.return_value.start.assert_called_once()
+        modulestore_mock.assert_not_called()
+
+
+class TestSyncEnrollmentParticipants(TestCase):
+    """
+    Test suite for the enrollment signal receiver.
+    """
+
+    @patch("limesurvey.receivers.participant_sync_queue")
+    def test_sync_disabled(self, queue_mock):
+        """
+        Check the enrollments aren't queued unless the sync is enabled.
+
+        Expected result:
+            - Nothing is queued.
+        """
+        sync_enrollment_participants(sender=None, event="enroll", user=Mock(), course_id="course-id")
+
+        queue_mock.enqueue_enrollment.assert_not_called()
+
+    @override_settings(LIMESURVEY_ENROLLMENT_SYNC_ENABLED=True)
+    @patch("limesurvey.receivers.participant_sync_queue")
+    def test_sync_enabled(self, queue_mock):
+        """
+        Check the enrollment and unenrollment events are queued, and the other events ignored.
+
+        Expected result:
+            - Each enrollment change is queued once.
+        """
+        user = Mock()
+
+        for event in ("enroll", "unenroll", "upgrade_start"):
+            sync_enrollment_participants(sender=None, event=event, user=user, course_id="course-id")
+
+        self.assertEqual(
+            [((user, "course-id"), {"enrolled": True}), ((user, "course-id"), {"enrolled": False})],
+            [(call.args, call.kwargs) for call in queue_mock.enqueue_enrollment.call_args_list],
+        )
@@ -0,0 +1,289 @@
+"""
+Tests for the batched provisioning of the survey blocks rendered in the same request.
+"""
+import threading
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from xblock.field_data import DictFieldData
+
+from limesurvey.budget import get_current_budget, request_budget
+from limesurvey.executor import ProvisioningExecutor
+from limesurvey.limesurvey import LimeSurveyXBlock
+from limesurvey.provisioning import COLLECTOR_ATTRIBUTE
+from limesurvey.settings.common import plugin_settings
+from test_utils.fake_limesurvey import FakeLimeSurveyServer
+from test_utils.mixins import FakeLimeSurveyMixin
+
+
+class TestProvisioningCollector(FakeLimeSurveyMixin, TestCase):
+    """
+    Test suite for the request-scoped provisioning collector.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a fake LimeSurvey server and a unit with several closed-access surveys.
+        """
+        self.server = self.start_fake_limesurvey()
+
+        self.request = SimpleNamespace()
+        request_patcher = patch("limesurvey.provisioning.get_current_request", return_value=self.request)
+        request_patcher.start()
+        self.addCleanup(request_patcher.stop)
+
+        self.user = SimpleNamespace(emails=["learner@example.com"], full_name="Learner")
+        parent = Mock()
+        self.blocks = [self.make_block(survey_id, parent) for survey_id in (1, 2, 1)]
+        parent.get_children.return_value = [*self.blocks, Mock(scope_ids=Mock(block_type="html"))]
+
+    @staticmethod
+    def make_block(survey_id, parent) -> LimeSurveyXBlock:
+        """
+        Return a closed-access survey block of the unit.
+        """
+        block = LimeSurveyXBlock(
+            runtime=Mock(),
+            field_data=DictFieldData({"survey_id": survey_id, "anonymous_survey": False}),
+            scope_ids=Mock(block_type="limesurvey"),
+        )
+        block.get_parent = Mock(return_value=parent)
+        return block
+
+    def render_unit(self):
+        """
+        Set up the student view of every block of the unit, in order.
+        """
+        for block in self.blocks:
+            block.setup_student_view_survey(self.user, "anonymous-user-id")
+
+    def test_unit_provisioned_in_batches(self):
+        """
+        Check the surveys of a unit are provisioned with one lookup and one insert batch.
+
+        Expected result:
+            - The learner is added once to each survey and the blocks of the same survey share the token.
+        """
+        self.render_unit()
+
+        self.assertEqual(3, self.server.limesurvey.requests)
+        self.assertEqual(2, self.server.limesurvey.calls["add_participants"])
+        self.assertEqual(self.blocks[0].access_code, self.blocks[2].access_code)
+        self.assertTrue(self.blocks[1].access_code)
+        self.assertEqual(2, len(getattr(self.request, COLLECTOR_ATTRIBUTE).access_codes))
+
+    def test_registered_learner(self):
+        """
+        Check a learner already registered in every survey costs a single lookup batch.
+
+        Expected result:
+            - No participant is added and the existing tokens are used.
+        """
+        self.render_unit()
+        for block in self.blocks:
+            block.access_code = None
+        self.request = SimpleNamespace()
+        self.server.limesurvey.reset_stats()
+
+        with patch("limesurvey.provisioning.get_current_request", return_value=self.request):
+            self.render_unit()
+
+        self.assertEqual(1, self.server.limesurvey.requests)
+        self.assertEqual(0, self.server.limesurvey.calls["add_participants"])
+        self.assertTrue(all(block.access_code for block in self.blocks))
+
+    def test_failed_survey(self):
+        """
+        Check a survey failing to provision doesn't prevent the others.
+
+        Expected result:
+            - The error is raised for the blocks of the failed survey only.
+        """
+        self.server.limesurvey.inject_status("list_participants", "Error: Invalid survey ID")
+
+        with self.assertRaises(Exception):
+            self.blocks[0].setup_student_view_survey(self.user, "anonymous-user-id")
+        self.blocks[1].setup_student_view_survey(self.user, "anonymous-user-id")
+
+        self.assertTrue(self.blocks[1].access_code)
+        self.assertEqual(3, self.server.limesurvey.requests)
+
+    def test_deferred_provisioning(self):
+        """
+        Check the handler requests of deferred surveys only provision their own survey.
+
+        Expected result:
+            - Each survey of the unit is looked up once, and the learner added once to each of them.
+        """
+        user = SimpleNamespace(
+            emails=self.user.emails,
+            full_name=self.user.full_name,
+            opt_attrs={"edx-platform.user_role": "student", "edx-platform.anonymous_user_id": "anonymous-user-id"},
+        )
+        for block in self.blocks:
+            self.assertTrue(block.setup_student_view_survey(user, "anonymous-user-id", defer_provisioning=True))
+
+        for block in self.blocks:
+            block.runtime.service.return_value.get_current_user.return_value = user
+            with patch("limesurvey.provisioning.get_current_request", return_value=SimpleNamespace()):
+                response = block.provision_survey(Mock(method="POST", body=b"{}"))
+            self.assertTrue(response.json["access_code"])
+
+        self.assertEqual(3, self.server.limesurvey.calls["list_participants"])
+        self.assertEqual(2, self.server.limesurvey.calls["add_participants"])
+
+    def test_default_configuration(self):
+        """
+        Check the surveys of a unit are left to the provision_survey handler with the default settings.
+
+        Expected result:
+            - Provisioning is deferred, so the unit makes no API call and no batch.
+        """
+        defaults = SimpleNamespace(MAKO_TEMPLATE_DIRS_BASE=[])
+        plugin_settings(defaults)
+
+        for block in self.blocks:
+            self.assertTrue(block.setup_student_view_survey(
+                self.user, "anonymous-user-id", defer_provisioning=defaults.LIMESURVEY_DEFERRED_PROVISIONING,
+            ))
+
+        self.assertEqual(0, self.server.limesurvey.requests)
+        self.assertFalse(hasattr(self.request, COLLECTOR_ATTRIBUTE))
+
+    def test_endpoints_provisioned_concurrently(self):
+        """
+        Check the surveys of different LimeSurvey APIs are provisioned in parallel.
+
+        Expected result:
+            - Every block gets its access code from its own server.
+        """
+        other_server = FakeLimeSurveyServer().start()
+        self.addCleanup(other_server.stop)
+        self.blocks[1].limesurvey_internal_api = other_server.url
+
+        self.render_unit()
+
+        self.assertTrue(all(block.access_code for block in self.blocks))
+        self.assertEqual(1, other_server.limesurvey.calls["add_participants"])
+        self.assertEqual(1, self.server.limesurvey.calls["add_participants"])
+
+    def test_fields_written_in_request_thread(self):
+        """
+        Check the concurrent provisioning only logs in from the request thread.
+
+        Expected result:
+            - The logins updating the fields of the blocks run in the request thread.
+        """
+        other_server = FakeLimeSurveyServer().start()
+        self.addCleanup(other_server.stop)
+        self.blocks[1].limesurvey_internal_api = other_server.url
+        login = LimeSurveyXBlock.login
+        threads = []
+
+        def record_login(block):
+            threads.append(threading.current_thread())
+            return login(block)
+
+        with patch.object(LimeSurveyXBlock, "login", autospec=True, side_effect=record_login):
+            self.render_unit()
+
+        self.assertEqual([threading.main_thread()] * 2, threads)
+        self.assertTrue(all(block.access_code for block in self.blocks))
+
+
+class TestProvisioningExecutor(TestCase):
+    """
+    Test suite for the provisioning executor.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test suite.
+        """
+        self.executor = ProvisioningExecutor(max_workers=4, endpoint_concurrency=2)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_tasks_run_concurrently(self):
+        """
+        Check the tasks of different endpoints run at the same time.
+
+        Expected result:
+            - Both tasks pass a barrier only reachable concurrently.
+        """
+        barrier = threading.Barrier(2, timeout=1)
+
+        results = self.executor.run([("https://a", barrier.wait), ("https://b", barrier.wait)])
+
+        self.assertEqual([0, 1], sorted(results))
+
+    def test_endpoint_concurrency(self):
+        """
+        Check the tasks running at once against an endpoint are bounded.
+
+        Expected result:
+            - The third task of the endpoint can't reach the barrier with the other two.
+        """
+        barrier = threading.Barrier(3, timeout=0.2)
+
+        results = self.executor.run([("https://a", barrier.wait)] * 3)
+
+        self.assertTrue(all(isinstance(result, threading.BrokenBarrierError) for result in results))
+
+    def test_deadline(self):
+        """
+        Check the caller waits at most its time budget and the tasks not started are cancelled.
+
+        Expected result:
+            - The results are TimeoutError and the queued task never runs.
+        """
+        started = threading.Event()
+        queued = Mock()
+
+        with request_budget(0.1):
+            results = self.executor.run([
+                ("https://a", lambda: started.wait(1)),
+                ("https://a", lambda: started.wait(1)),
+                ("https://a", queued),
+            ])
+        started.set()
+
+        self.assertTrue(all(isinstance(result, TimeoutError) for result in results))
+        queued.assert_not_called()
+
+    def test_context_propagation(self):
+        """
+        Check the tasks run with the time budget of the caller.
+
+        Expected result:
+            - The task sees the budget of the caller.
+        """
+        with request_budget(1) as budget:
+            results = self.executor.run([("https://a", get_current_budget)])
+
+        self.assertEqual([budget], results)
+
+    def test_shutdown_cancels_queued_tasks(self):
+        """
+        Check the tasks not started yet are cancelled on shutdown.
+
+        Expected result:
+            - The queued task never runs.
+        """
+        executor = ProvisioningExecutor(max_workers=1, endpoint_concurrency=1)
+        started = threading.Event()
+        release = threading.Event()
+        queued = Mock()
+
+        def block():
+            started.set()
+            release.wait(1)
+
+        executor.submit("https://a", block)
+        future = executor.submit("https://a", queued)
+        started.wait(1)
+        executor.shutdown()
+        release.set()
+
+        self.assertTrue(future.cancelled())
+        queued.assert_not_called()
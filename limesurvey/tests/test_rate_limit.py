@@ -0,0 +1,204 @@
+"""
+Tests for the rate limiting of the LimeSurvey API calls.
+"""
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+from xblock.field_data import DictFieldData
+
+from limesurvey.budget import request_budget
+from limesurvey.limesurvey import LimeSurveyUnavailable, LimeSurveyXBlock
+from limesurvey.rate_limit import BUCKET_WINDOW, BULK_POOL, PROVISIONING_POOL, RateLimiter, rate_limit_pool
+
+ENDPOINT = "https://test-limesurvey.com/index.php/admin/remotecontrol"
+
+
+class TestRateLimiter(TestCase):
+    """
+    Test suite for the token-bucket rate limiter.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test suite with a controlled clock.
+        """
+        cache.clear()
+        settings_override = override_settings(
+            LIMESURVEY_RATE_LIMIT_PROVISIONING_RATE=1,
+            LIMESURVEY_RATE_LIMIT_PROVISIONING_BURST=3,
+            LIMESURVEY_RATE_LIMIT_BULK_RATE=10,
+            LIMESURVEY_RATE_LIMIT_BULK_BURST=1,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.limiter = RateLimiter()
+        self.now = 1000.0
+        time_patcher = patch("limesurvey.rate_limit.time")
+        time_mock = time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+        time_mock.time.side_effect = lambda: self.now
+        time_mock.sleep.side_effect = self.sleep
+
+    def sleep(self, seconds):
+        """
+        Advance the controlled clock.
+        """
+        self.now += seconds
+
+    def acquired(self, count: int, pool: str = PROVISIONING_POOL) -> int:
+        """
+        Return how many of `count` requests of the pool got a token.
+        """
+        return sum(self.limiter.try_acquire(ENDPOINT, pool) for __ in range(count))
+
+    def test_burst(self):
+        """
+        Check a full bucket allows a burst and then the rate.
+
+        Expected result:
+            - The burst is allowed right away, then one call per second.
+        """
+        self.assertEqual(3, self.acquired(5))
+
+        self.now += 2
+
+        self.assertEqual(2, self.acquired(5))
+
+    def test_idle_credit_capped(self):
+        """
+        Check an idle bucket doesn't accumulate more tokens than the burst.
+
+        Expected result:
+            - Only the burst is allowed after a long idle period.
+        """
+        self.acquired(1)
+        self.now += 100
+
+        self.assertEqual(3, self.acquired(10))
+
+    def test_idle_credit_capped_with_concurrent_calls(self):
+        """
+        Check the tokens taken by another worker while the credit of an idle bucket is capped are kept.
+
+        Expected result:
+            - The calls of both workers count against the burst.
+        """
+        self.acquired(1)
+        self.now += 100
+        incr = cache.incr
+        concurrent = []
+
+        def incr_with_concurrent_call(key, delta=1):
+            taken = incr(key, delta)
+            if not concurrent:
+                concurrent.append(incr(key, 1))
+            return taken
+
+        with patch.object(cache, "incr", side_effect=incr_with_concurrent_call):
+            self.assertEqual(1, self.acquired(1))
+
+        self.assertEqual(1, self.acquired(10))
+
+    def test_window_starts_full(self):
+        """
+        Check the first bucket of a window holds the burst.
+
+        Expected result:
+            - The burst is allowed right at the start of the window.
+        """
+        self.now = BUCKET_WINDOW * 10 + 0.05
+
+        self.assertEqual(3, self.acquired(5))
+
+    def test_credit_carried_to_next_window(self):
+        """
+        Check a new window starts with the credit left at the end of the previous one.
+
+        Expected result:
+            - A bucket emptied a second before the end of a window only has the token earned since.
+        """
+        self.now = BUCKET_WINDOW * 11 - 1
+        self.acquired(5)
+
+        self.now = BUCKET_WINDOW * 11 + 0.5
+
+        self.assertEqual(1, self.acquired(5))
+
+    def test_pools_have_separate_buckets(self):
+        """
+        Check the bulk calls don't take the tokens of the learner views.
+
+        Expected result:
+            - The bulk bucket is still available when the provisioning one is empty.
+        """
+        self.acquired(3)
+
+        self.assertEqual(0, self.acquired(1))
+        self.assertEqual(1, self.acquired(1, BULK_POOL))
+
+    def test_disabled(self):
+        """
+        Check the calls aren't limited without a rate.
+
+        Expected result:
+            - Every call is allowed.
+        """
+        with override_settings(LIMESURVEY_RATE_LIMIT_PROVISIONING_RATE=None):
+            self.assertEqual(100, self.acquired(100))
+
+    def test_bulk_calls_wait(self):
+        """
+        Check the bulk calls wait for tokens while the learner views fail fast.
+
+        Expected result:
+            - The bulk call is allowed after waiting, the provisioning call is rejected.
+        """
+        self.acquired(3)
+        self.acquired(1, BULK_POOL)
+
+        self.assertFalse(self.limiter.acquire(ENDPOINT))
+        with rate_limit_pool(BULK_POOL):
+            start = self.now
+            self.assertTrue(self.limiter.acquire(ENDPOINT))
+        self.assertGreater(self.now, start)
+
+    def test_bulk_wait_bounded_by_budget(self):
+        """
+        Check the bulk calls don't wait beyond the time budget of the context.
+
+        Expected result:
+            - The call is rejected.
+        """
+        self.acquired(1, BULK_POOL)
+
+        with rate_limit_pool(BULK_POOL), request_budget(0):
+            self.assertFalse(self.limiter.acquire(ENDPOINT))
+
+
+class TestRateLimitedApiCalls(TestCase):
+    """
+    Test suite for the rate limiting of the LimeSurveyXBlock API calls.
+    """
+
+    @override_settings(LIMESURVEY_RATE_LIMIT_PROVISIONING_RATE=1, LIMESURVEY_RATE_LIMIT_PROVISIONING_BURST=1)
+    @patch("limesurvey.client.get_transport")
+    def test_call_rejected_when_bucket_empty(self, transport_mock):
+        """
+        Check a learner call isn't sent when the bucket of the endpoint is empty.
+
+        Expected result:
+            - LimeSurveyUnavailable is raised without calling the API.
+        """
+        cache.clear()
+        transport_mock.return_value.post.return_value = Mock(ok=True, json=Mock(return_value={"result": {}}))
+        block = LimeSurveyXBlock(
+            runtime=Mock(), field_data=DictFieldData({"limesurvey_internal_api": ENDPOINT}), scope_ids=Mock(),
+        )
+        block.call_procedure("get_session_key", "user", "password", get_session_key=True)
+
+        with self.assertRaises(LimeSurveyUnavailable):
+            block.call_procedure("get_summary", 1)
+
+        transport_mock.return_value.post.assert_called_once()
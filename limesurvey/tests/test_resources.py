@@ -0,0 +1,72 @@
+"""
+Tests for the index of the LimeSurvey XBlock static resources.
+"""
+from unittest import TestCase
+from unittest.mock import patch
+
+from ddt import data, ddt, unpack
+
+from limesurvey.resources import get_resource_string, get_static_resources, get_statici18n_js_path
+
+
+@ddt
+class TestResources(TestCase):
+    """
+    Test suite for the static resources index.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test suite.
+        """
+        get_statici18n_js_path.cache_clear()
+        self.addCleanup(get_statici18n_js_path.cache_clear)
+
+    def test_static_resources_read_once(self):
+        """
+        Check the indexed resources are served without reading the package again.
+
+        Expected result:
+            - The resource content matches the packaged file.
+            - The package is not accessed for indexed resources.
+        """
+        get_static_resources.cache_clear()
+        get_static_resources()
+        with open("limesurvey/static/css/limesurvey.css", encoding="utf8") as css_file:
+            expected_content = css_file.read()
+
+        with patch("limesurvey.resources.pkg_resources") as pkg_resources_mock:
+            content = get_resource_string("static/css/limesurvey.css")
+
+        self.assertEqual(expected_content, content)
+        pkg_resources_mock.resource_string.assert_not_called()
+
+    @patch("limesurvey.resources.get_statici18n_locales")
+    @data(
+        ("es-419", "public/js/translations/es-419/text.js"),
+        ("es-ar", "public/js/translations/es/text.js"),
+        ("fr", "public/js/translations/en/text.js"),
+    )
+    @unpack
+    def test_statici18n_js_path(self, locale_code, expected_path, locales_mock):
+        """
+        Check the translations file falls back to the language and to English.
+
+        Expected result:
+            - The most specific available translations file is returned.
+        """
+        locales_mock.return_value = frozenset({"es-419", "es", "en"})
+
+        self.assertEqual(expected_path, get_statici18n_js_path(locale_code))
+
+    @patch("limesurvey.resources.get_statici18n_locales")
+    def test_statici18n_js_path_not_available(self, locales_mock):
+        """
+        Check no translations file is returned when none is packaged.
+
+        Expected result:
+            - None is returned.
+        """
+        locales_mock.return_value = frozenset()
+
+        self.assertIsNone(get_statici18n_js_path("es-419"))
@@ -0,0 +1,163 @@
+"""
+Tests for the LimeSurvey session keys manager.
+"""
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+from xblock.field_data import DictFieldData
+
+from limesurvey.limesurvey import LimeSurveyXBlock
+from limesurvey.session import LimeSurveySessionManager
+from test_utils.mixins import FakeLimeSurveyMixin
+
+
+class TestLimeSurveySessionManager(TestCase):
+    """
+    Test suite for the shared LimeSurvey session keys manager.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test suite.
+        """
+        cache.clear()
+        self.manager = LimeSurveySessionManager()
+        self.api_url = "https://test-url.com/index.php/admin/remotecontrol"
+        self.api_user = "test-user"
+
+    def test_session_key_shared_by_api_and_user(self):
+        """
+        Check session keys are indexed by the API URL and the API user.
+
+        Expected result:
+            - The key is returned for the same API and user only.
+        """
+        self.manager.set(self.api_url, self.api_user, "test-session-key")
+
+        self.assertEqual("test-session-key", self.manager.get(self.api_url, self.api_user))
+        self.assertIsNone(self.manager.get(self.api_url, "other-user"))
+        self.assertIsNone(self.manager.get("https://other-url.com", self.api_user))
+
+    @override_settings(LIMESURVEY_SESSION_KEY_TTL=-1)
+    def test_session_key_expires(self):
+        """
+        Check session keys are stored with the configured TTL.
+
+        Expected result:
+            - The expired key is not returned.
+        """
+        self.manager.set(self.api_url, self.api_user, "test-session-key")
+
+        self.assertIsNone(self.manager.get(self.api_url, self.api_user))
+
+    def test_invalidate_keeps_refreshed_key(self):
+        """
+        Check invalidating a stale key does not remove a key refreshed meanwhile.
+
+        Expected result:
+            - The refreshed key is kept when the stale one is invalidated.
+            - The key is removed when it is the invalidated one.
+        """
+        self.manager.set(self.api_url, self.api_user, "test-session-key-2")
+
+        self.manager.invalidate(self.api_url, self.api_user, "test-session-key-1")
+        self.assertEqual("test-session-key-2", self.manager.get(self.api_url, self.api_user))
+
+        self.manager.invalidate(self.api_url, self.api_user, "test-session-key-2")
+        self.assertIsNone(self.manager.get(self.api_url, self.api_user))
+
+    def test_refresh_logs_in_once(self):
+        """
+        Check the login is only called when there is no shared key.
+
+        Expected result:
+            - The new key is stored and reused by the next refresh.
+        """
+        login = Mock(return_value="test-session-key")
+
+        self.assertEqual("test-session-key", self.manager.refresh(self.api_url, self.api_user, login))
+        self.assertEqual("test-session-key", self.manager.refresh(self.api_url, self.api_user, login))
+        login.assert_called_once()
+
+    def test_refresh_waits_for_the_lock_holder(self):
+        """
+        Check a refresh waits for the key of the process logging in instead of logging in too.
+
+        Expected result:
+            - The key stored by the lock holder is returned without logging in.
+        """
+        cache.add(f"{self.manager.cache_key(self.api_url, self.api_user)}.lock", True)
+        threading.Timer(0.1, self.manager.set, args=(self.api_url, self.api_user, "test-session-key")).start()
+        login = Mock()
+
+        session_key = self.manager.refresh(self.api_url, self.api_user, login)
+
+        self.assertEqual("test-session-key", session_key)
+        login.assert_not_called()
+
+    def test_refresh_after_failed_login(self):
+        """
+        Check a refresh logs in itself when the lock holder released the lock without a key.
+
+        Expected result:
+            - The login is called once the lock is released.
+        """
+        lock_key = f"{self.manager.cache_key(self.api_url, self.api_user)}.lock"
+        cache.add(lock_key, True)
+        threading.Timer(0.1, cache.delete, args=(lock_key,)).start()
+
+        session_key = self.manager.refresh(self.api_url, self.api_user, Mock(return_value="test-session-key"))
+
+        self.assertEqual("test-session-key", session_key)
+
+    @override_settings(LIMESURVEY_SESSION_KEY_LOCK_TIMEOUT=0.1)
+    def test_refresh_timeout(self):
+        """
+        Check the wait for the lock holder is bounded.
+
+        Expected result:
+            - TimeoutError is raised.
+        """
+        cache.add(f"{self.manager.cache_key(self.api_url, self.api_user)}.lock", True, 10)
+
+        with self.assertRaises(TimeoutError):
+            self.manager.refresh(self.api_url, self.api_user, Mock())
+
+
+class TestSessionKeyRefresh(FakeLimeSurveyMixin, TestCase):
+    """
+    Test suite for the session key refresh of the LimeSurveyXBlock against the fake LimeSurvey server.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a slow fake LimeSurvey server.
+        """
+        self.server = self.start_fake_limesurvey({"LIMESURVEY_SINGLE_FLIGHT_ENABLED": False}, latency=0.1)
+
+    def test_expired_session_refreshed_once(self):
+        """
+        Check a single worker logs in again when the shared key expires.
+
+        Expected result:
+            - The key is requested once and a single learner has a login attempt.
+        """
+        LimeSurveyXBlock(runtime=Mock(), field_data=DictFieldData({}), scope_ids=Mock()).set_session_key()
+        self.server.limesurvey.expire_sessions()
+        self.server.limesurvey.reset_stats()
+        blocks = [
+            LimeSurveyXBlock(runtime=Mock(), field_data=DictFieldData({"survey_id": 1}), scope_ids=Mock())
+            for __ in range(5)
+        ]
+        threads = [threading.Thread(target=block.call_procedure, args=("get_summary", 1)) for block in blocks]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, self.server.limesurvey.calls["get_session_key"])
+        self.assertEqual(1, sum(1 for block in blocks if block.last_login_attempt))
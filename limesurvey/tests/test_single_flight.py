@@ -0,0 +1,194 @@
+"""
+Tests for the coalescing of identical concurrent LimeSurvey API calls.
+"""
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+from xblock.field_data import DictFieldData
+
+from limesurvey.limesurvey import LimeSurveyXBlock
+from limesurvey.single_flight import SINGLE_FLIGHT_CACHE_PREFIX, SingleFlight
+from test_utils.mixins import FakeLimeSurveyMixin
+
+SURVEY_ID = 123456
+
+
+def run_concurrently(function, count: int = 5) -> list:
+    """
+    Call the function from several threads at once and return their results.
+    """
+    results = [None] * count
+
+    def run(index):
+        try:
+            results[index] = function()
+        except Exception as error:  # pylint: disable=broad-except
+            results[index] = error
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight(TestCase):
+    """
+    Test suite for the single-flight call coalescing.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test suite.
+        """
+        cache.clear()
+        self.single_flight = SingleFlight()
+        self.release = threading.Event()
+
+    def slow_call(self, result):
+        """
+        Return a mock waiting for the release of the test before returning the result.
+        """
+        def call():
+            self.release.wait(1)
+            return result
+
+        threading.Timer(0.1, self.release.set).start()
+        return Mock(side_effect=call)
+
+    def test_concurrent_calls_share_a_request(self):
+        """
+        Check identical concurrent calls are sent once.
+
+        Expected result:
+            - Every caller gets the result of the single call.
+        """
+        call = self.slow_call({"completed_responses": 1})
+
+        results = run_concurrently(lambda: self.single_flight.do("key", call))
+
+        call.assert_called_once()
+        self.assertEqual([{"completed_responses": 1}] * 5, results)
+
+    def test_errors_are_shared(self):
+        """
+        Check the error of the shared call is raised for every caller.
+
+        Expected result:
+            - The call is sent once and every caller gets its error.
+        """
+        error = ValueError("LimeSurvey error")
+
+        def fail():
+            self.release.wait(1)
+            raise error
+
+        call = Mock(side_effect=fail)
+        threading.Timer(0.1, self.release.set).start()
+
+        results = run_concurrently(lambda: self.single_flight.do("key", call))
+
+        call.assert_called_once()
+        self.assertEqual([error] * 5, results)
+
+    @override_settings(LIMESURVEY_SINGLE_FLIGHT_ENABLED=False)
+    def test_disabled(self):
+        """
+        Check the calls are sent independently when coalescing is disabled.
+
+        Expected result:
+            - Every caller sends the call.
+        """
+        call = self.slow_call("result")
+
+        run_concurrently(lambda: self.single_flight.do("key", call))
+
+        self.assertEqual(5, call.call_count)
+
+    @override_settings(LIMESURVEY_SINGLE_FLIGHT_SHARED=True)
+    def test_result_shared_across_processes(self):
+        """
+        Check a caller reuses the result stored by the leader of another process.
+
+        Expected result:
+            - The call isn't sent.
+        """
+        cache.add(f"{SINGLE_FLIGHT_CACHE_PREFIX}.key.lock", True)
+        threading.Timer(0.1, cache.set, args=(f"{SINGLE_FLIGHT_CACHE_PREFIX}.key.result", (None,))).start()
+        call = Mock()
+
+        result = self.single_flight.do("key", call)
+
+        self.assertIsNone(result)
+        call.assert_not_called()
+
+    @override_settings(LIMESURVEY_SINGLE_FLIGHT_SHARED=True, LIMESURVEY_SINGLE_FLIGHT_LOCK_TIMEOUT=0.2)
+    def test_leader_of_another_process_lost(self):
+        """
+        Check a caller sends the call itself when the other leader doesn't store a result in time.
+
+        Expected result:
+            - The call is sent once the wait is over.
+        """
+        cache.add(f"{SINGLE_FLIGHT_CACHE_PREFIX}.key.lock", True)
+        call = Mock(return_value="result")
+
+        result = self.single_flight.do("key", call)
+
+        self.assertEqual("result", result)
+        call.assert_called_once()
+
+
+class TestCoalescedApiCalls(FakeLimeSurveyMixin, TestCase):
+    """
+    Test suite for the coalescing of the LimeSurveyXBlock API calls against the fake LimeSurvey server.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a slow fake LimeSurvey server.
+        """
+        self.server = self.start_fake_limesurvey(latency=0.2)
+
+    @staticmethod
+    def make_block() -> LimeSurveyXBlock:
+        """
+        Return a survey block with its own user state.
+        """
+        return LimeSurveyXBlock(runtime=Mock(), field_data=DictFieldData({"survey_id": SURVEY_ID}), scope_ids=Mock())
+
+    def test_read_only_calls_coalesced(self):
+        """
+        Check concurrent identical summaries and logins of a cohort reach the server once.
+
+        Expected result:
+            - A single get_session_key and get_summary request is sent.
+        """
+        def open_summary():
+            block = self.make_block()
+            block.set_session_key()
+            return block.call_procedure("get_summary", SURVEY_ID)
+
+        results = run_concurrently(open_summary)
+
+        self.assertTrue(all(result["completed_responses"] == 0 for result in results))
+        self.assertEqual(1, self.server.limesurvey.calls["get_session_key"])
+        self.assertEqual(1, self.server.limesurvey.calls["get_summary"])
+
+    def test_writes_not_coalesced(self):
+        """
+        Check concurrent writes are sent independently.
+
+        Expected result:
+            - Every add_participants request reaches the server.
+        """
+        block = self.make_block()
+        block.set_session_key()
+
+        run_concurrently(lambda: block.call_procedure("add_participants", SURVEY_ID, [{"email": "a@example.com"}]), 3)
+
+        self.assertEqual(3, self.server.limesurvey.calls["add_participants"])
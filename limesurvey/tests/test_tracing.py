@@ -0,0 +1,76 @@
+"""
+Tests for the tracing spans of the LimeSurvey XBlock views.
+"""
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from django.test.utils import override_settings
+from xblock.field_data import DictFieldData
+
+from limesurvey.limesurvey import LimeSurveyXBlock
+from limesurvey.tracing import start_span
+
+
+class TestTracing(TestCase):
+    """
+    Test suite for the tracing spans of the LimeSurvey XBlock views.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up the test suite.
+        """
+        self.xblock = LimeSurveyXBlock(
+            runtime=Mock(),
+            field_data=DictFieldData({"survey_id": 123456, "anonymous_survey": False}),
+            scope_ids=Mock(),
+        )
+        self.xblock.scope_ids.usage_id = Mock(
+            course_key="course-v1:edX+DemoX+Demo",
+            __str__=Mock(return_value="block-v1:edX+DemoX+Demo+type@limesurvey+block@1"),
+        )
+
+    @override_settings(LIMESURVEY_TRACING_ENABLED=False)
+    @patch("limesurvey.tracing.trace")
+    def test_disabled_tracing(self, trace_mock):
+        """
+        Check no span nor attribute is built when tracing is disabled.
+
+        Expected result:
+            - The tracer and the attributes are not used.
+        """
+        get_attributes = Mock()
+
+        with start_span("limesurvey.test", get_attributes):
+            pass
+
+        trace_mock.get_tracer.assert_not_called()
+        get_attributes.assert_not_called()
+
+    @override_settings(LIMESURVEY_TRACING_ENABLED=True)
+    @patch("limesurvey.tracing.trace")
+    def test_setup_student_view_survey_spans(self, trace_mock):
+        """
+        Check the stages of the student view setup are traced with the block attributes.
+
+        Expected result:
+            - A span is started for each stage, without learner information.
+        """
+        start_as_current_span = trace_mock.get_tracer.return_value.start_as_current_span
+        self.xblock.has_valid_access_code = Mock(return_value=False)
+        self.xblock.set_session_key = Mock()
+        self.xblock.call_procedure_batch = Mock(return_value=[[{"tid": 1}], {"token": "test-token"}])
+
+        with override_settings(LIMESURVEY_URL="https://limesurvey.example.com"):
+            self.xblock.setup_student_view_survey(Mock(), "anonymous-user-id")
+
+        self.assertEqual(
+            ["limesurvey.resolve_config", "limesurvey.session_key", "limesurvey.participant_lookup"],
+            [call.args[0] for call in start_as_current_span.call_args_list],
+        )
+        self.assertEqual({
+            "limesurvey.course_id": "course-v1:edX+DemoX+Demo",
+            "limesurvey.block_id": "block-v1:edX+DemoX+Demo+type@limesurvey+block@1",
+            "limesurvey.survey_id": 123456,
+            "limesurvey.anonymous_survey": False,
+        }, start_as_current_span.call_args.kwargs["attributes"])
@@ -0,0 +1,119 @@
+"""
+Tests for the pooled LimeSurvey HTTP transport.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+
+from django.test.utils import override_settings
+
+from limesurvey.transport import LimeSurveyTransport, get_transport, reset_transport
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """
+    Keep-alive handler that answers with the JSON-RPC id of the request.
+    """
+
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        """
+        Count the connections accepted by the server.
+        """
+        EchoHandler.connections += 1
+        super().setup()
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Answer the JSON-RPC request.
+        """
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"id": payload["id"], "result": "OK", "error": None}).encode("utf8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """
+        Silence the request logs.
+        """
+
+
+class TestLimeSurveyTransport(TestCase):
+    """
+    Test suite for the pooled LimeSurvey HTTP transport.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a local HTTP server for the test suite.
+        """
+        EchoHandler.connections = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/index.php/admin/remotecontrol"
+
+    def tearDown(self) -> None:
+        """
+        Stop the local HTTP server.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        reset_transport()
+
+    def test_connections_are_reused(self):
+        """
+        Check consecutive calls reuse the same connection.
+
+        Expected result:
+            - A single connection is opened for every request sent.
+            - The pool statistics are reported by host.
+        """
+        transport = LimeSurveyTransport()
+
+        for request_id in range(3):
+            response = transport.post(self.url, json={"method": "get_summary", "id": request_id}, timeout=5)
+            self.assertEqual(request_id, response.json()["id"])
+
+        self.assertEqual(1, EchoHandler.connections)
+        self.assertDictEqual(
+            {"connections": 1, "requests": 3, "idle": 1},
+            transport.stats()[f"http://127.0.0.1:{self.server.server_port}"],
+        )
+        transport.close()
+
+    def test_connections_closed_without_keep_alive(self):
+        """
+        Check connections are not reused when keep-alive is disabled.
+
+        Expected result:
+            - A new connection is opened for every request.
+        """
+        transport = LimeSurveyTransport(keep_alive=False)
+
+        for request_id in range(2):
+            transport.post(self.url, json={"method": "get_summary", "id": request_id}, timeout=5)
+
+        self.assertEqual(2, EchoHandler.connections)
+        transport.close()
+
+    @override_settings(LIMESURVEY_HTTP_POOL_MAXSIZE=2)
+    def test_process_wide_transport(self):
+        """
+        Check the process-wide transport is built once from the settings.
+
+        Expected result:
+            - The same transport is returned on every call.
+            - The pool size is taken from the settings.
+        """
+        reset_transport()
+
+        transport = get_transport()
+
+        self.assertIs(transport, get_transport())
+        self.assertEqual(2, transport.adapter._pool_maxsize)  # pylint: disable=protected-access
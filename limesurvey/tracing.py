@@ -0,0 +1,45 @@
+"""
+Optional OpenTelemetry spans around the stages of the LimeSurvey XBlock views.
+
+Spans are only created when `LIMESURVEY_TRACING_ENABLED` is set and the
+`opentelemetry-api` package is installed. Otherwise `start_span` returns a
+shared no-op context manager.
+"""
+from __future__ import annotations
+
+from contextlib import nullcontext
+from typing import Callable
+
+from django.conf import settings
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover
+    trace = None
+
+TRACER_NAME = "limesurvey"
+
+_NO_SPAN = nullcontext()
+
+
+def tracing_enabled() -> bool:
+    """
+    Return whether the spans are created.
+    """
+    return trace is not None and getattr(settings, "LIMESURVEY_TRACING_ENABLED", False)
+
+
+def start_span(name: str, get_attributes: Callable[[], dict] | None = None):
+    """
+    Return a context manager tracing the code it wraps in a span.
+
+    args:
+        name: Name of the span.
+        get_attributes: Function returning the span attributes, only called
+            when tracing is enabled. The attributes must not identify the learner.
+    """
+    if not tracing_enabled():
+        return _NO_SPAN
+    return trace.get_tracer(TRACER_NAME).start_as_current_span(
+        name, attributes=get_attributes() if get_attributes else None,
+    )
@@ -0,0 +1,137 @@
+"""
+Pooled HTTP transport for the LimeSurvey RemoteControl API.
+"""
+from __future__ import annotations
+
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_RETRIES = 0
+DEFAULT_RETRY_BACKOFF_FACTOR = 0.1
+
+
+class LimeSurveyTransport:
+    """
+    Keep-alive HTTP transport shared by every LimeSurvey API call of the process.
+
+    The underlying `requests.Session` reuses TCP+TLS connections through a
+    connection pool per host. Cookies are never stored, so the only shared
+    state is the urllib3 pool manager, which is thread safe.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_RETRY_BACKOFF_FACTOR,
+        keep_alive: bool = True,
+    ):
+        """
+        Initialize the transport.
+
+        args:
+            pool_connections: Number of hosts to keep connection pools for.
+            pool_maxsize: Maximum number of connections kept per host.
+            max_retries: Retries for connections that could not be established.
+                Requests already sent are never retried by the transport.
+            backoff_factor: Backoff factor between connection retries.
+            keep_alive: Whether connections are reused between requests.
+        """
+        self.keep_alive = keep_alive
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(
+                total=max_retries,
+                connect=max_retries,
+                read=0,
+                status=0,
+                backoff_factor=backoff_factor,
+                raise_on_status=False,
+            ),
+        )
+        self.session = requests.Session()
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def post(self, url: str, json: dict | list, timeout: float) -> requests.Response:
+        """
+        Send a POST request with a JSON body through the pooled session.
+        """
+        headers = None if self.keep_alive else {"Connection": "close"}
+        return self.session.post(url=url, json=json, timeout=timeout, headers=headers)
+
+    def stats(self) -> dict:
+        """
+        Return the connection pool statistics by host.
+
+        returns:
+            A dict like {"https://host:443": {"connections": 2, "requests": 10, "idle": 1}}
+            where `connections` is the number of connections opened so far,
+            `requests` the number of requests sent and `idle` the number of
+            connections ready to be reused.
+        """
+        pools = self.adapter.poolmanager.pools
+        stats = {}
+        for pool_key in pools.keys():
+            pool = pools.get(pool_key)
+            if pool is None:
+                continue
+            stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle": sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0,
+            }
+        return stats
+
+    def close(self) -> None:
+        """
+        Close every pooled connection.
+        """
+        self.session.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> LimeSurveyTransport:
+    """
+    Return the process-wide LimeSurvey transport, creating it on first use.
+    """
+    global _transport  # pylint: disable=global-statement
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = LimeSurveyTransport(
+                    pool_connections=getattr(
+                        settings, "LIMESURVEY_HTTP_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS,
+                    ),
+                    pool_maxsize=getattr(settings, "LIMESURVEY_HTTP_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE),
+                    max_retries=getattr(settings, "LIMESURVEY_HTTP_MAX_RETRIES", DEFAULT_MAX_RETRIES),
+                    backoff_factor=getattr(
+                        settings, "LIMESURVEY_HTTP_RETRY_BACKOFF_FACTOR", DEFAULT_RETRY_BACKOFF_FACTOR,
+                    ),
+                    keep_alive=getattr(settings, "LIMESURVEY_HTTP_KEEP_ALIVE", True),
+                )
+    return _transport
+
+
+def reset_transport() -> None:
+    """
+    Close the process-wide transport so the next call builds it from the current settings.
+    """
+    global _transport  # pylint: disable=global-statement
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+        _transport = None
@@ -151,6 +151,9 @@ setup(
         "lms.djangoapp": [
             "limesurvey = limesurvey.apps:LimeSurveyConfig",
         ],
+        "cms.djangoapp": [
+            "limesurvey = limesurvey.apps:LimeSurveyConfig",
+        ],
     },
     package_data=package_data("limesurvey", ["static", "public", "translations"]),
 )
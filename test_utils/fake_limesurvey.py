@@ -0,0 +1,375 @@
+"""
+Fake LimeSurvey RemoteControl JSON-RPC server for benchmarks and tests.
+
+It implements the methods used by the LimeSurvey XBlock and keeps the
+participants in memory, so the XBlock can be exercised end to end without
+network access. Latency, HTTP errors, LimeSurvey error statuses and session
+expiry can be injected to reproduce the failure modes of a real server.
+
+It can run in-process:
+
+    with FakeLimeSurveyServer(latency=0.02, error_rate=0.1) as server:
+        settings.LIMESURVEY_INTERNAL_API = server.url
+
+or as a local HTTP service:
+
+    python -m test_utils.fake_limesurvey --port 8088 --latency 0.05 --session-ttl 60
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Error statuses returned by LimeSurvey, as mapped in limesurvey.limesurvey.API_EXCEPTIONS_MAPPING
+INVALID_SESSION_KEY = "Invalid session key"
+NO_PARTICIPANTS_FOUND = "No survey participants found."
+INVALID_CREDENTIALS = "Invalid user name or password"
+NO_RESULTS_FOUND = "Error: No results were found based on your attributes."
+
+
+class FakeLimeSurveyHandler(BaseHTTPRequestHandler):
+    """
+    Keep-alive JSON-RPC handler dispatching to the fake LimeSurvey service.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Answer a JSON-RPC request or batch of requests.
+        """
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status, response = self.server.limesurvey.handle(body)
+        data = json.dumps(response).encode("utf8")
+        self.send_response(status)
+        if status != 200:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """
+        Silence the request logs.
+        """
+
+
+class FakeLimeSurvey:
+    """
+    In-memory LimeSurvey RemoteControl service.
+
+    args:
+        latency: Seconds waited before answering each HTTP request.
+        method_latency: Extra seconds waited for each call of a method, by method name.
+        error_rate: Fraction of the HTTP requests answered with `error_http_status`.
+        error_http_status: HTTP status of the injected errors.
+        session_ttl: Seconds a session key stays valid, forever if None.
+        username, password: Credentials accepted by `get_session_key`, any if None.
+        batch_support: Whether JSON-RPC batch requests are answered, as some
+            LimeSurvey versions don't support them.
+        seed: Seed of the random generator deciding the injected errors.
+    """
+
+    def __init__(
+        self, latency=0.0, method_latency=None, error_rate=0.0, error_http_status=503, session_ttl=None,
+        username=None, password=None, batch_support=True, seed=None,
+    ):  # pylint: disable=too-many-arguments
+        """
+        Initialize the fake service.
+        """
+        self.latency = latency
+        self.method_latency = method_latency or {}
+        self.error_rate = error_rate
+        self.error_http_status = error_http_status
+        self.session_ttl = session_ttl
+        self.username = username
+        self.password = password
+        self.batch_support = batch_support
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.session_keys = {}
+        self.participants = defaultdict(dict)
+        self.injected_statuses = defaultdict(list)
+        self.reset_stats()
+
+    def inject_status(self, method, status, times=1):
+        """
+        Answer the next `times` calls of the method with a LimeSurvey error status.
+
+        args:
+            method: Name of the RPC method.
+            status: Status returned, e.g. INVALID_SESSION_KEY.
+            times: Number of calls answered with the status.
+        """
+        with self.lock:
+            self.injected_statuses[method].extend([status] * times)
+
+    def expire_sessions(self):
+        """
+        Invalidate every session key, as when the LimeSurvey sessions expire.
+        """
+        with self.lock:
+            self.session_keys.clear()
+
+    def reset_stats(self):
+        """
+        Reset the request counters.
+        """
+        with self.lock:
+            self.requests = 0
+            self.bytes_received = 0
+            self.calls = Counter()
+            self.errors = Counter()
+
+    def handle(self, body):
+        """
+        Handle the body of an HTTP request.
+
+        returns:
+            The HTTP status and the JSON-RPC response.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self.lock:
+            self.requests += 1
+            self.bytes_received += len(body)
+            failed = self.error_rate and self.random.random() < self.error_rate
+            if failed:
+                self.errors[self.error_http_status] += 1
+
+        if failed:
+            return self.error_http_status, {"id": None, "result": None, "error": "Service unavailable"}
+
+        payload = json.loads(body)
+        if isinstance(payload, list):
+            if not self.batch_support:
+                return 200, {"id": None, "result": None, "error": "Batch requests are not supported"}
+            return 200, [self.dispatch(call) for call in payload]
+        return 200, self.dispatch(payload)
+
+    def dispatch(self, call):
+        """
+        Run a JSON-RPC call.
+        """
+        method = call.get("method")
+        params = call.get("params", [])
+        with self.lock:
+            self.calls[method] += 1
+            injected_status = self.injected_statuses[method].pop(0) if self.injected_statuses[method] else None
+
+        if method in self.method_latency:
+            time.sleep(self.method_latency[method])
+
+        handler = getattr(self, f"rpc_{method}", None)
+        if handler is None:
+            return {"id": call.get("id"), "result": None, "error": f"Unknown method {method}"}
+
+        if injected_status is None and method != "get_session_key" and not self.is_valid_session(params):
+            injected_status = INVALID_SESSION_KEY
+
+        if injected_status is not None:
+            with self.lock:
+                self.errors[injected_status] += 1
+            return {"id": call.get("id"), "result": {"status": injected_status}, "error": None}
+
+        return {"id": call.get("id"), "result": handler(*params), "error": None}
+
+    def is_valid_session(self, params):
+        """
+        Return whether the session key of the call parameters is valid.
+        """
+        if not params:
+            return False
+        with self.lock:
+            expires_at = self.session_keys.get(params[0], 0)
+        return expires_at is None or expires_at > time.monotonic()
+
+    def rpc_get_session_key(self, username, password, *args):  # pylint: disable=unused-argument
+        """
+        Open a new session.
+        """
+        if (self.username, self.password) != (None, None) and (username, password) != (self.username, self.password):
+            return {"status": INVALID_CREDENTIALS}
+        session_key = uuid.uuid4().hex
+        with self.lock:
+            self.session_keys[session_key] = (
+                time.monotonic() + self.session_ttl if self.session_ttl is not None else None
+            )
+        return session_key
+
+    def rpc_get_summary(self, session_key, survey_id, *args):  # pylint: disable=unused-argument
+        """
+        Return the summary of the survey.
+        """
+        return {"completed_responses": 0, "incomplete_responses": 0, "full_responses": 0}
+
+    def rpc_list_participants(
+        self, session_key, survey_id, start=0, limit=10, unused=False, attributes=None, conditions=None,
+    ):  # pylint: disable=unused-argument
+        """
+        Return the participants of the survey matching the conditions.
+        """
+        with self.lock:
+            participants = list(self.participants[survey_id].values())
+        for name, value in (conditions or {}).items():
+            participants = [participant for participant in participants if participant.get(name) == value]
+        participants = participants[start:start + limit]
+        if not participants:
+            return {"status": NO_PARTICIPANTS_FOUND}
+        return [
+            {"tid": participant["tid"], "token": participant["token"], "attribute_1": participant.get("attribute_1")}
+            for participant in participants
+        ]
+
+    def rpc_add_participants(
+        self, session_key, survey_id, participants, create_token=True,
+    ):  # pylint: disable=unused-argument
+        """
+        Add participants to the survey, generating their tokens unless they're given.
+
+        As in LimeSurvey, participants with a token already in the survey are
+        returned with an error and not added.
+        """
+        added = []
+        with self.lock:
+            tokens = {participant["token"] for participant in self.participants[survey_id].values()}
+            for participant in participants:
+                token = participant.get("token") or (uuid.uuid4().hex[:15] if create_token else "")
+                if token and token in tokens:
+                    added.append({**participant, "errors": {"token": ["Token already exists."]}})
+                    continue
+                tid = max(self.participants[survey_id], default=0) + 1
+                added_participant = {**participant, "tid": tid, "token": token}
+                self.participants[survey_id][tid] = added_participant
+                tokens.add(token)
+                added.append(added_participant)
+        return added
+
+    def rpc_delete_participants(self, session_key, survey_id, token_ids, *args):  # pylint: disable=unused-argument
+        """
+        Delete participants from the survey by their token IDs.
+        """
+        result = {}
+        with self.lock:
+            for tid in token_ids:
+                deleted = self.participants[survey_id].pop(tid, None)
+                result[str(tid)] = "Deleted" if deleted else "Invalid token ID"
+        return result
+
+    def rpc_get_participant_properties(self, session_key, survey_id, query, *args):  # pylint: disable=unused-argument
+        """
+        Return the properties of the first participant matching the query.
+        """
+        with self.lock:
+            participants = list(self.participants[survey_id].values())
+        for participant in participants:
+            if all(participant.get(name) == value for name, value in query.items()):
+                return participant
+        return {"status": NO_RESULTS_FOUND}
+
+
+class FakeLimeSurveyServer:
+    """
+    Local HTTP server exposing a fake LimeSurvey RemoteControl API.
+
+    Usage:
+        with FakeLimeSurveyServer(latency=0.02) as server:
+            settings.LIMESURVEY_INTERNAL_API = server.url
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, **kwargs):
+        """
+        Initialize the server, kwargs are passed to FakeLimeSurvey.
+        """
+        self.limesurvey = FakeLimeSurvey(**kwargs)
+        self.httpd = ThreadingHTTPServer((host, port), FakeLimeSurveyHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.limesurvey = self.limesurvey
+        self.thread = None
+
+    @property
+    def url(self):
+        """
+        Return the URL of the RemoteControl API.
+        """
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/index.php/admin/remotecontrol"
+
+    def start(self):
+        """
+        Start serving in a background thread.
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the server.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        """
+        Start the server as a context manager.
+        """
+        return self.start()
+
+    def __exit__(self, *args):
+        """
+        Stop the server when leaving the context.
+        """
+        self.stop()
+
+
+def main(argv=None):
+    """
+    Run the fake LimeSurvey API as a local HTTP service.
+    """
+    parser = argparse.ArgumentParser(description="Fake LimeSurvey RemoteControl JSON-RPC server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each HTTP request.")
+    parser.add_argument(
+        "--method-latency", action="append", default=[], metavar="METHOD=SECONDS",
+        help="Seconds added to each call of a method, can be repeated.",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing.")
+    parser.add_argument("--error-http-status", type=int, default=503, help="HTTP status of the failing requests.")
+    parser.add_argument("--session-ttl", type=float, help="Seconds a session key stays valid.")
+    parser.add_argument("--username", help="User name accepted by get_session_key.")
+    parser.add_argument("--password", help="Password accepted by get_session_key.")
+    parser.add_argument("--no-batch", action="store_true", help="Reject JSON-RPC batch requests.")
+    parser.add_argument("--seed", type=int, help="Seed of the injected errors.")
+    args = parser.parse_args(argv)
+
+    method_latency = {}
+    for item in args.method_latency:
+        method, __, seconds = item.partition("=")
+        method_latency[method] = float(seconds)
+
+    server = FakeLimeSurveyServer(
+        args.host, args.port, latency=args.latency, method_latency=method_latency, error_rate=args.error_rate,
+        error_http_status=args.error_http_status, session_ttl=args.session_ttl, username=args.username,
+        password=args.password, batch_support=not args.no_batch, seed=args.seed,
+    )
+    print(f"Fake LimeSurvey API listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
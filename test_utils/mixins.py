@@ -0,0 +1,33 @@
+"""
+Mixins of the test cases of the LimeSurvey XBlock.
+"""
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.test.utils import override_settings
+
+from limesurvey.transport import reset_transport
+from test_utils.fake_limesurvey import FakeLimeSurveyServer
+
+
+class FakeLimeSurveyMixin:
+    """
+    Mixin of the test cases calling a fake LimeSurvey server as the internal API of the blocks.
+    """
+
+    def start_fake_limesurvey(self, settings: dict | None = None, **kwargs) -> FakeLimeSurveyServer:
+        """
+        Start a fake LimeSurvey server used for the rest of the test, with an empty cache and transport.
+
+        args:
+            settings: Django settings overridden for the rest of the test, besides LIMESURVEY_INTERNAL_API.
+            kwargs: Arguments of the fake LimeSurvey server.
+        """
+        cache.clear()
+        server = FakeLimeSurveyServer(**kwargs).start()
+        self.addCleanup(server.stop)
+        self.addCleanup(reset_transport)
+        settings_override = override_settings(LIMESURVEY_INTERNAL_API=server.url, **(settings or {}))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        return server